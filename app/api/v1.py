@@ -1,8 +1,11 @@
 from fastapi import APIRouter, BackgroundTasks, Depends, File, HTTPException, Path, UploadFile, status, Query, Form
-from fastapi.responses import JSONResponse
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, StreamingResponse
+from starlette.concurrency import run_in_threadpool
 from typing import Optional, List, Dict, Any
 import io
 import os
+import json
 from tempfile import NamedTemporaryFile
 
 # bson 모듈을 조건부로 임포트 (테스트 환경에서는 모의 객체 사용)
@@ -22,17 +25,88 @@ except (ImportError, ModuleNotFoundError):
         pass
 
 from app.schemas import AnalysisRequest, AnalysisType, TaskResponse, ProgressResponse, AnalysisResultResponse
-from workers.tasks import analyze_audio, compare_audio, analyze_reference_audio
+# 게이트웨이는 무거운 workers.tasks 대신 이름 기반 태스크 시그니처로 작업을 전송
+from workers.signatures import analyze_audio, compare_audio, analyze_reference_audio, revoke_task
 from app.db import (
     get_analysis_result, get_comparison_result, get_result,
     get_user_analysis_results, get_user_comparison_results,
     get_song_analysis_results, get_song_comparison_results,
-    get_reference_features, get_reference_features_list, delete_reference_features
+    get_reference_features, get_reference_features_list, delete_reference_features,
+    get_reference_version
 )
 from workers.gpu_client import gpu_client, is_gpu_service_available  # GPU 클라이언트 임포트
+from workers.gpu_router import gpu_router
+from workers.gpu_pool import gpu_endpoint_pool
+from workers.gpu_limiter import gpu_limiter
+from workers.gpu_hedge import get_hedge_stats
+from workers.task_events import FINAL_STATES, publish_task_event, stream_task_events
+from workers.result_ref import is_result_ref
+from workers.admission import QUEUE_LIMITS, queue_admission
+from workers.result_cache import result_cache
+from workers.cancellation import task_cancellation
 
 router = APIRouter(prefix="/v1")
 
+
+def _check_admission(queue: str):
+    """큐 길이/예상 대기 시간이 한도를 넘으면 작업을 큐에 넣기 전에 429/503과 Retry-After로 거절"""
+    queue_status = queue_admission.status(queue)
+    if not queue_status["accepting"]:
+        raise HTTPException(
+            status_code=queue_status["status_code"],
+            detail=queue_status["reason"],
+            headers={"Retry-After": str(queue_status["retry_after"])}
+        )
+
+
+def admission_check(queue: str):
+    """결과 캐시를 거치지 않는 엔드포인트에서 업로드를 읽기 전에 접수 제한을 확인하는 의존성"""
+    def check():
+        _check_admission(queue)
+    return check
+
+
+def _submit_cached(task_signature, task_kwargs: Dict[str, Any], bypass_cache: bool, queue: str, kind: str,
+                   audio_bytes: bytes, reference_version: Optional[str] = None, **params) -> Dict[str, Any]:
+    """같은 오디오/파라미터로 제출된 작업이 결과 캐시에 있으면 그 작업 ID를 반환하고, 없으면 새로 제출
+
+    기존 작업을 재사용하면 큐에 아무것도 넣지 않으므로, 접수 제한은 캐시에 없을 때만 확인합니다.
+
+    Args:
+        task_signature: 제출할 태스크 시그니처
+        task_kwargs: 태스크 인자
+        bypass_cache: True이면 캐시를 확인하지 않고 새로 실행 (새 결과는 캐시에 저장)
+        queue: 태스크가 들어갈 큐 (접수 제한 확인용)
+        kind: 캐시 키에 들어갈 작업 종류
+        audio_bytes: 캐시 키에 들어갈 오디오 내용
+        reference_version: 비교할 레퍼런스 버전
+        params: 캐시 키에 들어갈 결과에 영향을 주는 파라미터
+    """
+    cache_key = result_cache.key(kind, audio_bytes, reference_version, **params) if result_cache.enabled else None
+    if not bypass_cache:
+        cached = result_cache.lookup(cache_key, lambda task_id: analyze_audio.AsyncResult(task_id).state)
+        if cached:
+            task_id, state = cached
+            return {"task_id": task_id, "status": state, "cached": True}
+    _check_admission(queue)
+    task = task_signature.delay(**task_kwargs)
+    task_cancellation.register(task.id)
+    queue_admission.task_enqueued(queue)
+    result_cache.store(cache_key, task.id)
+    return {"task_id": task.id}
+
+
+@router.get("/queue/status", response_model=Dict[str, Any])
+async def get_queue_status():
+    """
+    큐별 현재 길이와 예상 대기 시간을 반환합니다.
+    클라이언트는 작업을 제출하기 전에 accepting과 estimated_wait_seconds로 제출 여부를 판단할 수 있습니다.
+    
+    Returns:
+    - queues: 큐 이름 -> depth, avg_task_seconds, estimated_wait_seconds, accepting (거절 중이면 retry_after, reason)
+    """
+    return {"queues": {queue: queue_admission.status(queue) for queue in QUEUE_LIMITS}}
+
 # GPU 상태 확인 라우트
 @router.get("/gpu/status", response_model=Dict[str, Any])
 async def check_gpu_status():
@@ -42,10 +116,14 @@ async def check_gpu_status():
     Returns:
     - available: GPU 서비스 사용 가능 여부
     - url: GPU 서비스 URL
+    - endpoints: 엔드포인트별 진행 중 요청 수, 헬스 및 서킷 상태
     - details: 추가 상태 정보
+    - routing: GPU/CPU 라우터의 지연 추정치
+    - hedging: GPU 요청 헤징 카운터
+    - limiter: 클러스터 전체 동시 처리 제한기의 처리 중 세그먼트 수와 대기 시간 지표
     """
     is_available = is_gpu_service_available()
-    gpu_url = os.environ.get("GPU_INFERENCE_SERVICE_URL", "not set")
+    gpu_url = ",".join(gpu_endpoint_pool.urls) or "not set"
     
     # 간단한 테스트 데이터로 서비스 응답 시간 측정
     details = {"message": "GPU 서비스가 정상적으로 연결되어 있지 않습니다."}
@@ -82,7 +160,11 @@ async def check_gpu_status():
     return {
         "available": is_available,
         "url": gpu_url,
-        "details": details
+        "details": details,
+        "endpoints": gpu_endpoint_pool.stats(),
+        "routing": gpu_router.stats(),
+        "hedging": get_hedge_stats(),
+        "limiter": gpu_limiter.metrics()
     }
 
 
@@ -93,11 +175,14 @@ async def analyze(
     analysis_type: AnalysisType = AnalysisType.SIMPLE,
     user_id: Optional[str] = None,
     song_id: Optional[str] = None,
-    generate_feedback: bool = False
+    generate_feedback: bool = False,
+    bypass_cache: bool = False
 ):
     """
     Submit an audio file for analysis.
     Returns a task ID that can be used to track progress and retrieve results.
+    If the same audio was already submitted with the same parameters, the earlier task ID is returned
+    (cached=true) while the result cache is enabled.
     
     Parameters:
     - file: Audio file to analyze (WAV or MP3)
@@ -105,6 +190,7 @@ async def analyze(
     - user_id: Optional user identifier
     - song_id: Optional song identifier
     - generate_feedback: Whether to generate textual feedback using GROK API
+    - bypass_cache: Always run a new analysis instead of reusing a cached task
     """
     if not file.filename.lower().endswith(('.wav', '.mp3')):
         raise HTTPException(
@@ -122,13 +208,17 @@ async def analyze(
         generate_feedback=generate_feedback  # 피드백 생성 옵션 추가
     )
     
-    # Submit to Celery task queue
-    task = analyze_audio.delay(
-        audio_bytes=contents,
-        request_data=request.model_dump()
+    # Submit to Celery task queue (or reuse a task with the same audio and parameters)
+    request_data = request.model_dump()
+    return _submit_cached(
+        analyze_audio,
+        {"audio_bytes": contents, "request_data": request_data},
+        bypass_cache,
+        "interactive",
+        "analysis",
+        contents,
+        **request_data
     )
-    
-    return {"task_id": task.id}
 
 
 @router.post("/compare", response_model=TaskResponse)
@@ -137,16 +227,19 @@ async def compare(
     user_file: UploadFile = File(...),
     user_id: Optional[str] = Form(None),
     song_id: Optional[str] = Form(None),
-    generate_feedback: bool = Form(False)
+    generate_feedback: bool = Form(False),
+    bypass_cache: bool = Form(False)
 ):
     """
     사용자 연주를 레퍼런스 오디오 또는 MIDI와 비교합니다.
+    결과 캐시가 켜져 있으면 같은 오디오/파라미터로 제출된 기존 작업 ID를 반환합니다 (cached=true).
     
     Parameters:
     - user_file: 사용자의 오디오 파일 (WAV 또는 MP3)
     - user_id: 사용자 ID (선택 사항)
     - song_id: 곡 ID (선택 사항)
     - generate_feedback: 피드백 생성 여부
+    - bypass_cache: 캐시된 작업을 재사용하지 않고 새로 비교할지 여부
     
     Returns:
     - task_id: 분석 작업의 ID
@@ -159,24 +252,52 @@ async def compare(
     
     user_contents = await user_file.read()
     
+    # 레퍼런스를 다시 등록하면 이전 비교 결과를 재사용하지 않도록 레퍼런스 버전을 캐시 키에 포함
+    reference_version = get_reference_version(song_id) if result_cache.enabled and song_id else None
+    
     # Submit to Celery task queue
-    task = compare_audio.delay(
-        user_audio_bytes=user_contents,
+    return _submit_cached(
+        compare_audio,
+        {"user_audio_bytes": user_contents, "user_id": user_id, "song_id": song_id,
+         "generate_feedback": generate_feedback},
+        bypass_cache,
+        "interactive",
+        "comparison",
+        user_contents,
+        reference_version,
         user_id=user_id,
         song_id=song_id,
         generate_feedback=generate_feedback
     )
-    
-    return {"task_id": task.id}
 
 
-@router.get("/tasks/{task_id}", response_model=ProgressResponse)
-async def get_task_status(
-    task_id: str = Path(..., description="The ID of the task to check")
-):
-    """
-    Get the status and progress of a task.
-    If the task is complete, this will include the analysis results.
+def _resolve_task_result(task_id: str, task_result: Any) -> Any:
+    """참조 모드(TASK_RESULT_MODE=reference) 반환값이면 MongoDB에서 전체 결과를 읽어 반환"""
+    if not is_result_ref(task_result):
+        return task_result
+    ref = task_result["result_ref"]
+    if ref.get("type") == "reference":
+        document = get_reference_features(ref.get("song_id"))
+        if document:
+            result = {"song_id": document["song_id"], "features": document.get("features"),
+                      "document_id": ref["document_id"]}
+            if task_result.get("has_midi"):
+                result["has_midi"] = True
+            return result
+    else:
+        document = get_result(task_id)
+        if document:
+            return document["result"]
+    # 문서가 삭제된 경우 요약만 반환
+    return task_result
+
+
+def _task_status(task_id: str, include_result: bool = True) -> ProgressResponse:
+    """Celery 결과 백엔드에서 작업 상태와 진행률 조회
+
+    Args:
+        task_id: 작업 ID
+        include_result: False이면 완료된 작업의 결과를 MongoDB에서 읽지 않고 결과 백엔드 값(요약)을 그대로 반환
     """
     task = analyze_audio.AsyncResult(task_id)
     response = ProgressResponse(
@@ -190,7 +311,7 @@ async def get_task_status(
     
     if task.state == 'SUCCESS':
         response.progress = 100
-        response.result = task.result
+        response.result = _resolve_task_result(task_id, task.result) if include_result else task.result
         return response
     
     if task.state == 'FAILURE':
@@ -204,6 +325,95 @@ async def get_task_status(
     return response
 
 
+@router.get("/tasks/{task_id}", response_model=ProgressResponse)
+async def get_task_status(
+    task_id: str = Path(..., description="The ID of the task to check"),
+    include_result: bool = Query(True, description="완료된 작업의 전체 결과 포함 여부 (False이면 요약만)")
+):
+    """
+    Get the status and progress of a task.
+    If the task is complete, this will include the analysis results.
+    """
+    return _task_status(task_id, include_result)
+
+
+@router.delete("/tasks/{task_id}", response_model=TaskResponse, status_code=status.HTTP_202_ACCEPTED)
+async def cancel_task(
+    task_id: str = Path(..., description="The ID of the task to cancel")
+):
+    """
+    작업을 취소합니다.
+    큐에서 기다리는 작업은 실행되지 않고 바로 REVOKED가 됩니다. 실행 중인 작업은 다음 진행률 보고 시점
+    (단계 사이, 세그먼트/GPU 배치 사이)에 중단되어 워커 슬롯을 반환하고 REVOKED가 됩니다.
+    결과를 저장하는 마무리 단계(FINALIZING)에 들어간 작업은 끝까지 실행됩니다.
+    최종 상태는 GET /tasks/{task_id} 또는 /tasks/{task_id}/events로 확인합니다.
+    
+    Returns:
+    - task_id: 작업 ID
+    - status: 취소 요청 시점의 상태 (큐에서 기다리던 작업은 REVOKED)
+    """
+    state = analyze_audio.AsyncResult(task_id).state
+    if state in FINAL_STATES:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"이미 종료된 작업입니다 ({state})"
+        )
+    # Celery는 모르는 작업 ID도 PENDING으로 보고하므로, 제출 기록이 없는 ID는 취소하지 않음
+    if state == 'PENDING' and not task_cancellation.is_known(task_id):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="작업을 찾을 수 없습니다"
+        )
+    
+    # 실행 중인 태스크(같은 ID로 이어지는 저장 단계와 캔버스 서브태스크 포함)가 확인하는 취소 플래그
+    if not task_cancellation.request(task_id):
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="취소 요청을 저장하지 못했습니다. 잠시 후 다시 시도하세요"
+        )
+    # 취소된 작업 ID를 같은 오디오의 재제출에 돌려주지 않도록 결과 캐시에서 제거
+    result_cache.evict(task_id)
+    
+    if state == 'PENDING':
+        revoke_task(task_id)
+        publish_task_event(task_id, {"status": "REVOKED", "progress": 0})
+        state = 'REVOKED'
+    
+    return {"task_id": task_id, "status": state}
+
+
+@router.get("/tasks/{task_id}/events")
+async def stream_task_status(
+    task_id: str = Path(..., description="The ID of the task to follow")
+):
+    """
+    작업 진행 상황을 Server-Sent Events로 푸시합니다.
+    
+    첫 이벤트는 현재 상태이고, 이후 워커가 진행률을 기록할 때마다 이벤트를 보내며,
+    최종 결과(SUCCESS) 또는 오류(FAILURE) 이벤트를 보낸 뒤 스트림을 닫습니다.
+    각 이벤트의 data는 GET /tasks/{task_id} 응답과 같은 형태의 JSON입니다.
+    """
+    # 상태 조회(Celery 결과 백엔드)와 결과 조회(MongoDB)는 동기 I/O이므로 이벤트 루프를 막지 않도록 스레드풀에서 실행
+    async def snapshot():
+        return jsonable_encoder(await run_in_threadpool(_task_status, task_id), exclude_none=True)
+    
+    async def event_source():
+        async for event in stream_task_events(task_id, snapshot):
+            if event is None:
+                yield ": keepalive\n\n"
+            else:
+                if event.get("status") == "SUCCESS":
+                    event["result"] = await run_in_threadpool(_resolve_task_result, task_id, event.get("result"))
+                yield f"data: {json.dumps(event, default=str)}\n\n"
+    
+    return StreamingResponse(
+        event_source(),
+        media_type="text/event-stream",
+        # 프록시가 이벤트를 모아서 보내지 않도록 버퍼링 비활성화
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
 @router.get("/results/{task_id}", response_model=AnalysisResultResponse)
 async def get_result_by_id(
     task_id: str = Path(..., description="The ID of the task to get results for")
@@ -314,7 +524,7 @@ async def get_song_results(
     return results
 
 
-@router.post("/reference", response_model=TaskResponse)
+@router.post("/reference", response_model=TaskResponse, dependencies=[Depends(admission_check("bulk_reference"))])
 async def add_reference(
     background_tasks: BackgroundTasks,
     reference_file: UploadFile = File(...),
@@ -359,6 +569,8 @@ async def add_reference(
         midi_bytes=midi_contents,
         description=description
     )
+    task_cancellation.register(task.id)
+    queue_admission.task_enqueued("bulk_reference")
     
     return {"task_id": task.id}
 
@@ -443,11 +655,13 @@ async def compare_with_reference(
     song_id: str = Form(...),
     midi_file: Optional[UploadFile] = File(None),
     user_id: Optional[str] = Form(None),
-    generate_feedback: bool = Form(False)
+    generate_feedback: bool = Form(False),
+    bypass_cache: bool = Form(False)
 ):
     """
     사용자의 연주를 DB에 저장된 레퍼런스 오디오와 비교합니다.
     song_id를 통해 저장된 레퍼런스 오디오 특성을 불러와 사용합니다.
+    결과 캐시가 켜져 있으면 같은 오디오/파라미터/레퍼런스 버전으로 제출된 기존 작업 ID를 반환합니다 (cached=true).
     
     Parameters:
     - user_file: 사용자의 오디오 파일 (WAV 또는 MP3)
@@ -455,6 +669,7 @@ async def compare_with_reference(
     - midi_file: MIDI 파일 (선택 사항, 레퍼런스에 저장된 MIDI가 우선함)
     - user_id: 사용자 ID (선택 사항)
     - generate_feedback: 피드백 생성 여부
+    - bypass_cache: 캐시된 작업을 재사용하지 않고 새로 비교할지 여부
     
     Returns:
     - task_id: 분석 작업의 ID
@@ -484,12 +699,17 @@ async def compare_with_reference(
             )
         midi_contents = await midi_file.read()
     
-    # Celery 작업 큐에 제출
-    task = compare_audio.delay(
-        user_audio_bytes=user_contents,
+    # Celery 작업 큐에 제출 (레퍼런스 버전이 같은 기존 작업이 있으면 재사용)
+    return _submit_cached(
+        compare_audio,
+        {"user_audio_bytes": user_contents, "user_id": user_id, "song_id": song_id,
+         "generate_feedback": generate_feedback},
+        bypass_cache,
+        "interactive",
+        "comparison",
+        user_contents,
+        str(reference_data.get("created_at")),
         user_id=user_id,
         song_id=song_id,
         generate_feedback=generate_feedback
-    )
-    
-    return {"task_id": task.id}
\ No newline at end of file
+    )
\ No newline at end of file
@@ -1,4 +1,5 @@
 import os
+import threading
 from typing import Dict, Any, List, Optional
 
 # 테스트 환경에서는 MockClient를 사용하고, 그렇지 않으면 실제 MongoClient를 사용합니다
@@ -30,7 +31,7 @@ except (ImportError, ModuleNotFoundError):
             super().__init__(*args, **kwargs)
             self.documents = {}
         
-        def find_one(self, query):
+        def find_one(self, query, projection=None):
             task_id = query.get("task_id")
             return self.documents.get(task_id)
         
@@ -91,28 +92,81 @@ except (ImportError, ModuleNotFoundError):
 MONGO_URI = os.environ.get("MONGO_URI", "mongodb://mongo:27017/")
 MONGO_DB_NAME = os.environ.get("MONGO_DB_NAME", "maple_audio_db")
 
-# MongoDB 클라이언트와 컬렉션 초기화
-client = MongoClient(MONGO_URI)
+# 서버 선택 대기 시간 (밀리초). MongoDB가 내려가 있을 때 요청이 오래 멈추지 않도록 제한
+MONGO_SERVER_SELECTION_TIMEOUT_MS = int(os.environ.get("MONGO_SERVER_SELECTION_TIMEOUT_MS", 5000))
 
-try:
-    # 데이터베이스 및 컬렉션 초기화 시도
-    db = client[MONGO_DB_NAME]
-    
-    # 분석 결과 저장을 위한 컬렉션
-    analysis_collection = db["analysis_results"]
-    # 비교 결과 저장을 위한 컬렉션
-    comparison_collection = db["comparison_results"]
-    # 피드백 저장을 위한 컬렉션
-    feedback_collection = db["feedback_results"]
-    # 레퍼런스 오디오 특성 저장을 위한 컬렉션
-    reference_features_collection = db["reference_features"]
-except (TypeError, AttributeError) as e:
-    # 테스트 환경에서는 임시 객체 사용
-    print(f"MongoDB 초기화 중 오류 발생 (테스트 환경에서는 정상): {e}")
-    analysis_collection = MagicMock()
-    comparison_collection = MagicMock()
-    feedback_collection = MagicMock()
-    reference_features_collection = MagicMock()
+# MongoClient는 처음 사용할 때 생성합니다 (mongodb+srv URI는 생성 시 DNS 조회를 하므로 import 시점에 만들지 않음).
+# Celery prefork 자식 프로세스도 포크 이후 각자 클라이언트를 만들게 됩니다.
+_client = None
+_collections: Dict[str, Any] = {}
+_client_lock = threading.Lock()
+
+
+def get_client():
+    """MongoDB 클라이언트 반환 (처음 호출 시 생성)"""
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = MongoClient(MONGO_URI, serverSelectionTimeoutMS=MONGO_SERVER_SELECTION_TIMEOUT_MS)
+    return _client
+
+
+def get_collection(name: str):
+    """데이터베이스의 컬렉션 반환 (클라이언트와 함께 처음 사용할 때 생성)"""
+    collection = _collections.get(name)
+    if collection is None:
+        try:
+            collection = get_client()[MONGO_DB_NAME][name]
+        except (TypeError, AttributeError) as e:
+            # 테스트 환경에서는 임시 객체 사용
+            from unittest.mock import MagicMock
+            print(f"MongoDB 초기화 중 오류 발생 (테스트 환경에서는 정상): {e}")
+            collection = MagicMock()
+        _collections[name] = collection
+    return collection
+
+
+def close_client():
+    """MongoDB 연결 종료 (다음 사용 시 다시 연결)"""
+    global _client
+    with _client_lock:
+        if _client is not None:
+            _client.close()
+        _client = None
+        _collections.clear()
+
+
+class _LazyClient:
+    """처음 속성에 접근할 때 MongoClient를 만드는 프록시 (기존 `client` 이름 유지용)"""
+
+    def __getattr__(self, name):
+        return getattr(get_client(), name)
+
+    def __getitem__(self, name):
+        return get_client()[name]
+
+
+class _LazyCollection:
+    """처음 사용할 때 실제 컬렉션을 가져오는 프록시"""
+
+    def __init__(self, name: str):
+        self._name = name
+
+    def __getattr__(self, attr):
+        return getattr(get_collection(self._name), attr)
+
+
+client = _LazyClient()
+
+# 분석 결과 저장을 위한 컬렉션
+analysis_collection = _LazyCollection("analysis_results")
+# 비교 결과 저장을 위한 컬렉션
+comparison_collection = _LazyCollection("comparison_results")
+# 피드백 저장을 위한 컬렉션
+feedback_collection = _LazyCollection("feedback_results")
+# 레퍼런스 오디오 특성 저장을 위한 컬렉션
+reference_features_collection = _LazyCollection("reference_features")
 
 def save_analysis_result(task_id: str, result: Dict[str, Any]) -> str:
     """
@@ -278,6 +332,19 @@ def get_reference_features(song_id: str) -> Dict[str, Any]:
     result = reference_features_collection.find_one({"song_id": song_id})
     return result
 
+def get_reference_version(song_id: str) -> Optional[str]:
+    """
+    레퍼런스 오디오의 버전(등록 시각)을 가져옵니다. 레퍼런스를 다시 등록하면 값이 바뀝니다.
+    
+    Args:
+        song_id: 곡 ID
+        
+    Returns:
+        레퍼런스 등록 시각 또는 레퍼런스가 없으면 None
+    """
+    result = reference_features_collection.find_one({"song_id": song_id}, {"created_at": 1})
+    return str(result.get("created_at")) if result else None
+
 def get_reference_features_list(limit: int = 20) -> List[Dict[str, Any]]:
     """
     MongoDB에서 모든 레퍼런스 오디오 특성 목록을 가져옵니다.
@@ -1,11 +1,6 @@
 import os
-import scipy.signal  # SciPy 패치를 위해 추가
-
-# SciPy 호환성 패치 적용
-# 최신 버전의 SciPy에서는 scipy.signal.hann이 scipy.signal.windows.hann으로 이동했습니다
-if not hasattr(scipy.signal, 'hann') and hasattr(scipy.signal, 'windows') and hasattr(scipy.signal.windows, 'hann'):
-    print("패치 적용 (app): scipy.signal.hann -> scipy.signal.windows.hann")
-    scipy.signal.hann = scipy.signal.windows.hann
+import asyncio
+from contextlib import asynccontextmanager
 
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
@@ -13,7 +8,31 @@ from fastapi.responses import JSONResponse
 
 from app.api import api_router
 # MongoDB 모듈 가져오기
-from app.db import client as mongo_client
+from app.db import client as mongo_client, close_client as close_mongo_client
+
+
+def check_db_connection():
+    """MongoDB 연결 확인 (결과만 기록하고 실패해도 시작을 막지 않음)"""
+    try:
+        mongo_client.server_info()
+        print("MongoDB 연결 성공")
+    except Exception as e:
+        print(f"MongoDB 연결 실패: {e}")
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """애플리케이션 수명 주기
+
+    MongoDB 클라이언트와 GPU 클라이언트는 처음 사용할 때 연결하므로 시작 시 네트워크 I/O를 기다리지 않습니다.
+    MongoDB 연결 확인은 스레드에서 실행하여 서버가 내려가 있어도 시작이 지연되지 않게 합니다.
+    """
+    startup_check = asyncio.get_running_loop().run_in_executor(None, check_db_connection)
+    yield
+    await startup_check
+    close_mongo_client()
+    print("MongoDB 연결 종료")
+
 
 # Create FastAPI app
 app = FastAPI(
@@ -22,7 +41,8 @@ app = FastAPI(
     version="0.1.0",
     docs_url="/api/v1/docs", 
     redoc_url="/api/v1/redoc",
-    openapi_url="/api/v1/openapi.json"
+    openapi_url="/api/v1/openapi.json",
+    lifespan=lifespan
 )
 
 # Include API router
@@ -66,21 +86,3 @@ async def global_exception_handler(request: Request, exc: Exception):
         status_code=500,
         content={"detail": "Internal server error", "error": str(exc)},
     )
-
-
-@app.on_event("startup")
-async def startup_db_client():
-    """애플리케이션 시작 시 MongoDB에 연결"""
-    try:
-        # MongoDB 연결 확인
-        mongo_client.server_info()
-        print("MongoDB 연결 성공")
-    except Exception as e:
-        print(f"MongoDB 연결 실패: {e}")
-
-
-@app.on_event("shutdown")
-async def shutdown_db_client():
-    """애플리케이션 종료 시 MongoDB 연결 종료"""
-    mongo_client.close()
-    print("MongoDB 연결 종료")
\ No newline at end of file
@@ -26,6 +26,7 @@ class AnalysisType(str, Enum):
 class TaskResponse(BaseModel):
     task_id: str
     status: str = "PENDING"
+    cached: bool = False  # 같은 오디오/파라미터로 제출된 기존 작업을 재사용한 경우 True
 
 
 class ProgressResponse(BaseModel):
@@ -76,6 +77,10 @@ class ComparisonResult(BaseModel):
     rhythm_absolute_match: Optional[float] = None
     rhythm_relative_match: Optional[float] = None
     expression_similarity: Optional[float] = None
+    
+    # 시간 예산 부족으로 일부 단계를 저비용 방식으로 실행한 경우 (stage, mode, remaining_seconds, estimated_seconds)
+    degraded: bool = False
+    degradations: Optional[List[Dict[str, Any]]] = None
 
 
 class MidiNote(BaseModel):
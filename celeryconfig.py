@@ -5,22 +5,74 @@ from kombu import Exchange, Queue
 broker_url = os.environ.get("CELERY_BROKER_URL", "redis://redis:6379/0")
 result_backend = os.environ.get("CELERY_RESULT_BACKEND", "redis://redis:6379/1")
 
+# 큐 구성
+# - interactive: 사용자가 결과를 기다리는 분석/비교 (캔버스 서브태스크 포함)
+# - feedback: LLM 피드백 생성과 결과 저장 (외부 API 대기 위주, CPU를 거의 쓰지 않음)
+# - bulk_reference: 레퍼런스 곡 일괄 등록 (대량으로 들어와도 interactive 워커를 차지하지 않음)
+# - default: 그 외 태스크
+# 워커 프로필별로 소비할 큐와 동시 실행 수/프리페치를 다르게 설정합니다 (README "Queue Topology and Worker Profiles")
 task_queues = (
+    Queue('interactive', Exchange('interactive'), routing_key='interactive'),
+    Queue('feedback', Exchange('feedback'), routing_key='feedback'),
+    Queue('bulk_reference', Exchange('bulk_reference'), routing_key='bulk_reference'),
     Queue('default', Exchange('default'), routing_key='default'),
-    Queue('audio_analysis', Exchange('audio_analysis'), routing_key='audio_analysis'),
 )
 
 task_default_queue = 'default'
 task_default_exchange = 'default'
 task_default_routing_key = 'default'
 
+# 태스크 우선순위 (Redis 브로커는 숫자가 작을수록 먼저 처리)
+# 한 워커가 여러 큐를 소비하거나 같은 큐 안에서도 사용자 요청이 일괄 작업보다 먼저 처리되도록 합니다
+PRIORITY_INTERACTIVE = 0
+PRIORITY_FEEDBACK = 3
+PRIORITY_BULK = 6
+
 task_routes = {
-    'workers.tasks.analyze_audio': {'queue': 'audio_analysis'},
-    'workers.tasks.compare_audio': {'queue': 'audio_analysis'},
+    'workers.tasks.analyze_audio': {'queue': 'interactive', 'priority': PRIORITY_INTERACTIVE},
+    'workers.tasks.compare_audio': {'queue': 'interactive', 'priority': PRIORITY_INTERACTIVE},
+    # compare_audio 캔버스 모드의 서브태스크 (COMPARE_PIPELINE_MODE=canvas)
+    'workers.tasks.compare_pitch_stage': {'queue': 'interactive', 'priority': PRIORITY_INTERACTIVE},
+    'workers.tasks.compare_technique_stage': {'queue': 'interactive', 'priority': PRIORITY_INTERACTIVE},
+    'workers.tasks.compare_tempo_onset_stage': {'queue': 'interactive', 'priority': PRIORITY_INTERACTIVE},
+    'workers.tasks.compare_score_stage': {'queue': 'interactive', 'priority': PRIORITY_INTERACTIVE},
+    # 피드백 생성과 결과 저장 단계 (피드백을 요청하지 않은 경우 tasks.py에서 interactive 큐로 보냄)
+    'workers.tasks.compare_persist_stage': {'queue': 'feedback', 'priority': PRIORITY_FEEDBACK},
+    'workers.tasks.analysis_persist_stage': {'queue': 'feedback', 'priority': PRIORITY_FEEDBACK},
+    'workers.tasks.analyze_reference_audio': {'queue': 'bulk_reference', 'priority': PRIORITY_BULK},
+}
+
+# 큐별 태스크 메시지 직렬화기 ('json' 또는 workers/serialization.py의 'msgpack-numpy')
+# 오디오 bytes와 배열을 주고받는 큐는 msgpack-numpy로 바꾸면 메시지가 작아지고 빨라집니다
+# 워커를 먼저 배포한 뒤(accept_content에 이미 포함) 게이트웨이 설정을 바꾸면 됩니다
+# 큐마다 따로 설정하므로 한 큐에서 먼저 시험해 볼 수 있습니다
+QUEUE_SERIALIZERS = {
+    'interactive': os.environ.get("INTERACTIVE_QUEUE_SERIALIZER", "json"),
+    'bulk_reference': os.environ.get("BULK_REFERENCE_QUEUE_SERIALIZER", "json"),
+}
+for _route in task_routes.values():
+    if _route['queue'] in QUEUE_SERIALIZERS:
+        _route['serializer'] = QUEUE_SERIALIZERS[_route['queue']]
+
+# Redis 브로커 우선순위 설정
+# - priority_steps: 큐마다 우선순위별 하위 목록을 만들어 낮은 숫자부터 꺼냄
+# - queue_order_strategy=priority: 여러 큐를 소비하는 워커는 -Q에 적은 순서대로 큐를 확인
+broker_transport_options = {
+    'priority_steps': [PRIORITY_INTERACTIVE, PRIORITY_FEEDBACK, PRIORITY_BULK, 9],
+    'sep': ':',
+    'queue_order_strategy': 'priority',
 }
 
-# Concurrency settings
-worker_concurrency = 2
+# Concurrency settings (워커 프로필별로 환경변수 또는 -c / --prefetch-multiplier 옵션으로 변경)
+worker_concurrency = int(os.environ.get("CELERY_WORKER_CONCURRENCY", 2))
+# 오래 걸리는 태스크를 한 프로세스가 미리 여러 개 가져가 다른 워커가 놀지 않도록 1개씩만 가져옴
+worker_prefetch_multiplier = int(os.environ.get("CELERY_PREFETCH_MULTIPLIER", 1))
+# 풀이 자식 프로세스의 시작 완료를 기다리는 시간 (초, Celery 기본값 4초)
+# WORKER_PRELOAD_MODELS=true이면 자식이 worker_process_init에서 물려받은 모델로 확인 추론을 하고
+# (최대 WORKER_PRELOAD_VERIFY_TIMEOUT초) 실패하면 모델을 다시 로드하므로, 그보다 짧으면 풀이 자식을 계속 죽이고 다시 만듦
+worker_proc_alive_timeout = float(os.environ.get(
+    "CELERY_WORKER_PROC_ALIVE_TIMEOUT", float(os.environ.get("WORKER_PRELOAD_VERIFY_TIMEOUT", 30)) + 60
+))
 
 # Task execution settings
 task_acks_late = True
@@ -30,8 +82,12 @@ task_soft_time_limit = 500  # 8.3 minutes
 # Task result settings
 task_ignore_result = False
 task_store_errors_even_if_ignored = True
+# 결과 백엔드에 태스크 결과를 보관하는 시간 (초). 전체 결과는 MongoDB에 남으므로 짧게 잡아도 됨
+result_expires = int(os.environ.get("CELERY_RESULT_EXPIRES", 86400))
 
 # Serialization
 task_serializer = 'json'
-result_serializer = 'json'
-accept_content = ['json']
\ No newline at end of file
+result_serializer = os.environ.get("CELERY_RESULT_SERIALIZER", "json")
+# msgpack-numpy는 pickle을 사용하지 않고 허용된 확장 타입만 역직렬화하므로 항상 받아도 안전
+accept_content = ['json', 'msgpack-numpy']
+result_accept_content = ['json', 'msgpack-numpy']
\ No newline at end of file
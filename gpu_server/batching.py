@@ -0,0 +1,118 @@
+import time
+import queue
+import logging
+import threading
+from concurrent.futures import Future
+from typing import Callable, List, Optional
+
+import bentoml
+import numpy as np
+
+# 로깅 설정
+logger = logging.getLogger(__name__)
+
+# 배치 크기 / 대기 시간 지표 (BentoML /metrics 엔드포인트로 노출)
+BATCH_SIZE_HISTOGRAM = bentoml.metrics.Histogram(
+    name="maple_gpu_batch_size",
+    documentation="모델 호출 한 번에 묶인 입력 행 수",
+    labelnames=["model"],
+    buckets=(1, 2, 4, 8, 16, 32, 64, 128, 256, 512, 1024, 2048, 4096),
+)
+BATCH_REQUESTS_HISTOGRAM = bentoml.metrics.Histogram(
+    name="maple_gpu_batch_requests",
+    documentation="모델 호출 한 번에 묶인 제출 항목 수",
+    labelnames=["model"],
+    buckets=(1, 2, 4, 8, 16, 32, 64, 128),
+)
+QUEUE_WAIT_HISTOGRAM = bentoml.metrics.Histogram(
+    name="maple_gpu_batch_queue_wait_seconds",
+    documentation="항목이 제출된 뒤 모델 호출이 시작되기까지 대기한 시간",
+    labelnames=["model"],
+    buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0),
+)
+
+
+class _Item:
+    __slots__ = ("inputs", "future", "submitted_at")
+
+    def __init__(self, inputs: np.ndarray):
+        self.inputs = inputs
+        self.future: Future = Future()
+        self.submitted_at = time.time()
+
+
+class MicroBatcher:
+    """여러 요청에서 제출된 입력을 모아 한 번의 모델 호출로 처리하는 적응형 마이크로 배처
+
+    제출된 항목은 첫 번째 축(행) 방향으로 이어 붙여 predict_fn에 전달되며, 결과는 다시
+    항목별 행 수만큼 나누어 각 Future에 설정됩니다. 배치는 행 수가 max_batch_size에 도달하거나
+    첫 항목이 들어온 뒤 max_latency_ms가 지나면 실행됩니다. 모델 호출은 전용 스레드 하나에서만
+    이루어지므로 API 스레드들이 동시에 모델을 호출하지 않습니다.
+    """
+
+    def __init__(self, name: str, predict_fn: Callable[[np.ndarray], np.ndarray],
+                 max_batch_size: int = 32, max_latency_ms: float = 10):
+        self.name = name
+        self.predict_fn = predict_fn
+        self.max_batch_size = max_batch_size
+        self.max_latency = max_latency_ms / 1000.0
+        self._queue: "queue.Queue[_Item]" = queue.Queue()
+        self._pending: Optional[_Item] = None
+        self._thread = threading.Thread(target=self._run, name=f"batcher-{name}", daemon=True)
+        self._thread.start()
+
+    def submit(self, inputs: np.ndarray) -> Future:
+        """입력 행 묶음 제출 (결과는 같은 행 수의 배열로 Future에 설정됨)"""
+        item = _Item(inputs)
+        self._queue.put(item)
+        return item.future
+
+    def predict(self, inputs_list: List[np.ndarray]) -> List[np.ndarray]:
+        """여러 입력을 제출하고 모든 결과를 기다림"""
+        futures = [self.submit(inputs) for inputs in inputs_list]
+        return [future.result() for future in futures]
+
+    def _next_batch(self) -> List[_Item]:
+        first = self._pending or self._queue.get()
+        self._pending = None
+        batch = [first]
+        rows = len(first.inputs)
+        deadline = first.submitted_at + self.max_latency
+
+        while rows < self.max_batch_size:
+            remaining = deadline - time.time()
+            try:
+                item = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if rows + len(item.inputs) > self.max_batch_size:
+                # 한도를 넘기는 항목은 다음 배치의 첫 항목으로 미룸
+                self._pending = item
+                break
+            batch.append(item)
+            rows += len(item.inputs)
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._next_batch()
+            start_time = time.time()
+            rows = sum(len(item.inputs) for item in batch)
+            BATCH_SIZE_HISTOGRAM.labels(model=self.name).observe(rows)
+            BATCH_REQUESTS_HISTOGRAM.labels(model=self.name).observe(len(batch))
+            for item in batch:
+                QUEUE_WAIT_HISTOGRAM.labels(model=self.name).observe(start_time - item.submitted_at)
+
+            try:
+                outputs = self.predict_fn(np.concatenate([item.inputs for item in batch], axis=0))
+            except Exception as e:
+                logger.error(f"{self.name} 배치 추론 오류 ({len(batch)}개 항목, {rows}행): {e}")
+                for item in batch:
+                    item.future.set_exception(e)
+                continue
+
+            offset = 0
+            for item in batch:
+                item.future.set_result(outputs[offset:offset + len(item.inputs)])
+                offset += len(item.inputs)
+            logger.debug(f"{self.name} 배치 추론: {len(batch)}개 항목, {rows}행, {time.time() - start_time:.3f}초")
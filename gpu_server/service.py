@@ -3,10 +3,18 @@ import numpy as np
 import tensorflow as tf
 import librosa
 import os
+import json
+import base64
+import time
 import logging
+import threading
 from tensorflow.keras.models import load_model
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional, Generator
 import crepe
+import crepe.core
+import resampy
+
+from batching import MicroBatcher
 
 # 로깅 설정
 logging.basicConfig(level=logging.INFO)
@@ -16,6 +24,36 @@ logger = logging.getLogger(__name__)
 MODEL_DIR = os.environ.get("MODEL_DIR", "models")
 MODEL_PATH = os.path.join(MODEL_DIR, "guitar_technique_classifier.keras")
 
+# 요청 간 마이크로 배칭 설정
+# 기법 모델 한 번 호출에 묶을 최대 스펙트로그램 수
+TECHNIQUE_MAX_BATCH_SIZE = int(os.environ.get("TECHNIQUE_MAX_BATCH_SIZE", 32))
+# CREPE 모델 한 번 호출에 묶을 최대 프레임 수 (세그먼트 하나가 수십~수백 프레임)
+CREPE_MAX_BATCH_FRAMES = int(os.environ.get("CREPE_MAX_BATCH_FRAMES", 2048))
+# 첫 입력이 들어온 뒤 배치를 채우기 위해 기다리는 최대 시간 (밀리초)
+BATCH_MAX_LATENCY_MS = float(os.environ.get("BATCH_MAX_LATENCY_MS", 10))
+CREPE_MODEL_CAPACITY = os.environ.get("CREPE_MODEL_CAPACITY", "full")
+CREPE_SAMPLE_RATE = 16000
+CREPE_FRAME_LENGTH = 1024
+
+# 시작 시 워밍업 및 그래프 컴파일 설정
+# 워밍업이 끝나기 전까지 /readyz는 준비되지 않음(503)을 반환합니다
+WARMUP_ENABLED = os.environ.get("WARMUP_ENABLED", "true").lower() == "true"
+# 모델 호출을 고정 입력 시그니처의 tf.function으로 감쌈 (Keras predict의 호출별 오버헤드 제거)
+TF_FUNCTION_ENABLED = os.environ.get("TF_FUNCTION_ENABLED", "false").lower() == "true"
+# tf.function을 XLA로 컴파일 (배치는 2의 거듭제곱 크기로 패딩하여 워밍업한 형태만 실행)
+TF_JIT_COMPILE = os.environ.get("TF_JIT_COMPILE", "false").lower() == "true"
+# CPU 전용 호스트에서의 TensorFlow 스레드 수 (0: TensorFlow 기본값)
+TF_INTRA_OP_THREADS = int(os.environ.get("TF_INTRA_OP_THREADS", 0))
+TF_INTER_OP_THREADS = int(os.environ.get("TF_INTER_OP_THREADS", 0))
+
+# TensorFlow 스레드 설정 (연산 실행 전에 설정해야 함)
+if TF_INTRA_OP_THREADS:
+    tf.config.threading.set_intra_op_parallelism_threads(TF_INTRA_OP_THREADS)
+if TF_INTER_OP_THREADS:
+    tf.config.threading.set_inter_op_parallelism_threads(TF_INTER_OP_THREADS)
+if TF_INTRA_OP_THREADS or TF_INTER_OP_THREADS:
+    logger.info(f"TensorFlow 스레드 설정: intra_op={TF_INTRA_OP_THREADS}, inter_op={TF_INTER_OP_THREADS}")
+
 # GPU 메모리 설정
 gpus = tf.config.experimental.list_physical_devices('GPU')
 if gpus:
@@ -42,6 +80,41 @@ def wav_to_spectrogram(y, sr=22050, n_fft=512, hop_length=20, n_mels=128, target
     return S_db
 
 
+def batch_buckets(max_batch_size):
+    """워밍업/패딩에 사용할 배치 크기 목록 (2의 거듭제곱, 마지막은 최대 배치 크기)"""
+    buckets = []
+    size = 1
+    while size < max_batch_size:
+        buckets.append(size)
+        size *= 2
+    buckets.append(max_batch_size)
+    return buckets
+
+
+def decode_array(encoded):
+    """워커가 보낸 {"data": base64, "dtype", "shape"} 형식을 float32 배열로 디코딩 (workers/gpu_payload.py 참고)"""
+    array = np.frombuffer(base64.b64decode(encoded["data"]), dtype=encoded.get("dtype", "float16"))
+    return array.reshape(encoded["shape"]).astype(np.float32)
+
+
+def crepe_frames(y, sr=22050, step_size=10, center=True):
+    """crepe.core.get_activation과 동일한 전처리로 CREPE 입력 프레임 생성 (16kHz, 1024 샘플, 정규화)"""
+    if sr != CREPE_SAMPLE_RATE:
+        y = resampy.resample(y, sr, CREPE_SAMPLE_RATE)
+    if center:
+        y = np.pad(y, CREPE_FRAME_LENGTH // 2, mode='constant', constant_values=0)
+    
+    hop_length = int(CREPE_SAMPLE_RATE * step_size / 1000)
+    n_frames = 1 + int((len(y) - CREPE_FRAME_LENGTH) / hop_length)
+    frames = np.lib.stride_tricks.as_strided(
+        y, shape=(CREPE_FRAME_LENGTH, n_frames), strides=(y.itemsize, hop_length * y.itemsize)
+    )
+    frames = frames.transpose().astype(np.float32)
+    frames -= np.mean(frames, axis=1)[:, np.newaxis]
+    frames /= np.clip(np.std(frames, axis=1)[:, np.newaxis], 1e-8, None)
+    return frames
+
+
 @bentoml.service(
     name="maple_audio_gpu_inference",
     traffic={"timeout": 300}
@@ -62,9 +135,205 @@ class MapleAudioGPUInferenceService:
         except Exception as e:
             logger.error(f"모델 로드 오류: {e}")
             self.technique_model = None
+        
+        # CREPE 모델은 첫 요청이 아닌 시작 시 로드
+        self.crepe_model = crepe.core.build_and_load_model(CREPE_MODEL_CAPACITY)
+        logger.info(f"CREPE 모델 로드 완료: {CREPE_MODEL_CAPACITY}")
+        
+        self.technique_buckets = batch_buckets(TECHNIQUE_MAX_BATCH_SIZE)
+        self.crepe_buckets = batch_buckets(CREPE_MAX_BATCH_FRAMES)
+        self._technique_fn = None
+        self._crepe_fn = None
+        if TF_FUNCTION_ENABLED or TF_JIT_COMPILE:
+            self._crepe_fn = tf.function(
+                lambda frames: self.crepe_model(frames, training=False),
+                input_signature=[tf.TensorSpec([None, CREPE_FRAME_LENGTH], tf.float32)],
+                jit_compile=TF_JIT_COMPILE,
+            )
+            if self.technique_model is not None:
+                self._technique_fn = tf.function(
+                    lambda specs: self.technique_model(specs, training=False),
+                    input_signature=[tf.TensorSpec([None, 128, 960, 1], tf.float32)],
+                    jit_compile=TF_JIT_COMPILE,
+                )
+            logger.info(f"모델 호출 tf.function 사용 (XLA 컴파일: {TF_JIT_COMPILE})")
+        
+        # 동시 요청의 입력을 모아 모델을 한 번에 호출하는 배처
+        self.technique_batcher: Optional[MicroBatcher] = None
+        if self.technique_model is not None:
+            self.technique_batcher = MicroBatcher(
+                "technique", self._run_technique_model,
+                max_batch_size=TECHNIQUE_MAX_BATCH_SIZE, max_latency_ms=BATCH_MAX_LATENCY_MS
+            )
+        self.crepe_batcher = MicroBatcher(
+            "crepe", self._run_crepe_model,
+            max_batch_size=CREPE_MAX_BATCH_FRAMES, max_latency_ms=BATCH_MAX_LATENCY_MS
+        )
+            
+        # 모든 모델을 지원하는 배치 크기마다 한 번씩 실행하는 워밍업 (백그라운드)
+        self._ready = threading.Event()
+        if WARMUP_ENABLED:
+            threading.Thread(target=self._warmup, name="model-warmup", daemon=True).start()
+        else:
+            self._ready.set()
             
         logger.info("MapleAudioGPUInferenceService 초기화 완료")
 
+    def __is_ready__(self) -> bool:
+        """BentoML /readyz 확인 (워밍업이 끝난 뒤에만 준비 완료)"""
+        return self._ready.is_set()
+
+    def _warmup(self):
+        """모든 모델을 지원하는 배치 크기로 한 번씩 실행하여 그래프 생성/컴파일과 커널 초기화를 미리 수행"""
+        start_time = time.time()
+        try:
+            # librosa/resampy 전처리 경로도 한 번 실행 (numba JIT 등)
+            dummy = (0.1 * np.sin(2 * np.pi * 440 * np.arange(22050 // 2) / 22050)).astype(np.float32)
+            frames = crepe_frames(dummy, 22050)
+            for size in self.crepe_buckets:
+                self._run_crepe_model(np.resize(frames, (size, CREPE_FRAME_LENGTH)))
+            logger.info(f"CREPE 워밍업 완료: 배치 크기 {self.crepe_buckets}")
+            
+            if self.technique_model is not None:
+                spec = self._technique_input(dummy, 22050)
+                for size in self.technique_buckets:
+                    self._run_technique_model(np.repeat(spec, size, axis=0))
+                logger.info(f"기법 모델 워밍업 완료: 배치 크기 {self.technique_buckets}")
+        except Exception as e:
+            logger.error(f"모델 워밍업 오류 (준비 완료로 전환): {e}")
+        finally:
+            self._ready.set()
+            logger.info(f"모델 워밍업 종료, 소요 시간: {time.time() - start_time:.2f}초")
+
+    @staticmethod
+    def _run_in_buckets(fn, inputs: np.ndarray, buckets: List[int]) -> np.ndarray:
+        """입력을 최대 배치 크기 단위로 나누고 워밍업한 크기로 0 패딩하여 컴파일된 함수 실행"""
+        max_size = buckets[-1]
+        outputs = []
+        for start in range(0, len(inputs), max_size):
+            chunk = inputs[start:start + max_size]
+            size = next(bucket for bucket in buckets if bucket >= len(chunk))
+            if size > len(chunk):
+                padding = np.zeros((size - len(chunk),) + chunk.shape[1:], dtype=np.float32)
+                chunk = np.concatenate([chunk, padding], axis=0)
+            outputs.append(fn(tf.convert_to_tensor(chunk, dtype=tf.float32)).numpy()[:min(max_size, len(inputs) - start)])
+        return np.concatenate(outputs, axis=0)
+
+    def _run_technique_model(self, specs: np.ndarray) -> np.ndarray:
+        """쌓인 스펙트로그램 배치 (N, 128, 960, 1)에 대한 기법 모델 호출"""
+        if self._technique_fn is not None:
+            return self._run_in_buckets(self._technique_fn, specs, self.technique_buckets)
+        return self.technique_model.predict(specs, batch_size=len(specs), verbose=0)
+
+    def _run_crepe_model(self, frames: np.ndarray) -> np.ndarray:
+        """쌓인 프레임 배치 (N, 1024)에 대한 CREPE 모델 호출"""
+        if self._crepe_fn is not None:
+            return self._run_in_buckets(self._crepe_fn, frames, self.crepe_buckets)
+        return self.crepe_model.predict(frames, batch_size=len(frames), verbose=0)
+
+    def _technique_input(self, segment: np.ndarray, sample_rate: int) -> Optional[np.ndarray]:
+        """기법 모델 입력 (1, 128, 960, 1) 생성. 너무 짧은 세그먼트는 None"""
+        if len(segment) < sample_rate * 0.01:
+            return None
+        
+        spec = wav_to_spectrogram(segment, sr=sample_rate)
+        spec = (spec - np.min(spec)) / (np.max(spec) - np.min(spec) + 1e-8)
+        spec = spec[..., np.newaxis]
+        return np.expand_dims(spec, axis=0).astype(np.float32)
+
+    def _techniques_from_prediction(self, pred: np.ndarray) -> List[str]:
+        pred_binary = (pred > 0.5).astype(int)
+        predicted_techniques = [self.techniques[i] for i in range(len(pred_binary[0])) if pred_binary[0][i] == 1]
+        return predicted_techniques if predicted_techniques else ["normal"]
+
+    @staticmethod
+    def _pitch_from_activation(activation: np.ndarray) -> float:
+        """crepe.predict(viterbi=True)와 동일한 방식으로 활성값에서 평균 음정 계산"""
+        confidence = activation.max(axis=1)
+        cents = crepe.core.to_viterbi_cents(activation)
+        frequency = 10 * 2 ** (cents / 1200)
+        frequency[np.isnan(frequency)] = 0
+        
+        if np.any(confidence > 0.5):
+            avg_freq = np.mean(frequency[confidence > 0.5])
+            return float(avg_freq) if not np.isnan(avg_freq) else 0.0
+        return 0.0
+
+    def _predict_techniques_batched(self, segments: List[np.ndarray], sample_rate: int) -> List[List[str]]:
+        """세그먼트들의 스펙트로그램을 배처에 제출하고 기법 예측 결과 수집"""
+        if self.technique_batcher is None:
+            return [["error"] for _ in segments]
+        futures = []
+        for i, segment in enumerate(segments):
+            try:
+                spec = self._technique_input(segment, sample_rate)
+                futures.append(self.technique_batcher.submit(spec) if spec is not None else None)
+            except Exception as e:
+                logger.error(f"세그먼트 {i} 스펙트로그램 생성 오류: {e}")
+                futures.append(e)
+        return self._collect_technique_predictions(futures)
+
+    def _predict_techniques_from_mels(self, mels: List[Optional[Dict[str, Any]]]) -> List[List[str]]:
+        """워커에서 계산한 정규화 멜 스펙트로그램 (128 x 960)을 배처에 제출하고 기법 예측 결과 수집"""
+        if self.technique_batcher is None:
+            return [["error"] for _ in mels]
+        futures = []
+        for i, mel in enumerate(mels):
+            if mel is None:
+                # 너무 짧은 세그먼트
+                futures.append(None)
+                continue
+            try:
+                spec = decode_array(mel)[np.newaxis, ..., np.newaxis]
+                futures.append(self.technique_batcher.submit(spec))
+            except Exception as e:
+                logger.error(f"세그먼트 {i} 멜 스펙트로그램 디코딩 오류: {e}")
+                futures.append(e)
+        return self._collect_technique_predictions(futures)
+
+    def _collect_technique_predictions(self, futures: List[Any]) -> List[List[str]]:
+        """배처 Future 리스트를 기법 예측 결과로 변환 (None: 짧은 세그먼트, 예외: 입력 생성 오류)"""
+        predictions = []
+        for i, future in enumerate(futures):
+            if future is None:
+                predictions.append(["unknown"])
+            elif isinstance(future, Exception):
+                predictions.append(["error"])
+            else:
+                try:
+                    predictions.append(self._techniques_from_prediction(future.result()))
+                except Exception as e:
+                    logger.error(f"세그먼트 {i} 기법 예측 오류: {e}")
+                    predictions.append(["error"])
+        return predictions
+
+    def _crepe_pitches_batched(self, segments: List[np.ndarray], sample_rate: int) -> List[float]:
+        """세그먼트들의 CREPE 프레임을 배처에 제출하고 평균 음정 수집"""
+        futures = []
+        for i, segment in enumerate(segments):
+            if len(segment) < sample_rate * 0.01:
+                futures.append(None)
+                continue
+            try:
+                futures.append(self.crepe_batcher.submit(crepe_frames(segment, sample_rate)))
+            except Exception as e:
+                logger.error(f"세그먼트 {i} CREPE 프레임 생성 오류: {e}")
+                futures.append(e)
+        
+        pitches = []
+        for i, future in enumerate(futures):
+            if future is None:
+                pitches.append(0.0)
+            elif isinstance(future, Exception):
+                pitches.append(-1.0)  # 오류 표시
+            else:
+                try:
+                    pitches.append(self._pitch_from_activation(future.result()))
+                except Exception as e:
+                    logger.error(f"세그먼트 {i} CREPE 음정 추출 오류: {e}")
+                    pitches.append(-1.0)  # 오류 표시
+        return pitches
+
     @bentoml.api
     def predict_techniques(self, segments: List[List[float]], sample_rate: int = 22050) -> List[List[str]]:
         """오디오 세그먼트에서 기타 연주 기법을 예측
@@ -81,29 +350,9 @@ class MapleAudioGPUInferenceService:
             return [["error"] for _ in segments]
         
         logger.info(f"기법 예측 요청: {len(segments)} 개 세그먼트")
-        predictions = []
-        
-        for i, segment_data in enumerate(segments):
-            try:
-                segment = np.array(segment_data)
-                
-                if len(segment) < sample_rate * 0.01:
-                    predictions.append(["unknown"])
-                    continue
-                
-                spec = wav_to_spectrogram(segment, sr=sample_rate)
-                spec = (spec - np.min(spec)) / (np.max(spec) - np.min(spec) + 1e-8)
-                spec = spec[..., np.newaxis]
-                spec = np.expand_dims(spec, axis=0)
-                
-                pred = self.technique_model.predict(spec, verbose=0)
-                pred_binary = (pred > 0.5).astype(int)
-                predicted_techniques = [self.techniques[i] for i in range(len(pred_binary[0])) if pred_binary[0][i] == 1]
-                
-                predictions.append(predicted_techniques if predicted_techniques else ["normal"])
-            except Exception as e:
-                logger.error(f"세그먼트 {i} 기법 예측 오류: {e}")
-                predictions.append(["error"])
+        predictions = self._predict_techniques_batched(
+            [np.asarray(segment_data, dtype=np.float32) for segment_data in segments], sample_rate
+        )
         
         logger.info(f"기법 예측 완료: {len(predictions)} 개 결과")
         return predictions
@@ -120,34 +369,112 @@ class MapleAudioGPUInferenceService:
             추출된 음정 주파수 리스트 (Hz)
         """
         logger.info(f"CREPE 음정 추출 요청: {len(segments)} 개 세그먼트")
-        pitches = []
+        pitches = self._crepe_pitches_batched(
+            [np.asarray(segment_data, dtype=np.float32) for segment_data in segments], sample_rate
+        )
         
-        for i, segment_data in enumerate(segments):
-            try:
-                segment = np.array(segment_data)
-                
-                if len(segment) < sample_rate * 0.01:
-                    pitches.append(0.0)
-                    continue
-                
-                time, frequency, confidence, activation = crepe.predict(
-                    segment, sample_rate, viterbi=True, center=True, step_size=10
-                )
-                
-                if np.any(confidence > 0.5):
-                    avg_freq = np.mean(frequency[confidence > 0.5])
-                    pitch = float(avg_freq) if not np.isnan(avg_freq) else 0.0
-                else:
-                    pitch = 0.0
-                
-                pitches.append(pitch)
-            except Exception as e:
-                logger.error(f"세그먼트 {i} CREPE 음정 추출 오류: {e}")
-                pitches.append(-1.0)  # 오류 표시
+        logger.info(f"CREPE 음정 추출 완료: {len(pitches)} 개 결과")
+        return pitches
+
+    @bentoml.api
+    def analyze_segments(self, segments: List[List[float]], sample_rate: int = 22050) -> Dict[str, Any]:
+        """한 번의 요청으로 CREPE 음정 추출과 기법 예측을 함께 수행
+        
+        세그먼트는 한 번만 업로드/디코딩되어 두 모델이 함께 사용합니다.
+        
+        Args:
+            segments: 오디오 세그먼트 리스트 (각 세그먼트는 float 리스트)
+            sample_rate: 오디오 샘플링 레이트 (Hz)
+            
+        Returns:
+            {"pitches": 음정 주파수 리스트 (Hz), "techniques": 기법 리스트}
+        """
+        logger.info(f"통합 분석 요청: {len(segments)} 개 세그먼트")
+        # 한 번만 디코딩하여 두 모델에서 공유
+        decoded = [np.asarray(segment_data, dtype=np.float32) for segment_data in segments]
+        
+        pitches = self._crepe_pitches_batched(decoded, sample_rate)
+        if self.technique_model is None:
+            predictions = [["error"] for _ in segments]
+        else:
+            predictions = self._predict_techniques_batched(decoded, sample_rate)
+        
+        logger.info(f"통합 분석 완료: {len(pitches)} 개 결과")
+        return {"pitches": pitches, "techniques": predictions}
+
+    @bentoml.api
+    def predict_techniques_compact(self, segments: List[Optional[Dict[str, Any]]], sample_rate: int = 22050,
+                                   input_type: str = "audio") -> List[List[str]]:
+        """float16 인코딩 입력으로 기법 예측 (전송량 절감용)
+        
+        Args:
+            segments: 인코딩된 배열 리스트 ({"data": base64, "dtype", "shape"})
+            sample_rate: 오디오 샘플링 레이트 (Hz, input_type이 "audio"일 때 사용)
+            input_type: "audio" (원본 레이트 오디오) 또는 "mel" (워커에서 계산한 정규화 멜 스펙트로그램, 짧은 세그먼트는 null)
+            
+        Returns:
+            예측된 기법 리스트 (각 세그먼트별 문자열 리스트)
+        """
+        if self.technique_model is None:
+            logger.error("기법 분류 모델이 로드되지 않았습니다.")
+            return [["error"] for _ in segments]
+        
+        logger.info(f"기법 예측 요청 ({input_type}): {len(segments)} 개 세그먼트")
+        if input_type == "mel":
+            predictions = self._predict_techniques_from_mels(segments)
+        else:
+            predictions = self._predict_techniques_batched([decode_array(segment) for segment in segments], sample_rate)
+        
+        logger.info(f"기법 예측 완료: {len(predictions)} 개 결과")
+        return predictions
+
+    @bentoml.api
+    def extract_pitch_with_crepe_compact(self, segments: List[Dict[str, Any]], sample_rate: int = 16000) -> List[float]:
+        """float16 인코딩 오디오로 CREPE 음정 추출 (워커가 16kHz로 다운샘플링하여 전송)
+        
+        Args:
+            segments: 인코딩된 오디오 리스트 ({"data": base64, "dtype", "shape"})
+            sample_rate: 오디오 샘플링 레이트 (Hz)
+            
+        Returns:
+            추출된 음정 주파수 리스트 (Hz)
+        """
+        logger.info(f"CREPE 음정 추출 요청 (compact): {len(segments)} 개 세그먼트")
+        pitches = self._crepe_pitches_batched([decode_array(segment) for segment in segments], sample_rate)
         
         logger.info(f"CREPE 음정 추출 완료: {len(pitches)} 개 결과")
         return pitches
 
+    @bentoml.api
+    def analyze_segments_compact(self, segments: List[Dict[str, Any]], sample_rate: int = 22050,
+                                 mels: Optional[List[Optional[Dict[str, Any]]]] = None) -> Dict[str, Any]:
+        """float16 인코딩 입력으로 CREPE 음정 추출과 기법 예측을 함께 수행
+        
+        mels가 주어지면 기법은 멜 스펙트로그램에서, 음정은 segments(보통 16kHz)에서 추론합니다.
+        mels가 없으면 원본 레이트의 segments 하나로 두 모델을 모두 실행합니다.
+        
+        Args:
+            segments: 인코딩된 오디오 리스트 ({"data": base64, "dtype", "shape"})
+            sample_rate: segments의 샘플링 레이트 (Hz)
+            mels: 인코딩된 정규화 멜 스펙트로그램 리스트 (선택 사항)
+            
+        Returns:
+            {"pitches": 음정 주파수 리스트 (Hz), "techniques": 기법 리스트}
+        """
+        logger.info(f"통합 분석 요청 (compact): {len(segments)} 개 세그먼트")
+        decoded = [decode_array(segment) for segment in segments]
+        
+        pitches = self._crepe_pitches_batched(decoded, sample_rate)
+        if self.technique_model is None:
+            predictions = [["error"] for _ in segments]
+        elif mels is not None:
+            predictions = self._predict_techniques_from_mels(mels)
+        else:
+            predictions = self._predict_techniques_batched(decoded, sample_rate)
+        
+        logger.info(f"통합 분석 완료: {len(pitches)} 개 결과")
+        return {"pitches": pitches, "techniques": predictions}
+
     @bentoml.api
     def extract_pitch_with_pyin(self, segments: List[List[float]], sample_rate: int = 22050) -> List[float]:
         """pYIN 알고리즘을 사용하여 오디오 세그먼트의 음정 추출
@@ -160,12 +487,17 @@ class MapleAudioGPUInferenceService:
             추출된 음정 주파수 리스트 (Hz)
         """
         logger.info(f"pYIN 음정 추출 요청: {len(segments)} 개 세그먼트")
+        pitches = self._pyin_pitches([np.array(segment_data) for segment_data in segments], sample_rate)
+        
+        logger.info(f"pYIN 음정 추출 완료: {len(pitches)} 개 결과")
+        return pitches
+
+    def _pyin_pitches(self, segments: List[np.ndarray], sample_rate: int) -> List[float]:
+        """디코딩된 세그먼트들의 pYIN 평균 음정"""
         pitches = []
         
-        for i, segment_data in enumerate(segments):
+        for i, segment in enumerate(segments):
             try:
-                segment = np.array(segment_data)
-                
                 if len(segment) < sample_rate * 0.01:
                     pitches.append(0.0)
                     continue
@@ -186,5 +518,52 @@ class MapleAudioGPUInferenceService:
                 logger.error(f"세그먼트 {i} pYIN 음정 추출 오류: {e}")
                 pitches.append(-1.0)  # 오류 표시
         
-        logger.info(f"pYIN 음정 추출 완료: {len(pitches)} 개 결과")
-        return pitches 
\ No newline at end of file
+        return pitches
+
+    @bentoml.api
+    def stream_segments(self, op: str, segments: List[Any], sample_rate: int = 22050, input_type: str = "audio",
+                        mels: Optional[List[Optional[Dict[str, Any]]]] = None,
+                        chunk_size: int = 10) -> Generator[str, None, None]:
+        """세그먼트를 chunk_size개씩 처리하여 결과를 줄 단위 JSON(NDJSON)으로 스트리밍
+        
+        각 줄은 {"start": 시작 인덱스, "results": 결과}이며 마지막 줄은 {"done": true, "count": 세그먼트 수}입니다.
+        클라이언트는 연결이 끊겨도 받은 결과를 유지하고 나머지 세그먼트만 다시 요청할 수 있습니다.
+        
+        Args:
+            op: "techniques", "crepe", "pyin", "analyze"
+            segments: float 리스트 또는 인코딩된 배열 ({"data": base64, "dtype", "shape"}) 리스트
+            sample_rate: segments의 샘플링 레이트 (Hz)
+            input_type: 기법 예측 입력 형식 ("audio" 또는 "mel", op가 "techniques"일 때 사용)
+            mels: 인코딩된 정규화 멜 스펙트로그램 리스트 (op가 "analyze"일 때 선택 사항)
+            chunk_size: 한 줄에 담을 세그먼트 수
+            
+        Yields:
+            NDJSON 한 줄
+        """
+        logger.info(f"스트리밍 요청 ({op}): {len(segments)} 개 세그먼트, 청크 크기: {chunk_size}")
+        chunk_size = max(1, chunk_size)
+        
+        for start in range(0, len(segments), chunk_size):
+            chunk = segments[start:start + chunk_size]
+            if op == "techniques" and input_type == "mel":
+                results = self._predict_techniques_from_mels(chunk)
+            else:
+                decoded = [decode_array(s) if isinstance(s, dict) else np.asarray(s, dtype=np.float32) for s in chunk]
+                if op == "techniques":
+                    results = self._predict_techniques_batched(decoded, sample_rate)
+                elif op == "crepe":
+                    results = self._crepe_pitches_batched(decoded, sample_rate)
+                elif op == "pyin":
+                    results = self._pyin_pitches(decoded, sample_rate)
+                elif op == "analyze":
+                    if mels is not None:
+                        techniques = self._predict_techniques_from_mels(mels[start:start + chunk_size])
+                    else:
+                        techniques = self._predict_techniques_batched(decoded, sample_rate)
+                    results = {"pitches": self._crepe_pitches_batched(decoded, sample_rate), "techniques": techniques}
+                else:
+                    raise ValueError(f"알 수 없는 연산: {op}")
+            yield json.dumps({"start": start, "results": results}) + "\n"
+        
+        logger.info(f"스트리밍 완료 ({op}): {len(segments)} 개 결과")
+        yield json.dumps({"done": True, "count": len(segments)}) + "\n"
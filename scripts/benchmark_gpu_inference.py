@@ -0,0 +1,190 @@
+#!/usr/bin/env python
+"""
+GPU 추론 경로 종단 간 지연 벤치마크
+
+로컬 GPU 대역 서버(scripts/gpu_standin_server.py)를 같은 프로세스에서 띄우고, workers.dsp의 추론 함수를
+GPUInferenceClient를 통해 호출하여 다음 항목을 하드웨어 없이 측정합니다:
+
+- serialization: 요청 본문 형식(json/audio/mel)별 직렬화 시간과 전송 바이트
+- batching: 클라이언트 배치 크기별 종단 간 지연
+- fallback: GPU 요청이 실패할 때 로컬 CPU 폴백까지 걸리는 시간
+- concurrency: 여러 스레드가 동시에 호출할 때의 지연 분포
+- streaming: 스트리밍 응답과 연결 끊김 후 재개 비용
+
+사용 예:
+    python scripts/benchmark_gpu_inference.py --segments 200 --latency 0.05 --bandwidth 5000000
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import threading
+
+import numpy as np
+
+from gpu_standin_server import StandinConfig, start_standin_server
+
+# 대역 서버를 먼저 띄워 URL을 정한 뒤 workers 모듈을 import (모듈 로드 시 엔드포인트 풀이 구성됨)
+_server, _url = start_standin_server(StandinConfig())
+os.environ["GPU_INFERENCE_SERVICE_URLS"] = _url
+os.environ.setdefault("GPU_ROUTING_ENABLED", "false")  # 라우터가 CPU를 고르지 않도록 GPU 경로 강제
+
+# 스크립트 위치 기준으로 상위 디렉토리를 Python 경로에 추가 (workers 모듈 import 위해)
+script_dir = os.path.dirname(os.path.abspath(__file__))
+root_dir = os.path.dirname(script_dir)
+sys.path.insert(0, root_dir)
+
+from workers import dsp
+from workers.gpu_client import gpu_client
+from workers.gpu_payload import PAYLOAD_MODES, build_payload
+
+
+def make_segments(count, min_duration=0.1, max_duration=0.5, sr=22050, seed=0):
+    """다양한 길이의 사인파 세그먼트 생성 (A2~A5 사이 랜덤 주파수)"""
+    rng = np.random.default_rng(seed)
+    segments = []
+    for _ in range(count):
+        duration = rng.uniform(min_duration, max_duration)
+        freq = 110 * (2 ** (rng.random() * 3))
+        t = np.arange(int(sr * duration)) / sr
+        segments.append((0.5 * np.sin(2 * np.pi * freq * t)).astype(np.float32))
+    return segments
+
+
+def timed(fn, *args, **kwargs):
+    start_time = time.time()
+    result = fn(*args, **kwargs)
+    return result, time.time() - start_time
+
+
+def summarize(latencies):
+    latencies = sorted(latencies)
+    return (f"p50={np.percentile(latencies, 50):.3f}s p95={np.percentile(latencies, 95):.3f}s "
+            f"max={latencies[-1]:.3f}s")
+
+
+def reset(config, **settings):
+    """대역 서버 주입 설정을 바꾸고 통계 초기화, 클라이언트 상태 복구"""
+    for key, value in settings.items():
+        setattr(config, key, value)
+    config.reset_stats()
+    for endpoint in gpu_client.pool.endpoints:
+        endpoint.healthy = True
+        endpoint.consecutive_failures = 0
+        endpoint.circuit = "closed"
+    gpu_client.service_available = True
+
+
+def bench_serialization(config, segments, sr):
+    print("\n=== serialization: 본문 형식별 직렬화 비용과 전송량 (crepe) ===")
+    base = dict(latency=config.latency, failure_rate=0.0, drop_rate=0.0)
+    for mode in PAYLOAD_MODES:
+        start_time = time.time()
+        _, data = build_payload("crepe", segments, sr, mode)
+        encode_time = time.time() - start_time + timed(json.dumps, data)[1]
+
+        reset(config, **base)
+        gpu_client.payload_mode = mode
+        _, elapsed = timed(dsp.extract_pitch_with_crepe, segments, sr)
+        print(f"{mode:<6} 직렬화 {encode_time:.3f}s, 종단 간 {elapsed:.3f}s, "
+              f"전송 {config.stats['bytes_in']:,} 바이트 ({config.stats['requests']} 요청)")
+    gpu_client.payload_mode = "json"
+
+
+def bench_batching(config, segments, sr, batch_sizes):
+    print("\n=== batching: 클라이언트 배치 크기별 종단 간 지연 (crepe) ===")
+    original = gpu_client.batch_size
+    for batch_size in batch_sizes:
+        reset(config, failure_rate=0.0, drop_rate=0.0)
+        gpu_client.batch_size = batch_size
+        _, elapsed = timed(dsp.extract_pitch_with_crepe, segments, sr)
+        print(f"배치 크기 {batch_size:>4}: {elapsed:.3f}s ({config.stats['requests']} 요청)")
+    gpu_client.batch_size = original
+
+
+def bench_fallback(config, segments, sr):
+    print("\n=== fallback: GPU 실패 시 로컬 폴백 비용 (pyin) ===")
+    reset(config, failure_rate=0.0, drop_rate=0.0)
+    _, gpu_elapsed = timed(dsp.extract_pitch_with_pyin, segments, sr)
+    _, local_elapsed = timed(dsp._extract_pitch_with_pyin_local, segments, sr)
+    reset(config, failure_rate=1.0, drop_rate=0.0)
+    _, fallback_elapsed = timed(dsp.extract_pitch_with_pyin, segments, sr)
+    print(f"GPU 성공 {gpu_elapsed:.3f}s, 로컬만 {local_elapsed:.3f}s, "
+          f"GPU 실패 후 폴백 {fallback_elapsed:.3f}s (폴백 추가 비용 {fallback_elapsed - local_elapsed:.3f}s)")
+
+
+def bench_concurrency(config, segments, sr, threads, calls):
+    print(f"\n=== concurrency: {threads}개 스레드 x {calls}회 호출 (crepe) ===")
+    reset(config, failure_rate=0.0, drop_rate=0.0)
+    latencies = []
+    lock = threading.Lock()
+
+    def worker():
+        for _ in range(calls):
+            _, elapsed = timed(dsp.extract_pitch_with_crepe, segments, sr)
+            with lock:
+                latencies.append(elapsed)
+
+    start_time = time.time()
+    workers = [threading.Thread(target=worker) for _ in range(threads)]
+    for t in workers:
+        t.start()
+    for t in workers:
+        t.join()
+    print(f"총 {time.time() - start_time:.3f}s, {summarize(latencies)}")
+
+
+def bench_streaming(config, segments, sr, drop_rate):
+    print(f"\n=== streaming: 스트리밍 응답과 연결 끊김 재개 (crepe, drop_rate={drop_rate}) ===")
+    progress = []
+    gpu_client.streaming = True
+    for rate in (0.0, drop_rate):
+        reset(config, failure_rate=0.0, drop_rate=rate)
+        progress.clear()
+        result, elapsed = timed(dsp.extract_pitch_with_crepe, segments, sr,
+                                progress_callback=lambda done, total: progress.append(done))
+        print(f"drop_rate={rate}: {elapsed:.3f}s, 결과 {len(result)}개, 진행 보고 {len(progress)}회, "
+              f"요청 {config.stats['requests']}회, 끊김 {config.stats['drops']}회")
+    gpu_client.streaming = False
+
+
+def main():
+    parser = argparse.ArgumentParser(description='GPU 추론 경로 종단 간 지연 벤치마크 (로컬 대역 서버 사용)')
+    parser.add_argument('--segments', type=int, default=100, help='세그먼트 수 (기본값: 100)')
+    parser.add_argument('--latency', type=float, default=0.05, help='요청당 주입 지연 (초)')
+    parser.add_argument('--bandwidth', type=float, default=0.0, help='전송 속도 제한 (바이트/초, 0이면 제한 없음)')
+    parser.add_argument('--batch-sizes', type=str, default='10,50,100,200', help='비교할 배치 크기 (쉼표로 구분)')
+    parser.add_argument('--threads', type=int, default=4, help='동시 호출 스레드 수')
+    parser.add_argument('--calls', type=int, default=3, help='스레드당 호출 횟수')
+    parser.add_argument('--drop-rate', type=float, default=0.1, help='스트리밍 시나리오의 청크당 연결 끊김 확률')
+    parser.add_argument('--scenarios', type=str, default='serialization,batching,fallback,concurrency,streaming',
+                        help='실행할 시나리오 (쉼표로 구분)')
+    args = parser.parse_args()
+
+    sr = 22050
+    config = _server.config
+    config.latency = args.latency
+    config.bandwidth = args.bandwidth
+    config.random.seed(0)
+    segments = make_segments(args.segments, sr=sr)
+    print(f"대역 서버: {_url}, 세그먼트 {len(segments)}개, 주입 지연 {args.latency}s, 대역폭 {args.bandwidth or '무제한'}")
+
+    scenarios = [s.strip() for s in args.scenarios.split(',') if s.strip()]
+    if 'serialization' in scenarios:
+        bench_serialization(config, segments, sr)
+    if 'batching' in scenarios:
+        bench_batching(config, segments, sr, [int(b) for b in args.batch_sizes.split(',')])
+    if 'fallback' in scenarios:
+        bench_fallback(config, segments, sr)
+    if 'concurrency' in scenarios:
+        bench_concurrency(config, segments, sr, args.threads, args.calls)
+    if 'streaming' in scenarios:
+        bench_streaming(config, segments, sr, args.drop_rate)
+
+    _server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+#!/usr/bin/env python
+"""
+GPU 서버 요청 본문 형식별 전송량/지연 비교 스크립트
+
+json(float 리스트), audio(float16 오디오, CREPE는 16kHz), mel(float16 멜 스펙트로그램) 형식으로
+같은 세그먼트를 직렬화했을 때의 바이트 수와 워커 측 인코딩 시간을 비교합니다.
+--url을 지정하면 실제 GPU 서비스에 요청을 보내 왕복 지연과 결과 차이도 측정합니다.
+"""
+
+import os
+import sys
+import json
+import argparse
+import time
+
+import numpy as np
+import requests
+
+# 스크립트 위치 기준으로 상위 디렉토리를 Python 경로에 추가 (workers 모듈 import 위해)
+script_dir = os.path.dirname(os.path.abspath(__file__))
+root_dir = os.path.dirname(script_dir)
+sys.path.insert(0, root_dir)
+
+from workers.gpu_payload import PAYLOAD_MODES, build_payload
+
+
+def make_segments(count: int, min_duration: float, max_duration: float, sr: int = 22050, seed: int = 0):
+    """다양한 길이의 사인파 세그먼트 생성 (A2~A5 사이 랜덤 주파수)"""
+    rng = np.random.default_rng(seed)
+    segments = []
+    for _ in range(count):
+        duration = rng.uniform(min_duration, max_duration)
+        freq = 110 * (2 ** (rng.random() * 3))
+        t = np.arange(int(sr * duration)) / sr
+        segments.append((0.5 * np.sin(2 * np.pi * freq * t)).astype(np.float32))
+    return segments
+
+
+def compare_results(op: str, baseline, result) -> str:
+    """json 형식 결과와의 차이 요약"""
+    if baseline is None or result is None:
+        return "-"
+    if op == "analyze":
+        baseline, result = baseline["pitches"], result["pitches"]
+    if op == "techniques":
+        same = sum(1 for a, b in zip(baseline, result) if a == b)
+        return f"일치 {same}/{len(baseline)}"
+    diffs = [abs(a - b) for a, b in zip(baseline, result) if a > 0 and b > 0]
+    return f"최대 음정 차이 {max(diffs):.2f}Hz" if diffs else "-"
+
+
+def main():
+    parser = argparse.ArgumentParser(description='GPU 서버 요청 본문 형식별 전송량/지연 비교')
+    parser.add_argument('--url', type=str, default=None, help='GPU 추론 서비스 URL (지정하면 실제 요청 지연도 측정)')
+    parser.add_argument('--segments', type=int, default=100, help='세그먼트 수 (기본값: 100)')
+    parser.add_argument('--min-duration', type=float, default=0.1, help='세그먼트 최소 길이 (초)')
+    parser.add_argument('--max-duration', type=float, default=0.5, help='세그먼트 최대 길이 (초)')
+    parser.add_argument('--ops', type=str, default='techniques,crepe,analyze', help='비교할 연산 (쉼표로 구분)')
+    args = parser.parse_args()
+
+    sr = 22050
+    segments = make_segments(args.segments, args.min_duration, args.max_duration, sr)
+    total_samples = sum(len(s) for s in segments)
+    print(f"세그먼트 {len(segments)}개, 총 {total_samples} 샘플 ({total_samples / sr:.1f}초)\n")
+    print(f"{'연산':<11} {'형식':<6} {'API':<34} {'바이트':>12} {'바이트/샘플':>11} {'인코딩(초)':>10} {'왕복(초)':>9}  결과")
+
+    for op in [op.strip() for op in args.ops.split(',') if op.strip()]:
+        baseline = None
+        for mode in PAYLOAD_MODES:
+            start_time = time.time()
+            endpoint, data = build_payload(op, segments, sr, mode)
+            body = json.dumps(data)
+            encode_time = time.time() - start_time
+
+            rtt, result = "-", None
+            if args.url:
+                try:
+                    start_time = time.time()
+                    response = requests.post(f"{args.url.rstrip('/')}/{endpoint}", data=body,
+                                             headers={"Content-Type": "application/json"}, timeout=300)
+                    response.raise_for_status()
+                    result = response.json()
+                    rtt = f"{time.time() - start_time:.3f}"
+                except requests.exceptions.RequestException as e:
+                    rtt = "실패"
+                    print(f"  요청 오류 ({endpoint}): {e}")
+            if mode == "json":
+                baseline = result
+
+            print(f"{op:<11} {mode:<6} {endpoint:<34} {len(body):>12,} {len(body) / total_samples:>11.2f} "
+                  f"{encode_time:>10.3f} {rtt:>9}  {compare_results(op, baseline, result) if mode != 'json' else ''}")
+        print()
+
+
+if __name__ == "__main__":
+    main()
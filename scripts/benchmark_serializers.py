@@ -0,0 +1,128 @@
+#!/usr/bin/env python
+"""
+Celery 직렬화기 벤치마크 (json vs msgpack-numpy)
+
+compare_audio 태스크에서 실제로 오가는 형태의 메시지를 만들어 kombu 직렬화기 레지스트리를 통해
+직렬화/역직렬화 시간과 메시지 크기를 비교합니다.
+
+- compare_audio 요청: 사용자 녹음 WAV bytes + kwargs
+- compare_audio 결과: 발음 시작점/음정/기법 리스트와 점수
+- 캔버스 단계 메시지: NumPy 배열 (json은 지금처럼 리스트로 변환해서 전송)
+
+Redis 브로커는 메시지 본문을 base64로 한 번 더 인코딩하므로 전송 크기도 함께 출력합니다.
+
+사용 예:
+    python scripts/benchmark_serializers.py --duration 30 --notes 300 --repeat 20
+"""
+
+import io
+import os
+import sys
+import time
+import wave
+import argparse
+import statistics
+
+import numpy as np
+
+# 스크립트 위치 기준으로 상위 디렉토리를 Python 경로에 추가 (workers 모듈 import 위해)
+script_dir = os.path.dirname(os.path.abspath(__file__))
+root_dir = os.path.dirname(script_dir)
+sys.path.insert(0, root_dir)
+
+from kombu.serialization import dumps, loads
+
+from workers.serialization import SERIALIZER_NAME, register_msgpack_numpy
+
+
+def make_wav_bytes(duration, sr=22050):
+    """기타 소리와 비슷한 배음 사인파 WAV (16비트 모노)"""
+    t = np.arange(int(duration * sr)) / sr
+    signal = sum(0.3 / k * np.sin(2 * np.pi * 196.0 * k * t) for k in range(1, 6)) * np.exp(-(t % 0.5) * 4)
+    buffer = io.BytesIO()
+    with wave.open(buffer, 'wb') as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(sr)
+        wav.writeframes((signal / np.max(np.abs(signal)) * 32767 * 0.8).astype(np.int16).tobytes())
+    return buffer.getvalue()
+
+
+def make_payloads(duration, notes, sr=22050):
+    """(이름, json용 본문, msgpack-numpy용 본문) 목록"""
+    rng = np.random.default_rng(0)
+    onsets = np.sort(rng.uniform(0, duration, notes))
+    pitches = rng.uniform(80, 1000, notes)
+    techniques = [[str(rng.choice(["normal", "bend", "slide", "hammer", "pull"]))] for _ in range(notes)]
+    features = {"tempo": 120.0, "onsets": onsets.tolist(), "pitches": pitches.tolist(), "techniques": techniques}
+
+    request = ((make_wav_bytes(duration, sr),), {"user_id": "user123", "song_id": "song456",
+                                                 "generate_feedback": False}, {})
+    result = {
+        "user_features": features,
+        "reference_features": features,
+        "scores": {"tempo_match": 98.0, "pitch_match": 87.5, "rhythm_match": 91.2, "technique_match": 80.0,
+                   "overall_score": 88.9},
+        "metadata": {"user_id": "user123", "song_id": "song456", "task_id": "c769e4fd"},
+    }
+    frames = int(duration * sr / 512) + 1
+    stage_arrays = {
+        "pitches": pitches.astype(np.float32),
+        "onsets": onsets,
+        "chroma": rng.random((12, frames), dtype=np.float32),
+    }
+    stage_lists = {name: array.tolist() for name, array in stage_arrays.items()}
+
+    return [
+        ("compare_audio 요청", request, request),
+        ("compare_audio 결과", ((result,), {}, {}), ((result,), {}, {})),
+        ("캔버스 단계 배열", ((stage_lists,), {}, {}), ((stage_arrays,), {}, {})),
+    ]
+
+
+def measure(body, serializer, repeat):
+    """(메시지 크기, 직렬화 ms, 역직렬화 ms). 직렬화할 수 없으면 오류 메시지"""
+    try:
+        content_type, content_encoding, data = dumps(body, serializer=serializer)
+    except Exception as e:
+        return f"직렬화 실패: {e}"
+    encode_times, decode_times = [], []
+    for _ in range(repeat):
+        start_time = time.perf_counter()
+        dumps(body, serializer=serializer)
+        encode_times.append(time.perf_counter() - start_time)
+        start_time = time.perf_counter()
+        loads(data, content_type, content_encoding, accept=[content_type])
+        decode_times.append(time.perf_counter() - start_time)
+    size = len(data.encode() if isinstance(data, str) else data)
+    return size, statistics.median(encode_times) * 1000, statistics.median(decode_times) * 1000
+
+
+def mb(size):
+    return f"{size / 2**20:.2f}MB"
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Celery 직렬화기 메시지 크기/속도 비교')
+    parser.add_argument('--duration', type=float, default=30.0, help='사용자 녹음 길이 (초, 기본값: 30)')
+    parser.add_argument('--notes', type=int, default=300, help='노트(세그먼트) 수 (기본값: 300)')
+    parser.add_argument('--repeat', type=int, default=20, help='측정 반복 횟수 (기본값: 20)')
+    args = parser.parse_args()
+
+    if not register_msgpack_numpy():
+        sys.exit("kombu가 설치되어 있지 않습니다")
+
+    print(f"{'메시지':<18} {'직렬화기':<14} {'크기':>9} {'전송(base64)':>13} {'직렬화':>10} {'역직렬화':>10}")
+    for name, json_body, binary_body in make_payloads(args.duration, args.notes):
+        for serializer, body in (("json", json_body), (SERIALIZER_NAME, binary_body)):
+            measured = measure(body, serializer, args.repeat)
+            if isinstance(measured, str):
+                print(f"{name:<18} {serializer:<14} {measured}")
+                continue
+            size, encode_ms, decode_ms = measured
+            print(f"{name:<18} {serializer:<14} {mb(size):>9} {mb((size + 2) // 3 * 4):>13} "
+                  f"{encode_ms:>8.2f}ms {decode_ms:>8.2f}ms")
+
+
+if __name__ == "__main__":
+    main()
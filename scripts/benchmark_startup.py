@@ -0,0 +1,85 @@
+#!/usr/bin/env python
+"""
+API 게이트웨이/워커 시작 시간 벤치마크
+
+각 모듈을 새 Python 인터프리터에서 import하는 데 걸리는 시간을 여러 번 측정합니다.
+기본적으로 GPU 서비스와 MongoDB 주소를 응답하지 않는 주소로 설정하여, 외부 서비스가 내려가 있을 때
+import가 네트워크 I/O로 멈추지 않는지 확인합니다.
+
+사용 예:
+    python scripts/benchmark_startup.py --repeat 5
+    python scripts/benchmark_startup.py --modules app.main,workers.gpu_client --reachable
+"""
+
+import os
+import sys
+import json
+import argparse
+import statistics
+import subprocess
+
+# 스크립트 위치 기준 상위 디렉토리 (import 대상 모듈 위치)
+script_dir = os.path.dirname(os.path.abspath(__file__))
+root_dir = os.path.dirname(script_dir)
+
+# 라우팅되지 않는 주소 (연결 시도가 타임아웃까지 대기함)
+UNREACHABLE_HOST = "10.255.255.1"
+
+_PROBE = """
+import sys, json, time
+start_time = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - start_time
+print(json.dumps({{"elapsed": elapsed, "modules": len(sys.modules)}}))
+"""
+
+
+def measure(module, env, timeout):
+    """새 인터프리터에서 모듈 import 시간 측정 (초, 로드된 모듈 수). 실패하면 (None, 오류 메시지)"""
+    try:
+        completed = subprocess.run([sys.executable, "-c", _PROBE.format(module=module)], cwd=root_dir, env=env,
+                                   capture_output=True, text=True, timeout=timeout)
+    except subprocess.TimeoutExpired:
+        return None, f"{timeout}초 안에 끝나지 않음"
+    if completed.returncode != 0:
+        return None, completed.stderr.strip().splitlines()[-1] if completed.stderr.strip() else "실패"
+    probe = json.loads(completed.stdout.strip().splitlines()[-1])
+    return probe["elapsed"], probe["modules"]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='API 게이트웨이/워커 모듈 import 시간 측정')
+    parser.add_argument('--modules', type=str, default='app.main,workers.signatures,workers.gpu_client,app.db,workers.tasks',
+                        help='측정할 모듈 (쉼표로 구분)')
+    parser.add_argument('--repeat', type=int, default=3, help='모듈당 측정 횟수 (기본값: 3)')
+    parser.add_argument('--timeout', type=float, default=60.0, help='한 번의 import 제한 시간 (초)')
+    parser.add_argument('--reachable', action='store_true',
+                        help='현재 환경변수의 GPU/MongoDB 주소를 그대로 사용 (기본값: 응답하지 않는 주소로 대체)')
+    args = parser.parse_args()
+
+    env = dict(os.environ)
+    if not args.reachable:
+        env["GPU_INFERENCE_SERVICE_URL"] = f"http://{UNREACHABLE_HOST}:8888"
+        env["GPU_INFERENCE_SERVICE_URLS"] = f"http://{UNREACHABLE_HOST}:8888"
+        env["MONGO_URI"] = f"mongodb://{UNREACHABLE_HOST}:27017/"
+        print(f"GPU 서비스와 MongoDB를 응답하지 않는 주소({UNREACHABLE_HOST})로 설정하고 측정합니다")
+
+    print(f"{'모듈':<22} {'중앙값(초)':>10} {'최소(초)':>9} {'최대(초)':>9} {'모듈 수':>8}")
+    for module in [m.strip() for m in args.modules.split(',') if m.strip()]:
+        timings, loaded = [], 0
+        error = None
+        for _ in range(args.repeat):
+            elapsed, info = measure(module, env, args.timeout)
+            if elapsed is None:
+                error = info
+                break
+            timings.append(elapsed)
+            loaded = info
+        if error:
+            print(f"{module:<22} 실패: {error}")
+            continue
+        print(f"{module:<22} {statistics.median(timings):>10.3f} {min(timings):>9.3f} {max(timings):>9.3f} {loaded:>8}")
+
+
+if __name__ == "__main__":
+    main()
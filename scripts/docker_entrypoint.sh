@@ -84,6 +84,16 @@ else
   echo "SSH 터널 비활성화 (SSH_TUNNEL=true로 설정하면 활성화됨)"
 fi
 
+# Celery 워커 컨테이너에서 추론 사이드카 실행 (모든 워커 프로세스가 모델 하나를 공유)
+if [ "$INFERENCE_SIDECAR_ENABLED" = "true" ]; then
+  case "$*" in
+    *celery*worker*)
+      echo "추론 사이드카 시작: ${INFERENCE_SIDECAR_SOCKET:-/tmp/maple_inference.sock}"
+      python -m workers.inference_sidecar &
+      ;;
+  esac
+fi
+
 # 원래 명령어 실행
 echo "애플리케이션 실행: $@"
 exec "$@" 
\ No newline at end of file
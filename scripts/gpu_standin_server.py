@@ -0,0 +1,242 @@
+#!/usr/bin/env python
+"""
+로컬 GPU 추론 서비스 대역 서버
+
+BentoML GPU 서비스(gpu_server/service.py)와 같은 엔드포인트를 CPU에서 구현한 HTTP 서버입니다.
+SSH 터널이나 GPU 없이 워커의 GPU 클라이언트 경로(직렬화, 배치, 장애 조치, 폴백, 스트리밍)를 점검할 수 있도록
+지연 시간, 대역폭 제한, 실패/연결 끊김을 주입할 수 있습니다.
+
+추론 결과는 실제 모델이 아닌 간단한 계산(FFT 최대 주파수, "normal" 기법)이며, 응답 형식만 실제 서비스와 같습니다.
+
+사용 예:
+    python scripts/gpu_standin_server.py --port 8888 --latency 0.05 --bandwidth 2000000 --failure-rate 0.1
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+
+# 스크립트 위치 기준으로 상위 디렉토리를 Python 경로에 추가 (workers 모듈 import 위해)
+script_dir = os.path.dirname(os.path.abspath(__file__))
+root_dir = os.path.dirname(script_dir)
+sys.path.insert(0, root_dir)
+
+from workers.gpu_payload import decode_array
+
+
+class StandinConfig:
+    """주입할 지연/대역폭/실패 설정과 요청 통계 (실행 중에 바꿀 수 있음)"""
+
+    def __init__(self, latency=0.0, per_segment_latency=0.0, bandwidth=0.0, failure_rate=0.0, drop_rate=0.0,
+                 seed=None):
+        self.latency = latency                          # 요청당 고정 지연 (초)
+        self.per_segment_latency = per_segment_latency  # 세그먼트당 추가 지연 (초)
+        self.bandwidth = bandwidth                      # 요청/응답 전송 속도 제한 (바이트/초, 0이면 제한 없음)
+        self.failure_rate = failure_rate                # 500 응답 확률
+        self.drop_rate = drop_rate                      # 스트리밍 도중 연결을 끊을 확률 (청크마다)
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+        self.reset_stats()
+
+    def reset_stats(self):
+        with self.lock:
+            self.stats = {"requests": 0, "failures": 0, "drops": 0, "segments": 0, "bytes_in": 0, "bytes_out": 0}
+
+    def count(self, key, value=1):
+        with self.lock:
+            self.stats[key] += value
+
+
+def _decode(segment):
+    if isinstance(segment, dict):
+        return decode_array(segment)
+    return np.asarray(segment, dtype=np.float32)
+
+
+def _pitch(segment, sample_rate):
+    """FFT 최대 크기 주파수 (실제 CREPE/pYIN 대신 사용하는 값싼 음정 추정)"""
+    if segment is None or len(segment) < sample_rate * 0.01:
+        return 0.0
+    spectrum = np.abs(np.fft.rfft(segment))
+    return float(np.argmax(spectrum) * sample_rate / len(segment))
+
+
+def _technique(segment, sample_rate, input_type="audio"):
+    if segment is None:
+        return ["unknown"]
+    if input_type == "audio" and len(segment) < sample_rate * 0.01:
+        return ["unknown"]
+    return ["normal"]
+
+
+def run_op(op, segments, sample_rate, input_type="audio", mels=None):
+    """실제 서비스와 같은 형식의 결과 생성"""
+    if op == "techniques":
+        if input_type == "mel":
+            return [_technique(None if m is None else _decode(m), sample_rate, "mel") for m in segments]
+        return [_technique(_decode(s), sample_rate) for s in segments]
+    decoded = [_decode(s) for s in segments]
+    if op in ("crepe", "pyin"):
+        return [_pitch(s, sample_rate) for s in decoded]
+    if op == "analyze":
+        if mels is not None:
+            techniques = [_technique(None if m is None else _decode(m), sample_rate, "mel") for m in mels]
+        else:
+            techniques = [_technique(s, sample_rate) for s in decoded]
+        return {"pitches": [_pitch(s, sample_rate) for s in decoded], "techniques": techniques}
+    raise ValueError(f"알 수 없는 연산: {op}")
+
+
+# API 이름 -> 연산 이름
+ENDPOINT_OPS = {
+    "predict_techniques": "techniques",
+    "predict_techniques_compact": "techniques",
+    "extract_pitch_with_crepe": "crepe",
+    "extract_pitch_with_crepe_compact": "crepe",
+    "extract_pitch_with_pyin": "pyin",
+    "analyze_segments": "analyze",
+    "analyze_segments_compact": "analyze",
+}
+
+
+def make_handler(config):
+    class StandinHandler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, *args):
+            pass
+
+        def _throttle(self, size):
+            if config.bandwidth > 0:
+                time.sleep(size / config.bandwidth)
+
+        def _send_json(self, status, body):
+            data = json.dumps(body).encode()
+            self._throttle(len(data))
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+            config.count("bytes_out", len(data))
+
+        def do_GET(self):
+            if self.path in ("/livez", "/readyz"):
+                self.send_response(200)
+                self.send_header("Content-Length", "2")
+                self.end_headers()
+                self.wfile.write(b"ok")
+            else:
+                self._send_json(404, {"error": "not found"})
+
+        def do_POST(self):
+            raw = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+            config.count("requests")
+            config.count("bytes_in", len(raw))
+            self._throttle(len(raw))
+
+            endpoint = self.path.strip("/")
+            if endpoint != "stream_segments" and endpoint not in ENDPOINT_OPS:
+                self._send_json(404, {"error": f"unknown endpoint: {endpoint}"})
+                return
+            try:
+                body = json.loads(raw)
+            except ValueError as e:
+                self._send_json(400, {"error": str(e)})
+                return
+
+            segments = body.get("segments", [])
+            config.count("segments", len(segments))
+            time.sleep(config.latency + config.per_segment_latency * len(segments))
+            if config.random.random() < config.failure_rate:
+                config.count("failures")
+                self._send_json(500, {"error": "injected failure"})
+                return
+
+            sample_rate = body.get("sample_rate", 22050)
+            if endpoint == "stream_segments":
+                self._stream(body, segments, sample_rate)
+                return
+            result = run_op(ENDPOINT_OPS[endpoint], segments, sample_rate, body.get("input_type", "audio"), body.get("mels"))
+            self._send_json(200, result)
+
+        def _stream(self, body, segments, sample_rate):
+            """NDJSON 청크 스트리밍 (chunked 전송). drop_rate 확률로 청크 사이에서 연결을 끊음"""
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain")
+            self.send_header("Transfer-Encoding", "chunked")
+            self.end_headers()
+
+            def write_line(record):
+                data = (json.dumps(record) + "\n").encode()
+                self._throttle(len(data))
+                self.wfile.write(f"{len(data):x}\r\n".encode() + data + b"\r\n")
+                self.wfile.flush()
+                config.count("bytes_out", len(data))
+
+            chunk_size = max(1, body.get("chunk_size", 10))
+            mels = body.get("mels")
+            for start in range(0, len(segments), chunk_size):
+                if start > 0 and config.random.random() < config.drop_rate:
+                    config.count("drops")
+                    self.close_connection = True
+                    return
+                chunk_mels = mels[start:start + chunk_size] if mels is not None else None
+                results = run_op(body["op"], segments[start:start + chunk_size], sample_rate,
+                                 body.get("input_type", "audio"), chunk_mels)
+                write_line({"start": start, "results": results})
+            write_line({"done": True, "count": len(segments)})
+            self.wfile.write(b"0\r\n\r\n")
+
+    return StandinHandler
+
+
+def start_standin_server(config=None, host="127.0.0.1", port=0):
+    """백그라운드 스레드에서 대역 서버 시작
+
+    Returns:
+        (서버, URL). 서버의 config 속성으로 실행 중에 주입 설정을 바꿀 수 있습니다.
+    """
+    config = config or StandinConfig()
+    server = ThreadingHTTPServer((host, port), make_handler(config))
+    server.daemon_threads = True
+    server.config = config
+    threading.Thread(target=server.serve_forever, name="gpu-standin", daemon=True).start()
+    return server, f"http://{host}:{server.server_address[1]}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description='로컬 GPU 추론 서비스 대역 서버')
+    parser.add_argument('--host', type=str, default='127.0.0.1', help='바인드 주소 (기본값: 127.0.0.1)')
+    parser.add_argument('--port', type=int, default=8888, help='포트 (기본값: 8888)')
+    parser.add_argument('--latency', type=float, default=0.0, help='요청당 고정 지연 (초)')
+    parser.add_argument('--per-segment-latency', type=float, default=0.0, help='세그먼트당 추가 지연 (초)')
+    parser.add_argument('--bandwidth', type=float, default=0.0, help='전송 속도 제한 (바이트/초, 0이면 제한 없음)')
+    parser.add_argument('--failure-rate', type=float, default=0.0, help='500 응답 확률 (0~1)')
+    parser.add_argument('--drop-rate', type=float, default=0.0, help='스트리밍 청크마다 연결을 끊을 확률 (0~1)')
+    parser.add_argument('--seed', type=int, default=None, help='실패 주입 난수 시드')
+    args = parser.parse_args()
+
+    config = StandinConfig(args.latency, args.per_segment_latency, args.bandwidth, args.failure_rate,
+                           args.drop_rate, args.seed)
+    server = ThreadingHTTPServer((args.host, args.port), make_handler(config))
+    server.daemon_threads = True
+    print(f"GPU 대역 서버 시작: http://{args.host}:{args.port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        print(f"요청 통계: {config.stats}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+#!/usr/bin/env python
+"""
+큐 분리 부하 테스트: 레퍼런스 일괄 등록 중에도 사용자 분석 지연 시간이 유지되는지 확인
+
+1. 기준 단계: 사용자 분석(/api/v1/analyze)만 일정 간격으로 보내고 완료까지의 지연 시간을 측정
+2. 부하 단계: 레퍼런스 등록(/api/v1/reference)을 한꺼번에 대량으로 보낸 뒤 같은 방식으로 사용자 분석 측정
+
+두 단계의 p50/p95/최대 지연 시간을 비교합니다. 큐가 분리되어 있으면(README "Queue Topology and Worker
+Profiles") 부하 단계의 p95가 기준 단계와 비슷해야 하고, 모든 태스크가 한 큐를 쓰면 레퍼런스 등록이 끝날 때까지
+사용자 분석이 밀립니다.
+
+사용 예:
+    python scripts/load_test_queues.py --audio test/user/sample.wav --reference-audio test/ref/sample.wav \\
+        --requests 20 --interval 2 --bulk 50
+"""
+
+import time
+import uuid
+import argparse
+import threading
+import statistics
+
+import requests
+
+# 레퍼런스 일괄 등록에 쓰는 테스트용 곡 ID 접두사 (테스트 후 DELETE /api/v1/reference/{song_id}로 정리)
+BULK_SONG_PREFIX = "loadtest-bulk-"
+
+
+def wait_for_task(api_url, task_id, poll_interval, timeout):
+    """작업이 끝날 때까지 상태를 조회하고 (최종 상태, 완료 시각) 반환"""
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        response = requests.get(f"{api_url}/api/v1/tasks/{task_id}", params={"include_result": "false"})
+        if response.status_code == 200 and response.json().get("status") in ("SUCCESS", "FAILURE", "REVOKED"):
+            return response.json()["status"], time.time()
+        time.sleep(poll_interval)
+    return "TIMEOUT", time.time()
+
+
+def run_interactive(api_url, audio_path, count, interval, poll_interval, timeout):
+    """사용자 분석 요청을 interval 간격으로 보내고 요청별 (상태, 지연 시간) 목록 반환"""
+    with open(audio_path, "rb") as f:
+        audio = f.read()
+    results = []
+    lock = threading.Lock()
+
+    def submit_and_wait():
+        start_time = time.time()
+        response = requests.post(f"{api_url}/api/v1/analyze", files={"file": ("sample.wav", audio, "audio/wav")},
+                                 params={"user_id": "loadtest"})
+        if response.status_code != 200:
+            state, finished = f"HTTP {response.status_code}", time.time()
+        else:
+            state, finished = wait_for_task(api_url, response.json()["task_id"], poll_interval, timeout)
+        with lock:
+            results.append((state, finished - start_time))
+
+    threads = []
+    for _ in range(count):
+        thread = threading.Thread(target=submit_and_wait)
+        thread.start()
+        threads.append(thread)
+        time.sleep(interval)
+    for thread in threads:
+        thread.join()
+    return results
+
+
+def submit_bulk(api_url, audio_path, count):
+    """레퍼런스 등록 요청을 한꺼번에 보내고 등록한 곡 ID 목록 반환"""
+    with open(audio_path, "rb") as f:
+        audio = f.read()
+    song_ids = []
+    for _ in range(count):
+        song_id = f"{BULK_SONG_PREFIX}{uuid.uuid4().hex[:8]}"
+        response = requests.post(f"{api_url}/api/v1/reference",
+                                 files={"reference_file": ("reference.wav", audio, "audio/wav")},
+                                 data={"song_id": song_id, "description": "queue load test"})
+        if response.status_code == 200:
+            song_ids.append(song_id)
+        else:
+            print(f"레퍼런스 등록 요청 실패: {response.status_code} {response.text[:200]}")
+    return song_ids
+
+
+def summarize(label, results):
+    latencies = sorted(latency for state, latency in results if state == "SUCCESS")
+    failed = len(results) - len(latencies)
+    if not latencies:
+        print(f"{label}: 성공한 요청 없음 (실패/시간 초과 {failed}개)")
+        return None
+    p95 = latencies[min(len(latencies) - 1, int(round(0.95 * (len(latencies) - 1))))]
+    print(f"{label}: 성공 {len(latencies)}개, 실패 {failed}개, p50 {statistics.median(latencies):.2f}초, "
+          f"p95 {p95:.2f}초, 최대 {latencies[-1]:.2f}초")
+    return p95
+
+
+def main():
+    parser = argparse.ArgumentParser(description='레퍼런스 일괄 등록 중 사용자 분석 지연 시간 측정')
+    parser.add_argument('--api-url', type=str, default='http://localhost:8000', help='API 서버 주소')
+    parser.add_argument('--audio', type=str, required=True, help='사용자 분석에 사용할 오디오 파일')
+    parser.add_argument('--reference-audio', type=str, required=True, help='레퍼런스 등록에 사용할 오디오 파일')
+    parser.add_argument('--requests', type=int, default=20, help='단계별 사용자 분석 요청 수 (기본값: 20)')
+    parser.add_argument('--interval', type=float, default=2.0, help='사용자 분석 요청 간격 (초, 기본값: 2)')
+    parser.add_argument('--bulk', type=int, default=50, help='부하 단계의 레퍼런스 등록 요청 수 (기본값: 50)')
+    parser.add_argument('--poll-interval', type=float, default=0.25, help='상태 조회 간격 (초)')
+    parser.add_argument('--timeout', type=float, default=900.0, help='요청별 최대 대기 시간 (초)')
+    args = parser.parse_args()
+
+    print("기준 단계: 사용자 분석만 실행")
+    baseline = run_interactive(args.api_url, args.audio, args.requests, args.interval, args.poll_interval,
+                               args.timeout)
+
+    print(f"\n부하 단계: 레퍼런스 등록 {args.bulk}개를 보낸 뒤 사용자 분석 실행")
+    song_ids = submit_bulk(args.api_url, args.reference_audio, args.bulk)
+    loaded = run_interactive(args.api_url, args.audio, args.requests, args.interval, args.poll_interval,
+                             args.timeout)
+
+    print()
+    baseline_p95 = summarize("기준", baseline)
+    loaded_p95 = summarize("레퍼런스 일괄 등록 중", loaded)
+    if baseline_p95 and loaded_p95:
+        print(f"p95 변화: {loaded_p95 / baseline_p95:.2f}배")
+    print(f"\n등록한 테스트 레퍼런스 {len(song_ids)}개 (곡 ID 접두사 '{BULK_SONG_PREFIX}')는 "
+          f"DELETE {args.api_url}/api/v1/reference/{{song_id}}로 정리하세요")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+#!/usr/bin/env python
+"""
+Celery prefork 자식 프로세스당 메모리 측정
+
+실행 중인 워커의 부모 PID를 주면 자식 프로세스별 RSS/PSS/공유/전용 메모리를 출력하고,
+현재 남은 메모리로 자식 프로세스를 몇 개 더 띄울 수 있는지 추정합니다.
+--simulate를 주면 Celery 없이 이 프로세스가 prefork 풀처럼 자식 프로세스를 포크하여 로컬 추론을 한 번씩
+실행한 뒤 측정합니다 (--preload로 WORKER_PRELOAD_MODELS 모드와 비교).
+
+PSS는 공유 페이지를 공유하는 프로세스 수로 나눈 값이므로, 자식 프로세스 하나를 추가할 때 늘어나는 메모리는
+전용(private) 메모리에 가깝습니다.
+
+사용 예:
+    python scripts/measure_worker_memory.py --pid $(pgrep -of "celery.*worker")
+    python scripts/measure_worker_memory.py --simulate 4 --preload
+"""
+
+import os
+import sys
+import time
+import argparse
+
+import numpy as np
+
+# 스크립트 위치 기준으로 상위 디렉토리를 Python 경로에 추가 (workers 모듈 import 위해)
+script_dir = os.path.dirname(os.path.abspath(__file__))
+root_dir = os.path.dirname(script_dir)
+sys.path.insert(0, root_dir)
+
+from workers.preload import memory_usage
+
+
+def mb(value):
+    return f"{value / 2**20:,.0f}MB"
+
+
+def child_pids(pid):
+    """직계 자식 프로세스 PID 목록"""
+    children = []
+    try:
+        for tid in os.listdir(f"/proc/{pid}/task"):
+            with open(f"/proc/{pid}/task/{tid}/children") as f:
+                children.extend(int(child) for child in f.read().split())
+    except OSError as e:
+        print(f"자식 프로세스 목록을 읽을 수 없음: {e}")
+    return sorted(set(children))
+
+
+def available_memory():
+    with open("/proc/meminfo") as f:
+        for line in f:
+            if line.startswith("MemAvailable:"):
+                return int(line.split()[1]) * 1024
+    return 0
+
+
+def report(parent_pid, pids):
+    print(f"{'PID':>8} {'RSS':>10} {'PSS':>10} {'공유':>10} {'전용':>10}")
+    parent = memory_usage(parent_pid)
+    print(f"{parent_pid:>8} {mb(parent['rss']):>10} {mb(parent['pss']):>10} {mb(parent['shared']):>10} "
+          f"{mb(parent['private']):>10}  (부모)")
+    usages = []
+    for pid in pids:
+        usage = memory_usage(pid)
+        usages.append(usage)
+        print(f"{pid:>8} {mb(usage['rss']):>10} {mb(usage['pss']):>10} {mb(usage['shared']):>10} "
+              f"{mb(usage['private']):>10}")
+    if not usages:
+        return
+
+    avg_private = sum(u["private"] for u in usages) / len(usages)
+    total_pss = parent["pss"] + sum(u["pss"] for u in usages)
+    available = available_memory()
+    print(f"\n자식 {len(usages)}개: 평균 RSS {mb(sum(u['rss'] for u in usages) / len(usages))}, "
+          f"평균 전용 {mb(avg_private)}, 전체 PSS {mb(total_pss)}")
+    if avg_private > 0:
+        print(f"남은 메모리 {mb(available)} 기준 추가 가능한 자식 프로세스: 약 {int(available // avg_private)}개 "
+              f"(worker_concurrency 조정 참고)")
+
+
+def simulate(count, preload, sr=22050):
+    """prefork 풀처럼 자식 프로세스를 포크하고 각자 로컬 추론을 실행한 뒤 메모리 측정"""
+    from workers import dsp
+    from workers.models import TECHNIQUE_MODEL_PATH
+    from workers.preload import preload_models, verify_after_fork
+
+    if preload:
+        preload_models()
+    segment = (0.5 * np.sin(2 * np.pi * 440 * np.arange(sr // 2) / sr)).astype(np.float32)
+
+    pids = []
+    for _ in range(count):
+        read_fd, write_fd = os.pipe()
+        pid = os.fork()
+        if pid == 0:
+            os.close(read_fd)
+            code = 0
+            try:
+                verify_after_fork()
+                dsp._extract_pitch_with_crepe_local([segment], sr)
+                if os.path.exists(TECHNIQUE_MODEL_PATH):
+                    dsp._predict_techniques_local([segment], TECHNIQUE_MODEL_PATH, sr)
+                os.write(write_fd, b"ok")
+                time.sleep(3600)  # 부모가 측정을 마치고 종료시킬 때까지 대기
+            except BaseException as e:
+                print(f"자식 프로세스 오류: {e}")
+                code = 1
+            finally:
+                os._exit(code)
+        os.close(write_fd)
+        if os.read(read_fd, 2) != b"ok":
+            print(f"자식 프로세스 {pid} 추론 실패")
+        os.close(read_fd)
+        pids.append(pid)
+
+    print(f"\n=== 자식 {count}개, 프리로드 {'사용' if preload else '사용 안 함'} ===")
+    report(os.getpid(), pids)
+    for pid in pids:
+        os.kill(pid, 9)
+        os.waitpid(pid, 0)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Celery prefork 자식 프로세스당 메모리 측정')
+    parser.add_argument('--pid', type=int, default=None, help='Celery 워커 부모 프로세스 PID')
+    parser.add_argument('--simulate', type=int, default=0, help='Celery 없이 포크할 자식 프로세스 수')
+    parser.add_argument('--preload', action='store_true', help='--simulate에서 포크 전에 모델 프리로드')
+    args = parser.parse_args()
+
+    if args.simulate:
+        simulate(args.simulate, args.preload)
+    elif args.pid:
+        report(args.pid, child_pids(args.pid))
+    else:
+        parser.error("--pid 또는 --simulate를 지정하세요")
+
+
+if __name__ == "__main__":
+    main()
@@ -179,6 +179,34 @@ def test_compare(audio_file, song_id, user_id="test-user", generate_feedback=Tru
             return None
 
 # 3. 작업 상태 확인 (무한 대기 버전)
+def iter_task_status(task_id, wait_time=3):
+    """
+    작업 상태를 차례로 반환합니다.
+    서버가 SSE 이벤트 스트림(/tasks/{task_id}/events)을 지원하면 폴링 대신 푸시된 이벤트를 사용하고,
+    사용할 수 없거나 스트림이 끝나면 wait_time 간격의 폴링으로 전환합니다.
+    """
+    try:
+        with requests.get(f"{API_URL}/api/v1/tasks/{task_id}/events", stream=True, timeout=(5, 60)) as response:
+            if response.status_code == 200:
+                for line in response.iter_lines(decode_unicode=True):
+                    if line and line.startswith("data:"):
+                        yield json.loads(line[len("data:"):])
+    except requests.RequestException as e:
+        print(f"이벤트 스트림을 사용할 수 없어 폴링으로 전환합니다: {e}")
+    
+    while True:
+        try:
+            response = requests.get(f"{API_URL}/api/v1/tasks/{task_id}")
+            if response.status_code == 200:
+                yield response.json()
+            else:
+                print(f"오류: {response.status_code} - {response.text}")
+        except Exception as e:
+            print(f"요청 중 예외 발생: {e}")
+        
+        # 일정 시간 대기 후 다시 시도
+        time.sleep(wait_time)
+
 def check_task_status(task_id, wait_time=3):
     """
     작업 상태를 확인하고 결과를 기다립니다.
@@ -186,7 +214,7 @@ def check_task_status(task_id, wait_time=3):
     
     Args:
         task_id: 확인할 작업 ID
-        wait_time: 각 시도 사이의 대기 시간(초) (기본값: 3초)
+        wait_time: 폴링으로 전환된 경우 각 시도 사이의 대기 시간(초) (기본값: 3초)
     """
     print(f"\n작업 상태 확인 중... (ID: {task_id})")
     print(f"작업이 완료될 때까지 계속 확인합니다. 취소하려면 Ctrl+C를 누르세요.")
@@ -197,86 +225,72 @@ def check_task_status(task_id, wait_time=3):
     attempt_count = 0
     
     try:
-        while True:
+        for status in iter_task_status(task_id, wait_time):
             attempt_count += 1
+            current_time = time.time()
+            time_diff = current_time - last_update_time
+            current_status = status.get('status')
+            current_progress = status.get('progress', 0)
             
-            try:
-                response = requests.get(f"{API_URL}/api/v1/tasks/{task_id}")
-                current_time = time.time()
-                time_diff = current_time - last_update_time
-                
-                if response.status_code == 200:
-                    status = response.json()
-                    current_status = status.get('status')
-                    current_progress = status.get('progress', 0)
-                    
-                    # 항상 현재 시도 횟수 출력
-                    print(f"시도 {attempt_count} - 상태: {current_status}, 진행률: {current_progress}%", end="")
-                    
-                    # 상태나 진행률이 변경된 경우
-                    if current_status != last_status or current_progress != last_progress:
-                        print(f" - 업데이트됨", flush=True)
-                        last_status = current_status
-                        last_progress = current_progress
-                        last_update_time = current_time
+            # 항상 현재 시도 횟수 출력
+            print(f"시도 {attempt_count} - 상태: {current_status}, 진행률: {current_progress}%", end="")
+            
+            # 상태나 진행률이 변경된 경우
+            if current_status != last_status or current_progress != last_progress:
+                print(f" - 업데이트됨", flush=True)
+                last_status = current_status
+                last_progress = current_progress
+                last_update_time = current_time
+            else:
+                # 일정 시간(15초) 이상 변화가 없으면 작업이 계속 진행 중임을 표시
+                if time_diff > 15:
+                    print(f" - 작업 진행 중 ({time_diff:.1f}초 동안 상태 변화 없음)", flush=True)
+                    last_update_time = current_time
+                else:
+                    print("", flush=True)  # 줄바꿈만 처리
+            
+            if current_status in ['SUCCESS', 'FAILURE']:
+                if status.get('result'):
+                    print("\n결과 수신 완료!")
+                    # 전체 결과 출력은 너무 길 수 있으므로 주요 부분만 출력
+                    if 'scores' in status.get('result', {}):
+                        scores = status['result']['scores']
+                        print("\n점수 요약:")
+                        for key, value in scores.items():
+                            print(f"  - {key}: {value}")
                     else:
-                        # 일정 시간(15초) 이상 변화가 없으면 작업이 계속 진행 중임을 표시
-                        if time_diff > 15:
-                            print(f" - 작업 진행 중 ({time_diff:.1f}초 동안 상태 변화 없음)", flush=True)
-                            last_update_time = current_time
-                        else:
-                            print("", flush=True)  # 줄바꿈만 처리
+                        print("\n요약 결과:")
+                        summary = {k: v for k, v in status.get('result', {}).items() 
+                                  if k in ['tempo', 'number_of_notes', 'duration']}
+                        print(json.dumps(summary, indent=2))
                     
-                    if current_status in ['SUCCESS', 'FAILURE']:
-                        if status.get('result'):
-                            print("\n결과 수신 완료!")
-                            # 전체 결과 출력은 너무 길 수 있으므로 주요 부분만 출력
-                            if 'scores' in status.get('result', {}):
-                                scores = status['result']['scores']
-                                print("\n점수 요약:")
-                                for key, value in scores.items():
-                                    print(f"  - {key}: {value}")
-                            else:
-                                print("\n요약 결과:")
-                                summary = {k: v for k, v in status.get('result', {}).items() 
-                                          if k in ['tempo', 'number_of_notes', 'duration']}
-                                print(json.dumps(summary, indent=2))
-                            
-                            # GROK 피드백 확인
-                            if 'feedback' in status.get('result', {}):
-                                print("\n----- GROK 피드백 -----")
-                                print(status['result']['feedback'])
-                                print("-----------------------")
-                            elif 'feedback_error' in status.get('result', {}):
-                                print("\n----- GROK 피드백 오류 -----")
-                                print(status['result']['feedback_error'])
-                                print("---------------------------")
-                                
-                            # 전체 결과를 파일로 저장
-                            filename = f"result_{task_id[:8]}.json"
-                            with open(filename, 'w') as f:
-                                json.dump(status.get('result'), f, indent=2)
-                            print(f"\n전체 결과가 {filename}에 저장되었습니다.")
-                            
-                            # 피드백만 따로 텍스트 파일로 저장
-                            if 'feedback' in status.get('result', {}):
-                                feedback_filename = f"feedback_{task_id[:8]}.txt"
-                                with open(feedback_filename, 'w') as f:
-                                    f.write(status['result']['feedback'])
-                                print(f"GROK 피드백이 {feedback_filename}에 저장되었습니다.")
-                            
-                        elif status.get('error'):
-                            print(f"\n오류: {status.get('error')}")
+                    # GROK 피드백 확인
+                    if 'feedback' in status.get('result', {}):
+                        print("\n----- GROK 피드백 -----")
+                        print(status['result']['feedback'])
+                        print("-----------------------")
+                    elif 'feedback_error' in status.get('result', {}):
+                        print("\n----- GROK 피드백 오류 -----")
+                        print(status['result']['feedback_error'])
+                        print("---------------------------")
                         
-                        return status
-                else:
-                    print(f"오류: {response.status_code} - {response.text}")
+                    # 전체 결과를 파일로 저장
+                    filename = f"result_{task_id[:8]}.json"
+                    with open(filename, 'w') as f:
+                        json.dump(status.get('result'), f, indent=2)
+                    print(f"\n전체 결과가 {filename}에 저장되었습니다.")
+                    
+                    # 피드백만 따로 텍스트 파일로 저장
+                    if 'feedback' in status.get('result', {}):
+                        feedback_filename = f"feedback_{task_id[:8]}.txt"
+                        with open(feedback_filename, 'w') as f:
+                            f.write(status['result']['feedback'])
+                        print(f"GROK 피드백이 {feedback_filename}에 저장되었습니다.")
+                    
+                elif status.get('error'):
+                    print(f"\n오류: {status.get('error')}")
                 
-            except Exception as e:
-                print(f"요청 중 예외 발생: {e}")
-            
-            # 일정 시간 대기 후 다시 시도
-            time.sleep(wait_time)
+                return status
     
     except KeyboardInterrupt:
         # 사용자가 Ctrl+C로 중단한 경우
@@ -0,0 +1,72 @@
+import pytest
+
+from workers.admission import QUEUE_LIMITS, QueueAdmission
+
+TIMEOUT = 5
+
+
+@pytest.mark.timeout(TIMEOUT)
+def test_evaluate_thresholds_and_retry_after():
+    """예상 대기 시간 한도 초과는 429, 큐 길이 한도 초과는 503이고 Retry-After는 한도 아래로 내려갈 때까지의 시간"""
+    admission = QueueAdmission(enabled=True, worker_slots=2)
+    max_depth, max_wait = QUEUE_LIMITS["interactive"]
+    avg = 10.0
+
+    accepted = admission.evaluate("interactive", 0, avg)
+    assert accepted["accepting"] and accepted["estimated_wait_seconds"] == avg / 2
+
+    # 예상 대기 시간이 한도를 넘는 가장 작은 큐 길이
+    depth = int(max_wait * 2 / avg)
+    busy = admission.evaluate("interactive", depth, avg)
+    assert not busy["accepting"] and busy["status_code"] == 429
+    assert busy["retry_after"] >= 1 and busy["retry_after"] <= avg
+
+    full = admission.evaluate("interactive", max_depth, avg)
+    assert not full["accepting"] and full["status_code"] == 503
+    assert full["retry_after"] == avg / 2
+
+    # bulk_reference 큐는 대기 시간과 관계없이 큐 길이만 제한
+    assert admission.evaluate("bulk_reference", 1, 3600.0)["accepting"]
+
+
+@pytest.mark.timeout(TIMEOUT)
+def test_disabled_admission_always_accepts():
+    """비활성화되어 있으면 Redis를 조회하지 않고 항상 접수"""
+    admission = QueueAdmission(enabled=False, redis_url="redis://10.255.255.1:6379/0")
+    assert admission.status("interactive") == {"queue": "interactive", "enabled": False, "accepting": True}
+
+
+@pytest.mark.timeout(TIMEOUT)
+def test_canvas_job_counts_once_with_total_run_time(monkeypatch):
+    """캔버스 서브태스크 메시지는 대기 작업 수에 넣지 않고, 작업 시간은 replace 전 준비 단계와 서브태스크를 합친 값"""
+    fakeredis = pytest.importorskip("fakeredis")
+    redis = pytest.importorskip("redis")
+    pytest.importorskip("lupa")
+    fake = fakeredis.FakeRedis()
+    monkeypatch.setattr(redis.Redis, "from_url", lambda url, **kwargs: fake)
+    monkeypatch.setattr("workers.admission._priority_keys", lambda queue: [queue])
+    admission = QueueAdmission(enabled=True, worker_slots=1, cache_seconds=0)
+
+    # 게이트웨이가 작업 두 개를 제출하고, 첫 작업의 캔버스 서브태스크 메시지 세 개가 같은 큐에 쌓임
+    for _ in range(2):
+        admission.task_enqueued("interactive")
+    fake.rpush("interactive", *[b"message"] * 5)
+    admission.task_dequeued("interactive")
+    assert admission.status("interactive")["depth"] == 1
+
+    # 준비 단계(replace 후 IGNORED)와 서브태스크 시간을 더해 최종 태스크가 끝날 때 한 번 반영
+    admission.add_job_time("job-1", "interactive", 2.0)
+    for seconds in (3.0, 4.0, 1.0):
+        admission.add_job_time("job-1", "interactive", seconds)
+    admission.add_job_time("job-1", "feedback", 30.0)
+    admission.finish_job("job-1")
+    assert admission.status("interactive")["avg_task_seconds"] == 10.0
+
+    # 카운터는 0 아래로 내려가지 않고, 브로커 큐 길이보다 커지지 않음
+    for _ in range(3):
+        admission.task_dequeued("interactive")
+    assert admission.status("interactive")["depth"] == 0
+    fake.delete("interactive")
+    for _ in range(4):
+        admission.task_enqueued("interactive")
+    assert admission.status("interactive")["depth"] == 0
@@ -288,4 +288,35 @@ def test_compare_with_ref_features_dtw(mock_get_features, mock_compare, client):
     mock_compare.delay.assert_called_once()
     # 올바른 song_id가 전달되었는지 확인
     args, kwargs = mock_compare.delay.call_args
-    assert kwargs.get("song_id") == "test_song_with_chroma"
\ No newline at end of file
+    assert kwargs.get("song_id") == "test_song_with_chroma"
+
+@pytest.mark.timeout(TIMEOUT)
+def test_task_events_stream_runs_blocking_lookups_off_event_loop(client):
+    """SSE 스트림이 상태 조회와 결과 조회(동기 I/O)를 이벤트 루프가 아닌 스레드풀에서 실행하는지 확인"""
+    import threading
+    threads = {}
+
+    def task_status(task_id, include_result=True):
+        threads["status"] = threading.get_ident()
+        return {"task_id": task_id, "status": "PROGRESS", "progress": 50}
+
+    def resolve_task_result(task_id, task_result):
+        threads["result"] = threading.get_ident()
+        return {"tempo": 120}
+
+    async def stream_task_events(task_id, snapshot):
+        threads["loop"] = threading.get_ident()
+        yield await snapshot()
+        yield {"task_id": task_id, "status": "SUCCESS", "progress": 100, "result": {"_result_ref": "x"}}
+
+    with patch("app.api.v1._task_status", task_status), \
+            patch("app.api.v1._resolve_task_result", resolve_task_result), \
+            patch("app.api.v1.stream_task_events", stream_task_events):
+        response = client.get("/api/v1/tasks/test_task_id/events")
+
+    assert response.status_code == 200
+    events = [json.loads(line[len("data: "):]) for line in response.text.splitlines() if line.startswith("data: ")]
+    assert [event["status"] for event in events] == ["PROGRESS", "SUCCESS"]
+    assert events[1]["result"] == {"tempo": 120}
+    assert threads["status"] != threads["loop"]
+    assert threads["result"] != threads["loop"]
@@ -0,0 +1,55 @@
+import pytest
+
+from workers.budget import TaskBudget, mark_degraded
+
+TIMEOUT = 5
+
+
+@pytest.mark.timeout(TIMEOUT)
+def test_budget_allows_with_safety_factor_and_records_degradations():
+    """예상 시간 × 안전 계수가 남은 예산 안이면 허용하고, 저비용 실행 기록은 결과에 degraded로 표시"""
+    budget = TaskBudget(seconds=100, safety_factor=2.0)
+    assert budget.allows(40)
+    assert not budget.allows(60)
+    assert not budget.degraded("techniques")
+
+    budget.degrade("techniques", "skipped", 60)
+    assert budget.degraded("techniques")
+    entry = budget.degradations[0]
+    assert entry["stage"] == "techniques" and entry["mode"] == "skipped" and entry["estimated_seconds"] == 60
+    assert 0 < entry["remaining_seconds"] <= 100
+
+    result = mark_degraded({"scores": {}}, [{"stage": "alignment", "mode": "coarse_dtw_x4"}] + budget.degradations)
+    assert result["degraded"] is True
+    assert [entry["stage"] for entry in result["degradations"]] == ["alignment", "techniques"]
+
+    # 저비용 실행이 없으면 결과를 바꾸지 않음
+    assert mark_degraded({"scores": {}}, []) == {"scores": {}}
+
+
+@pytest.mark.timeout(TIMEOUT)
+def test_disabled_budget_always_allows():
+    """비활성화되어 있으면 예산을 넘는 단계도 원래 방식으로 실행"""
+    assert TaskBudget(seconds=0, enabled=False).allows(10 ** 6)
+    assert not TaskBudget(seconds=0).allows(0.001)
+
+
+@pytest.mark.timeout(TIMEOUT)
+def test_degraded_crepe_runs_locally_with_requested_capacity(monkeypatch):
+    """작은 CREPE 모델로 낮춘 음정 추출은 GPU를 거치지 않고, 사이드카에도 같은 모델 크기를 전달"""
+    pytest.importorskip("crepe")
+    import numpy as np
+    from workers import dsp
+
+    def select_gpu_client(op, segments):
+        raise AssertionError("GPU 서버는 full 모델만 제공하므로 선택하면 안 됨")
+
+    requests = []
+    monkeypatch.setattr(dsp, "_select_gpu_client", select_gpu_client)
+    monkeypatch.setattr(dsp, "is_sidecar_available", lambda: True)
+    monkeypatch.setattr(dsp, "run_in_sidecar",
+                        lambda op, segments, sr, model_path=None, model_capacity="full", **kwargs:
+                        requests.append((op, model_capacity)) or [440.0])
+
+    assert dsp.extract_pitch_with_crepe([np.zeros(2205, dtype=np.float32)], 22050, model_capacity="tiny") == [440.0]
+    assert requests == [("crepe", "tiny")]
@@ -0,0 +1,66 @@
+import pytest
+
+from workers.cancellation import TaskCancellation, TaskCancelled
+
+TIMEOUT = 5
+
+
+class FlagCancellation(TaskCancellation):
+    """Redis 대신 메모리 집합에 취소 플래그를 두는 TaskCancellation"""
+
+    def __init__(self, check_interval):
+        super().__init__(check_interval=check_interval)
+        self.flags = set()
+        self.lookups = 0
+
+    def request(self, task_id):
+        self.flags.add(task_id)
+        return True
+
+    def is_requested(self, task_id):
+        self.lookups += 1
+        return task_id in self.flags
+
+
+@pytest.mark.timeout(TIMEOUT)
+def test_checker_raises_after_cancel_and_throttles_lookups():
+    """취소 플래그는 check_interval마다 한 번만 조회하고, 한 번 취소를 확인하면 이후 호출은 계속 예외 발생"""
+    cancellation = FlagCancellation(check_interval=60)
+    check = cancellation.checker("task-1")
+
+    check()
+    check(10, 100)  # progress_callback처럼 (처리한 수, 전체 수)를 받아도 됨
+    assert cancellation.lookups == 1
+
+    cancellation.request("task-1")
+    cancellation.check_interval = 0
+    with pytest.raises(TaskCancelled) as excinfo:
+        check(20, 100)
+    assert excinfo.value.task_id == "task-1"
+
+    # 플래그를 지워도 이미 취소된 작업은 계속 중단
+    cancellation.flags.clear()
+    with pytest.raises(TaskCancelled):
+        check()
+
+    # 다른 작업과 작업 ID가 없는 경우에는 영향 없음
+    cancellation.checker("task-2")()
+    cancellation.checker(None)()
+
+
+@pytest.mark.timeout(TIMEOUT)
+def test_task_cancelled_is_not_swallowed_by_except_exception():
+    """단계별 폴백의 except Exception 블록이 취소를 삼키지 않음"""
+    with pytest.raises(TaskCancelled):
+        try:
+            raise TaskCancelled("task-1")
+        except Exception:
+            pytest.fail("TaskCancelled가 except Exception에 잡힘")
+
+
+@pytest.mark.timeout(TIMEOUT)
+def test_unknown_task_id_when_redis_unavailable_is_assumed_known():
+    """Redis에 연결할 수 없으면 제출 기록을 확인할 수 없으므로 취소 요청을 막지 않는지 확인"""
+    cancellation = TaskCancellation(redis_url="redis://127.0.0.1:1/1")
+    cancellation.register("task-1")
+    assert cancellation.is_known("unknown-task")
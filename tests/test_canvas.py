@@ -0,0 +1,67 @@
+import os
+import sys
+import json
+import subprocess
+
+import pytest
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+TIMEOUT = 120
+
+# 실제 Celery(eager 모드)로 비교 캔버스를 실행하는 프로브
+# 점수 계산 단계가 실패하면 저장 단계가 실행되지 않으므로 오류 콜백이 블롭을 지우고 원래 태스크 ID에 FAILURE를 남겨야 함
+# (eager 모드의 chord는 병렬 단계 실패를 오류 콜백 없이 바로 발생시키므로 점수 계산 단계 실패로 확인)
+_PROBE = """
+import json
+import numpy as np
+import fakeredis
+from workers import tasks
+from workers.celery_app import celery_app
+
+celery_app.conf.update(task_always_eager=True, result_backend="cache+memory://")
+tasks.blob_store._redis = fakeredis.FakeRedis()
+tasks.task_cancellation.is_requested = lambda task_id: False
+tasks.extract_pitch_with_crepe = lambda segments, sr, callback=None, capacity="full": [440.0] * len(segments)
+tasks.extract_tempo = lambda y, sr: 120.0
+tasks.extract_onsets = lambda y, sr: [0.0]
+
+def get_reference_features(song_id):
+    raise RuntimeError("reference lookup failed")
+tasks.get_reference_features = get_reference_features
+
+events = []
+tasks.publish_task_event = lambda task_id, event: events.append([task_id, event["status"]])
+
+prepared = {"sr": 22050, "user_y": np.zeros(22050, dtype=np.float32),
+            "user_segments": [np.zeros(2205, dtype=np.float32)] * 2, "has_midi": False, "midi_onsets": []}
+canvas = tasks._build_comparison_canvas("compare-task", prepared, "/nonexistent/model.h5", "user", "song", False)
+try:
+    canvas.apply()
+except RuntimeError:
+    pass
+
+print(json.dumps({
+    "state": celery_app.AsyncResult("compare-task").state,
+    "events": events,
+    "blobs": len(tasks.blob_store._redis.keys("blob:*")),
+}))
+"""
+
+
+@pytest.mark.timeout(TIMEOUT)
+def test_canvas_failure_cleans_up_and_fails_original_task():
+    """비교 캔버스 단계가 실패하면 블롭을 지우고, 원래 compare_audio 태스크 ID로 FAILURE를 기록/발행하는지 확인"""
+    pytest.importorskip("celery")
+    pytest.importorskip("librosa")
+    pytest.importorskip("crepe")
+    pytest.importorskip("fakeredis")
+
+    # 모의 celery 모듈 없이 새 인터프리터에서 실행 (테스트 프로세스의 celery는 tests/celery_mock.py로 바뀌어 있음)
+    output = subprocess.run([sys.executable, "-c", _PROBE], cwd=ROOT_DIR, capture_output=True, text=True,
+                            check=True).stdout
+    probe = json.loads(output.strip().splitlines()[-1])
+
+    assert probe["state"] == "FAILURE"
+    assert ["compare-task", "FAILURE"] in probe["events"]
+    assert probe["blobs"] == 0
@@ -0,0 +1,82 @@
+import time
+import threading
+
+import pytest
+
+from workers import gpu_hedge
+from workers.gpu_hedge import run_hedged
+
+TIMEOUT = 5
+DEADLINE = 0.1
+
+
+@pytest.fixture(autouse=True)
+def hedge_stats(monkeypatch):
+    """테스트마다 헤징 카운터(예산 계산에 사용)를 새로 시작"""
+    stats = dict.fromkeys(gpu_hedge.hedge_stats, 0)
+    monkeypatch.setattr(gpu_hedge, "hedge_stats", stats)
+    return stats
+
+
+@pytest.mark.timeout(TIMEOUT)
+def test_gpu_wins_before_deadline(hedge_stats):
+    """GPU가 마감 시간 안에 응답하면 로컬 계산을 시작하지 않고 GPU 결과를 반환하는지 확인"""
+    def local_call(cancel_event):
+        raise AssertionError("마감 시간 전에는 로컬 계산을 시작하면 안 됨")
+
+    result, backend, elapsed = run_hedged("crepe", DEADLINE, lambda cancel_event: [440.0], local_call)
+
+    assert (result, backend) == ([440.0], "gpu")
+    assert elapsed < DEADLINE
+    assert hedge_stats["hedged"] == 0
+
+
+@pytest.mark.timeout(TIMEOUT)
+def test_cpu_hedge_wins_after_deadline_and_cancels_gpu(hedge_stats):
+    """마감 시간이 지나면 로컬 계산을 시작하고, CPU가 이기면 GPU 작업을 취소하며 로컬 소요 시간을 반환하는지 확인"""
+    gpu_cancelled = threading.Event()
+    local_started = []
+
+    def gpu_call(cancel_event):
+        if cancel_event.wait(2):
+            gpu_cancelled.set()
+        return None
+
+    def local_call(cancel_event):
+        local_started.append(time.time())
+        time.sleep(0.05)
+        return [220.0]
+
+    start_time = time.time()
+    result, backend, elapsed = run_hedged("crepe", DEADLINE, gpu_call, local_call)
+
+    assert (result, backend) == ([220.0], "cpu")
+    assert local_started[0] - start_time >= DEADLINE
+    # 소요 시간은 헤지가 시작된 뒤의 로컬 계산 시간
+    assert 0.05 <= elapsed < time.time() - start_time - DEADLINE / 2
+    assert gpu_cancelled.wait(1)
+    assert hedge_stats["hedged"] == 1 and hedge_stats["cpu_wins"] == 1
+
+
+@pytest.mark.timeout(TIMEOUT)
+def test_gpu_wins_after_hedge_and_cancels_local(hedge_stats):
+    """헤지 시작 후 GPU가 먼저 끝나면 로컬 계산을 취소하고, GPU 요청 시작부터의 소요 시간을 반환하는지 확인"""
+    local_started = threading.Event()
+    local_cancelled = threading.Event()
+
+    def gpu_call(cancel_event):
+        local_started.wait(2)
+        return [440.0]
+
+    def local_call(cancel_event):
+        local_started.set()
+        if cancel_event.wait(2):
+            local_cancelled.set()
+        return None
+
+    result, backend, elapsed = run_hedged("crepe", DEADLINE, gpu_call, local_call)
+
+    assert (result, backend) == ([440.0], "gpu")
+    assert elapsed >= DEADLINE
+    assert local_cancelled.wait(1)
+    assert hedge_stats["hedged"] == 1 and hedge_stats["gpu_wins"] == 1
@@ -0,0 +1,71 @@
+import time
+import threading
+
+import pytest
+
+from workers.gpu_limiter import GPUAdmissionLimiter
+
+TIMEOUT = 5
+
+
+def fake_limiter(monkeypatch, connected=True, **kwargs):
+    """가짜 Redis(Lua 스크립트 지원)에 연결된 제한기 생성"""
+    fakeredis = pytest.importorskip("fakeredis")
+    redis = pytest.importorskip("redis")
+    pytest.importorskip("lupa")
+    server = fakeredis.FakeServer()
+    server.connected = connected
+    fake = fakeredis.FakeRedis(server=server)
+    monkeypatch.setattr(redis.Redis, "from_url", lambda url, **options: fake)
+    return GPUAdmissionLimiter(enabled=True, **kwargs)
+
+
+@pytest.mark.timeout(TIMEOUT)
+def test_acquire_up_to_capacity_and_release(monkeypatch):
+    """용량까지는 바로 확보하고, 초과하면 max_wait 후 None을 반환하며, 반환하면 다시 확보할 수 있는지 확인"""
+    limiter = fake_limiter(monkeypatch, capacity=10, max_wait=0.1)
+
+    first = limiter.acquire(6)
+    second = limiter.acquire(4)
+    assert first and second
+    assert limiter.metrics()["inflight_segments"] == 10
+
+    start_time = time.time()
+    assert limiter.acquire(1) is None
+    assert time.time() - start_time >= 0.1
+
+    limiter.release(first)
+    assert limiter.metrics()["inflight_segments"] == 4
+    assert limiter.acquire(6)
+
+    metrics = limiter.metrics()
+    assert metrics["admitted"] == 3 and metrics["diverted"] == 1
+
+
+@pytest.mark.timeout(TIMEOUT)
+def test_waiting_acquire_admitted_after_release(monkeypatch):
+    """자리가 없으면 기다리다가 다른 요청이 슬롯을 반환하면 확보하고, 빈 상태에서는 용량보다 큰 요청도 허용하는지 확인"""
+    limiter = fake_limiter(monkeypatch, capacity=10, max_wait=2)
+    held = limiter.acquire(10)
+    threading.Timer(0.2, limiter.release, args=(held,)).start()
+
+    start_time = time.time()
+    lease = limiter.acquire(5)
+    assert lease
+    assert 0.2 <= time.time() - start_time < 2
+
+    limiter.release(lease)
+    assert limiter.acquire(50)
+
+
+@pytest.mark.timeout(TIMEOUT)
+def test_fail_open_when_redis_unavailable(monkeypatch):
+    """Redis에 연결할 수 없으면 제한 없이 통과("")시키고, 반환과 지표 조회도 예외 없이 처리하는지 확인"""
+    limiter = fake_limiter(monkeypatch, connected=False, capacity=1, max_wait=1)
+
+    assert limiter.acquire(100) == ""
+    limiter.release("lease:1")
+    assert "error" in limiter.metrics()
+
+    # 비활성화되어 있으면 Redis를 사용하지 않음
+    assert GPUAdmissionLimiter(enabled=False).acquire(100) == ""
@@ -0,0 +1,130 @@
+import os
+import sys
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+import pytest
+
+import workers.gpu_client
+from workers.gpu_client import GPUInferenceClient
+from workers.gpu_pool import GPUEndpointPool, CIRCUIT_OPEN, CIRCUIT_CLOSED
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'scripts')))
+from gpu_standin_server import StandinConfig, start_standin_server as start_full_standin_server
+
+TIMEOUT = 5
+
+
+def start_standin_server(status_code=200):
+    """/livez와 /predict_techniques만 구현한 로컬 대역 GPU 서버 시작"""
+
+    class Handler(BaseHTTPRequestHandler):
+        requests_served = 0
+
+        def log_message(self, *args):
+            pass
+
+        def do_GET(self):
+            self.send_response(200)
+            self.end_headers()
+            self.wfile.write(b"ok")
+
+        def do_POST(self):
+            Handler.requests_served += 1
+            body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+            self.send_response(status_code)
+            self.send_header("Content-Type", "application/json")
+            self.end_headers()
+            if status_code == 200:
+                self.wfile.write(json.dumps([["normal"] for _ in body["segments"]]).encode())
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, Handler, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+@pytest.fixture
+def standin_servers():
+    servers = [start_standin_server(200), start_standin_server(500)]
+    yield servers
+    for server, _, _ in servers:
+        server.shutdown()
+
+
+@pytest.mark.timeout(TIMEOUT)
+def test_pool_balances_least_outstanding():
+    """진행 중 요청이 적은 엔드포인트가 선택되는지 테스트"""
+    pool = GPUEndpointPool(["http://a", "http://b"])
+    first = pool.acquire()
+    second = pool.acquire()
+    assert first.url != second.url
+    pool.release(first, True)
+    assert pool.acquire().url == first.url
+
+
+@pytest.mark.timeout(TIMEOUT)
+def test_pool_opens_circuit_after_failures():
+    """연속 실패 시 서킷이 열리고 리셋 시간 후 시험 요청이 허용되는지 테스트"""
+    pool = GPUEndpointPool(["http://a"], failure_threshold=2, reset_timeout=0)
+    for _ in range(2):
+        pool.release(pool.acquire(), False)
+    assert pool.endpoints[0].circuit == CIRCUIT_OPEN
+
+    endpoint = pool.acquire()
+    assert endpoint is not None
+    pool.release(endpoint, True)
+    assert pool.endpoints[0].circuit == CIRCUIT_CLOSED
+
+
+@pytest.mark.timeout(TIMEOUT)
+def test_pool_availability_uses_cached_state():
+    """has_available이 헬스 체크 요청 없이 마지막 헬스/서킷 상태로 판단하는지 테스트"""
+    pool = GPUEndpointPool(["http://a"], failure_threshold=1, reset_timeout=60)
+    assert pool.has_available()
+
+    pool.release(pool.acquire(), False)
+    assert not pool.has_available()
+
+    pool.endpoints[0].circuit = CIRCUIT_CLOSED
+    pool.endpoints[0].healthy = False
+    assert not pool.has_available()
+
+
+@pytest.mark.timeout(TIMEOUT)
+def test_client_fails_over_between_standin_servers(standin_servers):
+    """한 엔드포인트가 5xx를 반환하면 다른 엔드포인트로 장애 조치되는지 테스트"""
+    (_, good_handler, good_url), (_, bad_handler, bad_url) = standin_servers
+    pool = GPUEndpointPool([bad_url, good_url], failure_threshold=1, reset_timeout=60)
+    client = GPUInferenceClient(pool=pool, batch_size=2)
+
+    segments = [np.zeros(2205) for _ in range(4)]
+    result = client.predict_techniques(segments, 22050)
+
+    assert result == [["normal"]] * 4
+    assert bad_handler.requests_served == 1
+    assert good_handler.requests_served == 2
+    assert pool.endpoints[0].circuit == CIRCUIT_OPEN
+
+
+@pytest.mark.timeout(TIMEOUT)
+def test_client_resumes_stream_after_drop(monkeypatch):
+    """스트리밍 도중 연결이 끊기면 받은 결과를 유지하고 나머지 세그먼트만 다시 요청하는지 테스트"""
+    monkeypatch.setattr(workers.gpu_client, "GPU_STREAM_CHUNK_SIZE", 2)
+    server, url = start_full_standin_server(StandinConfig(drop_rate=0.9, seed=1))
+    try:
+        pool = GPUEndpointPool([url], failure_threshold=100)
+        client = GPUInferenceClient(pool=pool, batch_size=10, streaming=True)
+        progress = []
+        segments = [np.zeros(2205) for _ in range(10)]
+        result = client.extract_pitch_with_crepe(
+            segments, 22050, progress_callback=lambda done, total: progress.append(done)
+        )
+    finally:
+        server.shutdown()
+
+    assert result == [0.0] * 10
+    assert progress == sorted(progress) and progress[-1] == 10
+    assert server.config.stats["drops"] > 0
+    assert server.config.stats["segments"] < 10 * server.config.stats["requests"]
@@ -0,0 +1,65 @@
+import pytest
+
+from workers.gpu_router import GPURouter
+
+TIMEOUT = 2
+
+
+@pytest.mark.timeout(TIMEOUT)
+def test_router_prefers_cpu_for_short_recordings():
+    """세그먼트가 적으면 고정 왕복 지연 때문에 CPU가 선택되는지 테스트"""
+    router = GPURouter(default_rtt=1.0, explore_every=0)
+    segments = [[0.0] * 2205 for _ in range(5)]
+    assert router.choose_backend("crepe", segments) == "cpu"
+
+
+@pytest.mark.timeout(TIMEOUT)
+def test_router_prefers_gpu_for_long_solos():
+    """세그먼트가 많으면 GPU가 선택되는지 테스트"""
+    router = GPURouter(default_rtt=1.0, explore_every=0)
+    segments = [[0.0] * 11025 for _ in range(500)]
+    assert router.choose_backend("crepe", segments, batch_size=100) == "gpu"
+
+
+@pytest.mark.timeout(TIMEOUT)
+def test_router_learns_from_observed_latency():
+    """관측된 GPU 지연이 크면 같은 입력에 대해 CPU로 전환되는지 테스트"""
+    router = GPURouter(alpha=1.0, default_rtt=0.1, explore_every=0)
+    segments = [[0.0] * 11025 for _ in range(100)]
+    assert router.choose_backend("crepe", segments) == "gpu"
+
+    router.record("crepe", "gpu", segments, elapsed=120.0)
+    assert router.choose_backend("crepe", segments) == "cpu"
+    assert router.stats()["observations"]["crepe"]["gpu"] == 1
+
+
+@pytest.mark.timeout(TIMEOUT)
+def test_router_disabled_always_uses_gpu():
+    """라우팅이 비활성화되면 기존 동작처럼 항상 GPU를 선택하는지 테스트"""
+    router = GPURouter(enabled=False)
+    assert router.choose_backend("crepe", [[0.0] * 10]) == "gpu"
+
+
+@pytest.mark.timeout(TIMEOUT)
+def test_router_defers_exploration_for_lopsided_jobs():
+    """예상 시간 차이가 큰 긴 작업에서는 탐색을 미루고, 조건이 맞는 다음 작업에서 탐색하는지 테스트"""
+    router = GPURouter(default_rtt=0.1, explore_every=1, explore_max_ratio=3.0, explore_max_seconds=1.0)
+    long_solo = [[0.0] * 11025 for _ in range(500)]
+    assert router.choose_backend("crepe", long_solo) == "gpu"
+
+    # GPU/CPU 예상 시간이 비슷한 작업에서 미뤄둔 탐색 수행
+    router.rates["crepe"]["cpu"] = router.rates["crepe"]["gpu"] * 1.5
+    segments = [[0.0] * 11025 for _ in range(100)]
+    assert router.choose_backend("crepe", segments) == "cpu"
+
+
+@pytest.mark.timeout(TIMEOUT)
+def test_router_penalizes_gpu_failures():
+    """실패한 GPU 요청이 벌점으로 기록되어 CPU로 전환되고, 꼬리 지연 이력에는 남지 않는지 테스트"""
+    router = GPURouter(alpha=1.0, default_rtt=0.1, explore_every=0)
+    segments = [[0.0] * 11025 for _ in range(100)]
+    assert router.choose_backend("crepe", segments) == "gpu"
+
+    router.record_failure("crepe", segments, elapsed=0.5)
+    assert router.choose_backend("crepe", segments) == "cpu"
+    assert len(router.gpu_latency_ratios["crepe"]) == 0
@@ -0,0 +1,40 @@
+import os
+import sys
+import json
+import subprocess
+
+import pytest
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+# 게이트웨이 import 시간 예산 (초). CI 머신 성능에 맞춰 환경변수로 조정
+GATEWAY_IMPORT_BUDGET = float(os.environ.get("GATEWAY_IMPORT_BUDGET", 3.0))
+
+# 게이트웨이에서 로드되면 안 되는 무거운 모듈
+HEAVY_MODULES = ["workers.tasks", "workers.dsp", "tensorflow", "keras", "librosa", "crepe", "sklearn", "fastdtw"]
+
+TIMEOUT = 60
+
+_PROBE = """
+import sys, json, time
+start_time = time.perf_counter()
+import app.main
+elapsed = time.perf_counter() - start_time
+print(json.dumps({"elapsed": elapsed, "heavy": [m for m in %r if m in sys.modules]}))
+""" % (HEAVY_MODULES,)
+
+
+@pytest.mark.timeout(TIMEOUT)
+def test_gateway_import_is_light():
+    """게이트웨이(app.main) import가 무거운 DSP/ML 모듈을 가져오지 않고 시간 예산 안에 끝나는지 확인"""
+    pytest.importorskip("fastapi")
+    pytest.importorskip("celery")
+    pytest.importorskip("pymongo")
+
+    # 모의 모듈 없이 새 인터프리터에서 측정 (테스트 프로세스에는 이미 로드된 모듈이 있으므로)
+    output = subprocess.run([sys.executable, "-c", _PROBE], cwd=ROOT_DIR, capture_output=True, text=True,
+                            check=True).stdout
+    probe = json.loads(output.strip().splitlines()[-1])
+
+    assert probe["heavy"] == []
+    assert probe["elapsed"] < GATEWAY_IMPORT_BUDGET, f"게이트웨이 import 시간 {probe['elapsed']:.2f}초"
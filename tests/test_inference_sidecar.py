@@ -0,0 +1,104 @@
+import time
+import threading
+
+import numpy as np
+import pytest
+
+from workers import inference_sidecar
+from workers.inference_sidecar import InferenceSidecarServer, _Coalescer, run_in_sidecar
+
+TIMEOUT = 10
+
+
+@pytest.fixture
+def sidecar(tmp_path, monkeypatch):
+    """임시 소켓에서 사이드카 서버 실행 (요청을 모을 수 있도록 배치 대기 시간을 늘림)"""
+    monkeypatch.setattr(inference_sidecar, "SIDECAR_BATCH_WINDOW_MS", 300)
+    monkeypatch.setattr(inference_sidecar, "SIDECAR_POLL_INTERVAL", 0.05)
+    socket_path = str(tmp_path / "sidecar.sock")
+    server = InferenceSidecarServer(socket_path)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield socket_path
+    server.shutdown()
+    server.server_close()
+
+
+def run_concurrently(*calls):
+    results = [None] * len(calls)
+
+    def run(index, call):
+        results[index] = call()
+
+    threads = [threading.Thread(target=run, args=(i, call)) for i, call in enumerate(calls)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
+
+
+@pytest.mark.timeout(TIMEOUT)
+def test_concurrent_requests_are_coalesced_and_split(sidecar, monkeypatch):
+    """동시에 들어온 요청을 한 번의 추론으로 합치고, 결과를 요청별 세그먼트 수대로 나눠 돌려주는지 확인"""
+    batches = []
+
+    def compute(self, segments, cancel_event=None, progress_callback=None):
+        batches.append(len(segments))
+        values = [float(segment[0]) for segment in segments]
+        if self.op == "analyze":
+            return {"pitches": values, "techniques": [f"t{int(value)}" for value in values]}
+        return values
+
+    monkeypatch.setattr(_Coalescer, "_compute", compute)
+    first = [np.full(100, 1.0, dtype=np.float32), np.full(100, 2.0, dtype=np.float32)]
+    second = [np.full(50, 3.0, dtype=np.float32)]
+
+    results = run_concurrently(
+        lambda: run_in_sidecar("crepe", first, 16000, socket_path=sidecar),
+        lambda: run_in_sidecar("crepe", second, 16000, socket_path=sidecar),
+    )
+    assert results == [[1.0, 2.0], [3.0]]
+    assert batches == [3]
+
+    results = run_concurrently(
+        lambda: run_in_sidecar("analyze", first, 16000, socket_path=sidecar),
+        lambda: run_in_sidecar("analyze", second, 16000, socket_path=sidecar),
+    )
+    assert results == [
+        {"pitches": [1.0, 2.0], "techniques": ["t1", "t2"]},
+        {"pitches": [3.0], "techniques": ["t3"]},
+    ]
+    assert batches == [3, 3]
+
+
+@pytest.mark.timeout(TIMEOUT)
+def test_cancelled_request_reports_progress_and_is_dropped(sidecar, monkeypatch):
+    """대기 중 진행률이 전달되고, 취소하면 바로 None을 반환하며 사이드카도 계산을 중단하는지 확인"""
+    started = threading.Event()
+    stopped = threading.Event()
+
+    def compute(self, segments, cancel_event=None, progress_callback=None):
+        progress_callback(1, len(segments))
+        started.set()
+        while not cancel_event.is_set():
+            time.sleep(0.01)
+        stopped.set()
+        return None
+
+    monkeypatch.setattr(_Coalescer, "_compute", compute)
+    cancel_event = threading.Event()
+    progress = []
+
+    def progress_callback(current, total):
+        progress.append((current, total))
+        if started.is_set():
+            cancel_event.set()
+
+    start_time = time.time()
+    result = run_in_sidecar("crepe", [np.zeros(100, dtype=np.float32)] * 2, 16000,
+                            cancel_event=cancel_event, progress_callback=progress_callback, socket_path=sidecar)
+
+    assert result is None
+    assert time.time() - start_time < 2
+    assert (1, 2) in progress
+    assert stopped.wait(2)
@@ -0,0 +1,35 @@
+import os
+import sys
+
+import numpy as np
+import pytest
+
+from workers.preload import memory_usage, verify_after_fork
+
+TIMEOUT = 10
+
+
+@pytest.mark.timeout(TIMEOUT)
+def test_cached_mel_basis_matches_librosa():
+    """캐시한 멜 필터뱅크로 만든 스펙트로그램이 librosa.feature.melspectrogram 결과와 같은지 확인"""
+    librosa = pytest.importorskip("librosa")
+    from workers.dsp import wav_to_spectrogram
+
+    sr = 22050
+    y = (0.5 * np.sin(2 * np.pi * 440 * np.arange(sr // 4) / sr)).astype(np.float32)
+    expected = librosa.power_to_db(librosa.feature.melspectrogram(y=y, sr=sr, n_fft=512, hop_length=20, n_mels=128),
+                                   ref=np.max)
+    result = wav_to_spectrogram(y, sr=sr)
+
+    np.testing.assert_allclose(result[:, :expected.shape[1]], expected, rtol=1e-4, atol=1e-3)
+
+
+@pytest.mark.timeout(TIMEOUT)
+@pytest.mark.skipif(not sys.platform.startswith("linux"), reason="/proc 기반 측정은 Linux 전용")
+def test_memory_usage_and_verify_without_preload():
+    """프리로드하지 않았으면 포크 후 확인을 건너뛰고, 메모리 사용량은 /proc에서 읽어옴"""
+    assert verify_after_fork() is True
+
+    usage = memory_usage(os.getpid())
+    assert usage["rss"] > 0
+    assert usage["shared"] + usage["private"] == usage["rss"]
@@ -0,0 +1,74 @@
+import threading
+
+import pytest
+
+import workers.progress as progress_module
+from workers.progress import ProgressReporter
+
+TIMEOUT = 5
+
+
+class FakeTask:
+    def __init__(self):
+        self.states = []
+
+    def update_state(self, task_id=None, state=None, meta=None):
+        self.states.append((task_id, state, meta['progress']))
+
+
+@pytest.mark.timeout(TIMEOUT)
+def test_updates_are_debounced_and_monotonic():
+    """최소 증가폭/간격을 넘지 않는 갱신과 진행률 감소는 기록하지 않고, 상태 변경과 force는 바로 기록"""
+    task = FakeTask()
+    progress = ProgressReporter(task, min_interval=0, min_delta=5)
+
+    assert progress.update(0, 'STARTED')
+    assert progress.update(1)  # 상태 변경은 증가폭과 관계없이 기록
+    assert not progress.update(3)
+    assert not progress.update(2)  # 같은 상태에서 진행률은 줄어들지 않음
+    assert progress.update(6)
+    assert progress.update(7, force=True)
+    assert progress.update(90, 'FINALIZING')
+    assert task.states == [(None, 'STARTED', 0), (None, 'PROCESSING', 1), (None, 'PROCESSING', 6),
+                           (None, 'PROCESSING', 7), (None, 'FINALIZING', 90)]
+
+
+@pytest.mark.timeout(TIMEOUT)
+def test_range_callback_respects_interval_and_flush():
+    """루프 콜백은 최소 간격 안에서는 합쳐지고, flush가 마지막 값을 기록"""
+    task = FakeTask()
+    progress = ProgressReporter(task, task_id="parent", min_interval=60, min_delta=1)
+    callback = progress.range(40, 90)
+
+    for done in range(11):
+        callback(done, 10)
+    progress.flush()
+
+    assert task.states == [("parent", 'PROCESSING', 40), ("parent", 'PROCESSING', 90)]
+
+
+class ThreadLocalRequestTask(FakeTask):
+    """Celery처럼 task.request가 스레드별인 가짜 태스크 (태스크를 실행하는 스레드에서만 id가 있음)"""
+
+    def __init__(self, task_id):
+        super().__init__()
+        self._local = threading.local()
+        self._local.id = task_id
+
+    @property
+    def request(self):
+        return self._local
+
+
+@pytest.mark.timeout(TIMEOUT)
+def test_updates_from_other_threads_use_the_task_id(monkeypatch):
+    """StageGraph/헤징 스레드에서 보고한 진행률도 태스크를 실행하는 스레드의 작업 ID에 기록"""
+    monkeypatch.setattr(progress_module.task_cancellation, "is_requested", lambda task_id: False)
+    task = ThreadLocalRequestTask("task-1")
+    progress = ProgressReporter(task, min_interval=0, min_delta=1)
+
+    thread = threading.Thread(target=lambda: progress.update(50))
+    thread.start()
+    thread.join()
+
+    assert task.states == [("task-1", 'PROCESSING', 50)]
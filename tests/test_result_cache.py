@@ -0,0 +1,41 @@
+import pytest
+
+from workers.result_cache import CACHE_KEY_PREFIX, ResultCache
+
+TIMEOUT = 5
+
+
+@pytest.mark.timeout(TIMEOUT)
+def test_key_depends_on_audio_reference_pipeline_and_params():
+    """같은 오디오/파라미터는 같은 키, 오디오·레퍼런스 버전·파이프라인 버전·파라미터 중 하나라도 다르면 다른 키"""
+    cache = ResultCache(enabled=True, pipeline_version="1")
+    audio = b"RIFF" + bytes(range(256)) * 4
+    base = cache.key("comparison", audio, "2024-01-01T00:00:00", song_id="song1", generate_feedback=False)
+
+    assert base.startswith(CACHE_KEY_PREFIX)
+    # 파라미터 순서는 키에 영향 없음
+    assert base == cache.key("comparison", audio, "2024-01-01T00:00:00", generate_feedback=False, song_id="song1")
+
+    assert base != cache.key("comparison", audio + b"\x00", "2024-01-01T00:00:00", song_id="song1",
+                             generate_feedback=False)
+    assert base != cache.key("comparison", audio, "2024-02-01T00:00:00", song_id="song1", generate_feedback=False)
+    assert base != cache.key("comparison", audio, "2024-01-01T00:00:00", song_id="song1", generate_feedback=True)
+    assert base != cache.key("analysis", audio, "2024-01-01T00:00:00", song_id="song1", generate_feedback=False)
+    assert base != ResultCache(enabled=True, pipeline_version="2").key(
+        "comparison", audio, "2024-01-01T00:00:00", song_id="song1", generate_feedback=False)
+
+
+@pytest.mark.timeout(TIMEOUT)
+def test_cache_is_bypassed_when_disabled_or_unreachable():
+    """비활성화되어 있거나 Redis에 연결할 수 없으면 캐시 없이 새로 실행"""
+    def get_state(task_id):
+        raise AssertionError("캐시 항목이 없으면 작업 상태를 조회하지 않아야 함")
+
+    disabled = ResultCache(enabled=False)
+    assert disabled.lookup("result_cache:abc", get_state) is None
+    assert disabled.evict("task-1") is False
+
+    unreachable = ResultCache(enabled=True, redis_url="redis://127.0.0.1:1/1")
+    unreachable.store("result_cache:abc", "task-1")
+    assert unreachable.lookup("result_cache:abc", get_state) is None
+    assert unreachable.lookup(None, get_state) is None
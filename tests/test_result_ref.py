@@ -0,0 +1,21 @@
+import pytest
+
+from workers.result_ref import is_result_ref, task_result
+
+TIMEOUT = 5
+
+
+@pytest.mark.timeout(TIMEOUT)
+def test_reference_mode_keeps_only_summary():
+    """참조 모드에서는 요약 필드와 MongoDB 참조만 남고, full 모드에서는 결과를 그대로 반환"""
+    result = {"tempo": 120.0, "duration": 3.2, "onsets": [0.5] * 1000, "techniques": [["normal"]] * 1000}
+
+    assert task_result(result, "analysis", "doc1", mode="full") is result
+    # 문서 ID가 없으면 (저장 실패 등) 참조 대신 전체 결과 반환
+    assert task_result(result, "analysis", None, mode="reference") is result
+
+    compact = task_result(result, "reference", "doc1", mode="reference", song_id="song1")
+    assert compact == {"tempo": 120.0, "duration": 3.2,
+                       "result_ref": {"type": "reference", "document_id": "doc1", "song_id": "song1"}}
+    assert is_result_ref(compact)
+    assert not is_result_ref(result)
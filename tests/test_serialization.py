@@ -0,0 +1,38 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+msgpack = pytest.importorskip("msgpack")
+
+from workers.serialization import EXT_NDARRAY, dumps, loads
+
+TIMEOUT = 10
+
+
+@pytest.mark.timeout(TIMEOUT)
+def test_roundtrip_bytes_arrays_and_scalars():
+    """bytes, 배열(dtype/shape 유지), NumPy 스칼라가 그대로 복원되는지 확인"""
+    chroma = np.arange(24, dtype=np.float32).reshape(12, 2)
+    message = ((b"RIFF\x00\xff",), {"chroma": chroma, "pitches": np.array([440.0, 0.0]),
+                                    "tempo": np.float64(120.5)}, {})
+
+    args, kwargs, _ = loads(dumps(message))
+
+    assert args == [b"RIFF\x00\xff"]
+    assert kwargs["chroma"].dtype == np.float32 and kwargs["chroma"].shape == (12, 2)
+    np.testing.assert_array_equal(kwargs["chroma"], chroma)
+    np.testing.assert_array_equal(kwargs["pitches"], [440.0, 0.0])
+    assert kwargs["tempo"] == 120.5 and type(kwargs["tempo"]) is float
+
+
+@pytest.mark.timeout(TIMEOUT)
+def test_rejects_unsafe_payloads():
+    """object dtype 배열, 헤더와 크기가 맞지 않는 버퍼, 알 수 없는 확장 타입은 거부"""
+    with pytest.raises(TypeError):
+        dumps({"items": np.array([{"a": 1}], dtype=object)})
+
+    object_header = msgpack.packb(["|O", [1]]) + b"\x00" * 8
+    short_buffer = msgpack.packb(["<f8", [4]]) + b"\x00" * 8
+    for payload in (msgpack.ExtType(EXT_NDARRAY, object_header), msgpack.ExtType(EXT_NDARRAY, short_buffer),
+                    msgpack.ExtType(42, b"")):
+        with pytest.raises(ValueError):
+            loads(msgpack.packb(payload))
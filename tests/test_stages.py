@@ -0,0 +1,86 @@
+import time
+import threading
+
+import pytest
+
+from workers.cancellation import TaskCancelled
+from workers.stages import StageGraph
+
+TIMEOUT = 5
+
+
+def build_graph(calls, delay=0.2):
+    graph = StageGraph("test")
+
+    def stage(name, value):
+        def run(*deps):
+            calls.append(name)
+            time.sleep(delay)
+            return value + sum(deps)
+        return run
+
+    graph.add("a", stage("a", 1))
+    graph.add("b", stage("b", 10))
+    graph.add("c", stage("c", 100), deps=("a", "b"))
+    return graph
+
+
+@pytest.mark.timeout(TIMEOUT)
+def test_serial_and_concurrent_give_same_results():
+    """순서대로 실행과 동시 실행의 결과가 같고, 동시 실행 시 독립 단계가 겹쳐 실행되는지 확인"""
+    serial_calls, concurrent_calls = [], []
+    serial = build_graph(serial_calls)
+    concurrent = build_graph(concurrent_calls)
+
+    serial_results = serial.run(max_workers=1)
+    concurrent_results = concurrent.run(max_workers=3)
+
+    assert serial_results == concurrent_results == {"a": 1, "b": 10, "c": 111}
+    assert serial_calls == ["a", "b", "c"]
+    assert concurrent_calls[-1] == "c"
+    # a와 b가 겹쳐 실행되므로 전체 시간은 세 단계를 순서대로 실행한 시간보다 짧음
+    assert concurrent.timings["total"] < serial.timings["total"] - 0.1
+    assert set(concurrent.timings) == {"a", "b", "c", "total"}
+
+
+@pytest.mark.timeout(TIMEOUT)
+def test_stage_error_is_raised():
+    """단계에서 발생한 예외가 호출 측으로 전달되고, 의존 단계는 실행되지 않는지 확인"""
+    calls = []
+    graph = StageGraph("test")
+    graph.add("ok", lambda: calls.append("ok"))
+    graph.add("fail", lambda: 1 / 0)
+    graph.add("after", lambda _: calls.append("after"), deps=("fail",))
+
+    with pytest.raises(ZeroDivisionError):
+        graph.run(max_workers=2)
+    assert "after" not in calls
+
+    with pytest.raises(ValueError):
+        graph.add("broken", lambda: None, deps=("missing",))
+
+
+@pytest.mark.timeout(TIMEOUT)
+def test_cancellation_stops_running_stages_without_waiting():
+    """단계에서 TaskCancelled가 나면 실행 중인 단계를 기다리지 않고 전달하고, stop_event로 중단을 알리는지 확인"""
+    graph = StageGraph("test")
+    started, stopped = threading.Event(), threading.Event()
+
+    def long_stage():
+        started.set()
+        # 세그먼트 사이에서 취소 이벤트를 확인하는 긴 추론 단계 (이벤트가 없으면 3초 동안 실행)
+        if graph.stop_event.wait(3):
+            stopped.set()
+
+    def cancel():
+        started.wait(1)
+        raise TaskCancelled("task-1")
+
+    graph.add("long", long_stage)
+    graph.add("cancel", cancel)
+
+    start_time = time.time()
+    with pytest.raises(TaskCancelled):
+        graph.run(max_workers=2)
+    assert time.time() - start_time < 1
+    assert stopped.wait(1)
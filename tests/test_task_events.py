@@ -0,0 +1,82 @@
+import json
+import asyncio
+
+import pytest
+
+from workers import task_events
+from workers.task_events import publish_task_event, stream_task_events, task_channel
+
+TIMEOUT = 5
+
+
+@pytest.fixture
+def fake_redis(monkeypatch):
+    """동기/비동기 클라이언트가 같은 가짜 Redis 서버를 쓰도록 설정"""
+    fakeredis = pytest.importorskip("fakeredis")
+    pytest.importorskip("fakeredis.aioredis")
+    server = fakeredis.FakeServer()
+    monkeypatch.setattr(task_events, "_redis", fakeredis.FakeRedis(server=server))
+    monkeypatch.setattr(task_events, "_async_redis", fakeredis.aioredis.FakeRedis(server=server))
+    return task_events._redis
+
+
+async def collect(task_id, snapshot, publish=(), **kwargs):
+    """스트림을 끝까지 읽으면서, 첫 이벤트(구독 완료) 뒤에 publish의 이벤트를 발행"""
+    events = []
+    async for event in stream_task_events(task_id, snapshot, **kwargs):
+        events.append(event)
+        if len(events) == 1:
+            for published in publish:
+                publish_task_event(task_id, published)
+    return events
+
+
+@pytest.mark.timeout(TIMEOUT)
+def test_publish_task_event(fake_redis, monkeypatch):
+    """태스크 채널로 task_id가 포함된 JSON을 발행하고, 발행에 실패해도 예외 없이 False를 반환하는지 확인"""
+    pubsub = fake_redis.pubsub()
+    pubsub.subscribe(task_channel("task-1"))
+    pubsub.get_message(timeout=1)
+
+    assert publish_task_event("task-1", {"status": "PROGRESS", "progress": 10})
+    message = pubsub.get_message(ignore_subscribe_messages=True, timeout=1)
+    assert json.loads(message["data"]) == {"task_id": "task-1", "status": "PROGRESS", "progress": 10}
+
+    assert not publish_task_event(None, {"status": "PROGRESS"})
+
+    def broken_publish(channel, payload):
+        raise ConnectionError("redis down")
+    monkeypatch.setattr(fake_redis, "publish", broken_publish)
+    assert not publish_task_event("task-1", {"status": "PROGRESS"})
+
+
+@pytest.mark.timeout(TIMEOUT)
+def test_stream_yields_snapshot_then_events_until_final_state(fake_redis):
+    """현재 상태를 첫 이벤트로 보내고, 발행된 이벤트를 차례로 전달하다 최종 상태에서 끝나는지 확인"""
+    async def snapshot():
+        return {"task_id": "task-1", "status": "PENDING", "progress": 0}
+
+    events = asyncio.run(collect("task-1", snapshot, publish=[
+        {"status": "PROGRESS", "progress": 50},
+        {"status": "SUCCESS", "progress": 100},
+        {"status": "PROGRESS", "progress": 0},
+    ]))
+
+    # 연결 유지(None)는 이벤트 사이 어디에나 올 수 있으므로 제외하고 비교
+    assert [event["status"] for event in events if event is not None] == ["PENDING", "PROGRESS", "SUCCESS"]
+
+
+@pytest.mark.timeout(TIMEOUT)
+def test_stream_keepalive_and_finished_snapshot(fake_redis):
+    """이벤트가 없으면 None(연결 유지)을 보내고, 이미 끝난 태스크는 현재 상태만 보내고 끝나는지 확인"""
+    async def pending():
+        return {"task_id": "task-1", "status": "PENDING"}
+
+    async def finished():
+        return {"task_id": "task-2", "status": "FAILURE", "error": "boom"}
+
+    events = asyncio.run(collect("task-1", pending, keepalive=0.05, timeout=0.2))
+    assert events[0]["status"] == "PENDING"
+    assert len(events) > 1 and all(event is None for event in events[1:])
+
+    assert asyncio.run(collect("task-2", finished)) == [{"task_id": "task-2", "status": "FAILURE", "error": "boom"}]
@@ -1,10 +1,4 @@
 # workers package
-
-# SciPy 호환성 패치
-# 최신 버전의 SciPy에서는 scipy.signal.hann이 scipy.signal.windows.hann으로 이동했습니다.
-import scipy.signal
-
-# 패치 적용: scipy.signal.hann이 없으면 windows.hann을 사용
-if not hasattr(scipy.signal, 'hann') and hasattr(scipy.signal, 'windows') and hasattr(scipy.signal.windows, 'hann'):
-    print("패치 적용: scipy.signal.hann -> scipy.signal.windows.hann")
-    scipy.signal.hann = scipy.signal.windows.hann
\ No newline at end of file
+#
+# API 게이트웨이도 이 패키지의 가벼운 모듈(celery_app, signatures, gpu_*)을 import하므로
+# 여기서는 무거운 라이브러리를 가져오지 않습니다. SciPy 호환성 패치는 workers.dsp에서 적용합니다.
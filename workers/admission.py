@@ -0,0 +1,221 @@
+import os
+import math
+import time
+import logging
+from typing import Any, Dict, Optional
+
+# 로깅 설정
+logger = logging.getLogger(__name__)
+
+# API 작업 접수 제한 설정
+# 게이트웨이는 작업을 큐에 넣기 전에 큐 길이와 예상 대기 시간을 확인하고, 한도를 넘으면 429/503으로 거절합니다
+ADMISSION_ENABLED = os.environ.get("ADMISSION_ENABLED", "false").lower() == "true"
+ADMISSION_REDIS_URL = os.environ.get(
+    "ADMISSION_REDIS_URL", os.environ.get("CELERY_BROKER_URL", "redis://redis:6379/0")
+)
+# interactive 큐: 예상 대기 시간이 이 값(초)을 넘으면 429, 큐 길이가 이 값을 넘으면 503
+ADMISSION_MAX_WAIT = float(os.environ.get("ADMISSION_MAX_WAIT", 120))
+ADMISSION_MAX_QUEUE_DEPTH = int(os.environ.get("ADMISSION_MAX_QUEUE_DEPTH", 200))
+# bulk_reference 큐 길이 한도 (레퍼런스 일괄 등록은 대기 시간보다 Redis 메모리가 문제이므로 길이만 제한)
+ADMISSION_BULK_MAX_QUEUE_DEPTH = int(os.environ.get("ADMISSION_BULK_MAX_QUEUE_DEPTH", 500))
+# 큐를 동시에 처리하는 워커 슬롯 수 (모든 interactive 워커의 -c 합계)
+ADMISSION_WORKER_SLOTS = int(os.environ.get("ADMISSION_WORKER_SLOTS", 2))
+# 처리 시간 기록이 아직 없을 때 사용할 태스크당 처리 시간 (초)
+ADMISSION_DEFAULT_TASK_SECONDS = float(os.environ.get("ADMISSION_DEFAULT_TASK_SECONDS", 30))
+# 같은 큐 상태를 다시 조회하지 않고 재사용하는 시간 (초)
+ADMISSION_CACHE_SECONDS = float(os.environ.get("ADMISSION_CACHE_SECONDS", 1))
+# 처리 시간 지수 이동 평균의 가중치
+ADMISSION_EWMA_ALPHA = float(os.environ.get("ADMISSION_EWMA_ALPHA", 0.2))
+
+# 작업 하나의 처리 시간 합계를 모으는 동안 유지할 시간 (초, 취소된 작업의 기록은 이 시간 후 삭제)
+ADMISSION_JOB_TTL = int(os.environ.get("ADMISSION_JOB_TTL", 3600))
+
+STATS_KEY_PREFIX = "admission:stats:"
+# 큐에서 기다리는 최상위 작업 수 (게이트웨이가 제출할 때 증가, 워커가 시작하거나 취소된 메시지를 버릴 때 감소)
+PENDING_KEY_PREFIX = "admission:pending:"
+# 작업(최상위 태스크 ID)별 처리 시간 합계와 작업이 제출된 큐
+JOB_KEY_PREFIX = "admission:job:"
+
+# 큐별 한도: (최대 큐 길이, 최대 예상 대기 시간 또는 None)
+QUEUE_LIMITS = {
+    "interactive": (ADMISSION_MAX_QUEUE_DEPTH, ADMISSION_MAX_WAIT),
+    "bulk_reference": (ADMISSION_BULK_MAX_QUEUE_DEPTH, None),
+}
+
+# 태스크 처리 시간의 지수 이동 평균을 원자적으로 갱신
+_RECORD_SCRIPT = """
+local seconds = tonumber(ARGV[1])
+local ewma = tonumber(redis.call('HGET', KEYS[1], 'ewma_seconds') or ARGV[1])
+ewma = ewma + tonumber(ARGV[2]) * (seconds - ewma)
+redis.call('HSET', KEYS[1], 'ewma_seconds', tostring(ewma))
+redis.call('HINCRBY', KEYS[1], 'completed', 1)
+return tostring(ewma)
+"""
+
+# 0 아래로 내려가지 않도록 대기 작업 수 감소 (게이트웨이를 거치지 않고 제출된 작업 대비)
+_DECREMENT_SCRIPT = """
+if tonumber(redis.call('GET', KEYS[1]) or '0') > 0 then
+    return redis.call('DECR', KEYS[1])
+end
+return 0
+"""
+
+
+def _priority_keys(queue: str):
+    """Redis 브로커에서 큐의 우선순위별 목록 키 (celeryconfig.broker_transport_options 기준)"""
+    from celeryconfig import broker_transport_options
+    sep = broker_transport_options.get("sep", ":")
+    return [f"{queue}{sep}{step}" if step else queue for step in broker_transport_options.get("priority_steps", [0])]
+
+
+class QueueAdmission:
+    """큐 길이와 예상 대기 시간 기반 API 작업 접수 제어
+
+    예상 대기 시간 = 큐에 쌓인 작업 수 × 작업당 평균 처리 시간 / 워커 슬롯 수
+
+    작업은 게이트웨이가 제출한 최상위 태스크 하나이며, 캔버스 서브태스크와 replace()로 이어지는 단계를 포함합니다.
+    - 작업 수: 브로커 큐 길이는 서브태스크 메시지까지 세므로, 게이트웨이 제출 시 늘리고 워커가 최상위 태스크를
+      시작할 때 줄이는 카운터를 사용합니다 (큐 길이를 넘지 않도록 제한)
+    - 작업당 처리 시간: 워커가 태스크를 마칠 때마다 add_job_time()으로 같은 작업의 워커 슬롯 사용 시간을 더하고,
+      최종 태스크가 끝나면 finish_job()으로 합계를 평균에 반영합니다
+    Redis에 연결할 수 없으면 제한 없이 접수합니다 (fail-open).
+    """
+
+    def __init__(self, redis_url: str = ADMISSION_REDIS_URL, enabled: bool = ADMISSION_ENABLED,
+                 worker_slots: int = ADMISSION_WORKER_SLOTS, cache_seconds: float = ADMISSION_CACHE_SECONDS):
+        self.redis_url = redis_url
+        self.enabled = enabled
+        self.worker_slots = max(1, worker_slots)
+        self.cache_seconds = cache_seconds
+        self._redis = None
+        self._record_script = None
+        self._decrement_script = None
+        self._cache: Dict[str, Any] = {}
+
+    def _get_redis(self):
+        if self._redis is None:
+            import redis
+            self._redis = redis.Redis.from_url(self.redis_url, socket_timeout=2, socket_connect_timeout=2)
+            self._record_script = self._redis.register_script(_RECORD_SCRIPT)
+            self._decrement_script = self._redis.register_script(_DECREMENT_SCRIPT)
+        return self._redis
+
+    def task_enqueued(self, queue: str):
+        """게이트웨이에서 최상위 작업을 큐에 넣은 뒤 호출"""
+        if not self.enabled or queue not in QUEUE_LIMITS:
+            return
+        try:
+            self._get_redis().incr(f"{PENDING_KEY_PREFIX}{queue}")
+        except Exception as e:
+            logger.warning(f"대기 작업 수 증가 실패 ({queue}): {e}")
+
+    def task_dequeued(self, queue: Optional[str]):
+        """워커에서 최상위 작업을 시작하거나 취소된 메시지를 버릴 때 호출"""
+        if not self.enabled or queue not in QUEUE_LIMITS:
+            return
+        try:
+            self._get_redis()
+            self._decrement_script(keys=[f"{PENDING_KEY_PREFIX}{queue}"])
+        except Exception as e:
+            logger.warning(f"대기 작업 수 감소 실패 ({queue}): {e}")
+
+    def add_job_time(self, job_id: str, queue: Optional[str], seconds: float):
+        """작업에 속한 태스크 하나의 처리 시간을 작업 합계에 더함 (접수 제한 대상 큐에서 실행된 태스크만)
+
+        작업의 큐는 처음 기록한 태스크(최상위 태스크)의 큐입니다.
+        """
+        if not self.enabled or queue not in QUEUE_LIMITS:
+            return
+        key = f"{JOB_KEY_PREFIX}{job_id}"
+        try:
+            pipe = self._get_redis().pipeline()
+            pipe.hincrbyfloat(key, "seconds", seconds)
+            pipe.hsetnx(key, "queue", queue)
+            pipe.expire(key, ADMISSION_JOB_TTL)
+            pipe.execute()
+        except Exception as e:
+            logger.warning(f"작업 처리 시간 기록 실패 ({job_id}): {e}")
+
+    def finish_job(self, job_id: str):
+        """작업의 최종 태스크가 끝나면 처리 시간 합계를 작업 큐의 평균 처리 시간에 반영"""
+        if not self.enabled:
+            return
+        key = f"{JOB_KEY_PREFIX}{job_id}"
+        try:
+            pipe = self._get_redis().pipeline()
+            pipe.hgetall(key)
+            pipe.delete(key)
+            job, _ = pipe.execute()
+        except Exception as e:
+            logger.warning(f"작업 처리 시간 조회 실패 ({job_id}): {e}")
+            return
+        if job:
+            self.record_task_duration(job[b"queue"].decode(), float(job[b"seconds"]))
+
+    def record_task_duration(self, queue: Optional[str], seconds: float):
+        """작업당 처리 시간을 큐의 평균에 반영 (실패해도 태스크에는 영향 없음)"""
+        if not self.enabled or queue not in QUEUE_LIMITS:
+            return
+        try:
+            self._get_redis()
+            self._record_script(keys=[f"{STATS_KEY_PREFIX}{queue}"], args=[seconds, ADMISSION_EWMA_ALPHA])
+        except Exception as e:
+            logger.warning(f"태스크 처리 시간 기록 실패 ({queue}): {e}")
+
+    def evaluate(self, queue: str, depth: int, avg_task_seconds: float) -> Dict[str, Any]:
+        """큐 상태로 접수 여부 판단
+
+        Returns:
+            queue, depth, avg_task_seconds, estimated_wait_seconds, accepting과
+            거절 시 status_code(429/503), retry_after(초), reason을 담은 딕셔너리
+        """
+        max_depth, max_wait = QUEUE_LIMITS.get(queue, (None, None))
+        estimated_wait = (depth + 1) * avg_task_seconds / self.worker_slots
+        status = {
+            "queue": queue,
+            "depth": depth,
+            "avg_task_seconds": round(avg_task_seconds, 2),
+            "estimated_wait_seconds": round(estimated_wait, 1),
+            "accepting": True,
+        }
+        if max_depth is not None and depth >= max_depth:
+            # 큐가 가득 참: 한도 아래로 내려갈 때까지 걸리는 시간 후 재시도
+            drain = (depth - max_depth + 1) * avg_task_seconds / self.worker_slots
+            status.update(accepting=False, status_code=503, retry_after=max(1, math.ceil(drain)),
+                          reason=f"{queue} 큐가 가득 찼습니다 ({depth}/{max_depth})")
+        elif max_wait is not None and estimated_wait > max_wait:
+            # 대기 시간이 김: 예상 대기 시간이 한도 아래로 줄어들 때까지 기다린 후 재시도
+            status.update(accepting=False, status_code=429, retry_after=max(1, math.ceil(estimated_wait - max_wait)),
+                          reason=f"{queue} 큐 예상 대기 시간 {estimated_wait:.0f}초가 한도 {max_wait:.0f}초를 넘었습니다")
+        return status
+
+    def status(self, queue: str) -> Dict[str, Any]:
+        """큐의 현재 길이, 평균 처리 시간, 예상 대기 시간과 접수 여부"""
+        if not self.enabled:
+            return {"queue": queue, "enabled": False, "accepting": True}
+        cached = self._cache.get(queue)
+        if cached and time.monotonic() - cached[0] < self.cache_seconds:
+            return cached[1]
+        try:
+            client = self._get_redis()
+            pipe = client.pipeline()
+            for key in _priority_keys(queue):
+                pipe.llen(key)
+            pipe.get(f"{PENDING_KEY_PREFIX}{queue}")
+            pipe.hget(f"{STATS_KEY_PREFIX}{queue}", "ewma_seconds")
+            *lengths, pending, ewma = pipe.execute()
+            avg_task_seconds = float(ewma) if ewma is not None else ADMISSION_DEFAULT_TASK_SECONDS
+            # 카운터가 어긋나도(워커 강제 종료 등) 브로커 큐 길이보다 많은 작업을 세지 않음
+            depth = max(0, min(int(pending or 0), sum(lengths)))
+            status = self.evaluate(queue, depth, avg_task_seconds)
+        except Exception as e:
+            # Redis 장애가 작업 접수 자체를 막지 않도록 제한 없이 통과
+            logger.warning(f"큐 상태 조회 실패 (제한 없이 접수): {e}")
+            return {"queue": queue, "enabled": True, "accepting": True, "error": str(e)}
+        status["enabled"] = True
+        self._cache[queue] = (time.monotonic(), status)
+        return status
+
+
+# 게이트웨이와 워커 프로세스에서 공유하는 접수 제어 인스턴스
+queue_admission = QueueAdmission()
@@ -0,0 +1,89 @@
+import io
+import os
+import uuid
+import logging
+from typing import Dict, List, Optional
+
+import numpy as np
+
+# 로깅 설정
+logger = logging.getLogger(__name__)
+
+# 태스크 사이에 주고받는 중간 배열 저장소 설정
+# Celery 메시지/결과에는 참조 문자열만 담고 실제 배열은 Redis에 저장합니다
+BLOB_STORE_REDIS_URL = os.environ.get(
+    "BLOB_STORE_REDIS_URL", os.environ.get("CELERY_RESULT_BACKEND", "redis://redis:6379/1")
+)
+# 파이프라인이 정리하지 못한 블롭이 자동으로 만료되는 시간 (초)
+BLOB_STORE_TTL = int(os.environ.get("BLOB_STORE_TTL", 3600))
+
+BLOB_KEY_PREFIX = "blob:"
+
+
+class BlobStore:
+    """numpy 배열 묶음을 Redis에 저장하고 참조 문자열로 주고받는 저장소
+
+    배열은 np.savez 형식(pickle 사용 안 함)으로 직렬화합니다.
+    """
+
+    def __init__(self, redis_url: str = BLOB_STORE_REDIS_URL, ttl: int = BLOB_STORE_TTL):
+        self.redis_url = redis_url
+        self.ttl = ttl
+        self._redis = None
+
+    def _get_redis(self):
+        if self._redis is None:
+            import redis
+            self._redis = redis.Redis.from_url(self.redis_url, socket_timeout=10, socket_connect_timeout=2)
+        return self._redis
+
+    def put_arrays(self, arrays: Dict[str, np.ndarray], ttl: Optional[int] = None) -> str:
+        """배열 묶음 저장
+
+        Args:
+            arrays: 이름 -> 배열
+            ttl: 만료 시간 (초, 기본값: BLOB_STORE_TTL)
+
+        Returns:
+            블롭 참조 문자열
+        """
+        buffer = io.BytesIO()
+        np.savez(buffer, **arrays)
+        ref = f"{BLOB_KEY_PREFIX}{uuid.uuid4().hex}"
+        self._get_redis().set(ref, buffer.getvalue(), ex=ttl or self.ttl)
+        return ref
+
+    def get_arrays(self, ref: str) -> Dict[str, np.ndarray]:
+        """참조로 배열 묶음 조회. 없거나 만료되었으면 KeyError"""
+        data = self._get_redis().get(ref)
+        if data is None:
+            raise KeyError(f"블롭을 찾을 수 없음 (만료되었거나 삭제됨): {ref}")
+        with np.load(io.BytesIO(data), allow_pickle=False) as archive:
+            return {name: archive[name] for name in archive.files}
+
+    def put_segments(self, segments: List[np.ndarray], ttl: Optional[int] = None) -> str:
+        """길이가 다른 오디오 세그먼트 목록을 이어 붙여 하나의 블롭으로 저장"""
+        lengths = np.array([len(segment) for segment in segments], dtype=np.int64)
+        samples = (np.concatenate([np.asarray(segment, dtype=np.float32) for segment in segments])
+                   if segments else np.zeros(0, dtype=np.float32))
+        return self.put_arrays({"samples": samples, "lengths": lengths}, ttl)
+
+    def get_segments(self, ref: str) -> List[np.ndarray]:
+        """put_segments로 저장한 세그먼트 목록 조회"""
+        arrays = self.get_arrays(ref)
+        offsets = np.concatenate([[0], np.cumsum(arrays["lengths"])])
+        return [arrays["samples"][offsets[i]:offsets[i + 1]] for i in range(len(arrays["lengths"]))]
+
+    def delete(self, *refs: str):
+        """블롭 삭제 (실패해도 TTL로 만료되므로 경고만 남김)"""
+        refs = [ref for ref in refs if ref]
+        if not refs:
+            return
+        try:
+            self._get_redis().delete(*refs)
+        except Exception as e:
+            logger.warning(f"블롭 삭제 실패 (TTL 후 만료됨): {e}")
+
+
+# 워커 프로세스에서 공유하는 블롭 저장소
+blob_store = BlobStore()
@@ -0,0 +1,79 @@
+import os
+import time
+import logging
+from typing import Any, Dict, List, Optional
+
+# 로깅 설정
+logger = logging.getLogger(__name__)
+
+# 태스크 시간 예산 설정
+# 단계마다 남은 시간과 예상 소요 시간을 비교하고, 부족하면 더 싼 방식으로 바꿔 결과에 degraded로 표시합니다
+# (SoftTimeLimitExceeded로 전체가 실패하는 대신 부분 결과를 반환)
+TASK_BUDGET_ENABLED = os.environ.get("TASK_BUDGET_ENABLED", "true").lower() == "true"
+# 태스크당 시간 예산 (초, 기본값: celeryconfig.task_soft_time_limit 500초에서 점수 계산/저장 시간 60초를 뺀 값)
+TASK_BUDGET_SECONDS = float(os.environ.get("TASK_BUDGET_SECONDS", 440))
+# 예상 소요 시간에 곱하는 안전 계수 (추정치가 낙관적인 경우 대비)
+TASK_BUDGET_SAFETY_FACTOR = float(os.environ.get("TASK_BUDGET_SAFETY_FACTOR", 1.5))
+# 크로마 DTW 정렬의 프레임당 예상 소요 시간 (초 / (사용자 프레임 수 + 레퍼런스 프레임 수))
+TASK_BUDGET_DTW_SECONDS_PER_FRAME = float(os.environ.get("TASK_BUDGET_DTW_SECONDS_PER_FRAME", 0.001))
+
+# 예산이 부족할 때 사용하는 저비용 설정
+# DTW 정렬 전에 크로마 프레임을 이 간격으로 건너뜀
+DEGRADED_DTW_DOWNSAMPLE = int(os.environ.get("DEGRADED_DTW_DOWNSAMPLE", 4))
+# 로컬 CREPE 모델 크기 (tiny, small, medium, large, full)
+DEGRADED_CREPE_CAPACITY = os.environ.get("DEGRADED_CREPE_CAPACITY", "tiny")
+
+
+class TaskBudget:
+    """태스크 시간 예산
+
+    각 단계는 실행 전에 allows(예상 소요 시간)로 남은 예산을 확인하고, 부족하면 저비용 방식으로 실행한 뒤
+    degrade()로 기록합니다. 기록은 mark_degraded()로 결과에 degraded/degradations로 추가합니다.
+    """
+
+    def __init__(self, seconds: float = TASK_BUDGET_SECONDS, enabled: bool = TASK_BUDGET_ENABLED,
+                 safety_factor: float = TASK_BUDGET_SAFETY_FACTOR):
+        self.seconds = seconds
+        self.enabled = enabled
+        self.safety_factor = safety_factor
+        self.deadline = time.monotonic() + seconds
+        self.degradations: List[Dict[str, Any]] = []
+
+    def remaining(self) -> float:
+        """남은 예산 (초)"""
+        return max(0.0, self.deadline - time.monotonic())
+
+    def allows(self, estimated_seconds: float) -> bool:
+        """예상 소요 시간(초)의 단계를 남은 예산 안에 끝낼 수 있는지 여부 (비활성화 시 항상 True)"""
+        return not self.enabled or estimated_seconds * self.safety_factor <= self.remaining()
+
+    def degrade(self, stage: str, mode: str, estimated_seconds: Optional[float] = None):
+        """단계를 저비용 방식으로 바꿨음을 기록
+
+        Args:
+            stage: 단계 이름 (alignment, pitch, techniques 등)
+            mode: 대신 사용한 방식 (coarse_dtw, crepe_tiny, skipped 등)
+            estimated_seconds: 원래 방식의 예상 소요 시간
+        """
+        entry = {"stage": stage, "mode": mode, "remaining_seconds": round(self.remaining(), 1)}
+        if estimated_seconds is not None:
+            entry["estimated_seconds"] = round(estimated_seconds, 1)
+        logger.warning(f"시간 예산 부족으로 {stage} 단계를 {mode} 방식으로 실행: {entry}")
+        self.degradations.append(entry)
+
+    def degraded(self, stage: str) -> bool:
+        """단계를 저비용 방식으로 실행했는지 여부"""
+        return any(entry["stage"] == stage for entry in self.degradations)
+
+
+def mark_degraded(result: Dict[str, Any], degradations: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """저비용 방식으로 실행한 단계가 있으면 결과에 degraded와 degradations 추가
+
+    Args:
+        result: 태스크 결과
+        degradations: TaskBudget.degradations (캔버스는 여러 단계의 기록을 합친 리스트)
+    """
+    if degradations:
+        result["degraded"] = True
+        result["degradations"] = list(degradations)
+    return result
@@ -0,0 +1,120 @@
+import os
+import time
+import logging
+from typing import Callable, Optional
+
+# 로깅 설정
+logger = logging.getLogger(__name__)
+
+# 작업 취소 설정
+# 게이트웨이가 DELETE /v1/tasks/{task_id}를 받으면 Redis에 취소 플래그를 남기고,
+# 실행 중인 태스크는 진행률을 보고할 때(단계 사이, 세그먼트/GPU 배치 사이) 플래그를 확인해 스스로 중단합니다
+TASK_CANCEL_REDIS_URL = os.environ.get(
+    "TASK_CANCEL_REDIS_URL", os.environ.get("CELERY_RESULT_BACKEND", "redis://redis:6379/1")
+)
+# 취소 플래그 유지 시간 (초). 큐 대기 시간 + task_time_limit보다 길게
+TASK_CANCEL_TTL = int(os.environ.get("TASK_CANCEL_TTL", 3600))
+# 실행 중인 태스크가 취소 플래그를 다시 조회하기까지의 최소 간격 (초)
+TASK_CANCEL_CHECK_INTERVAL = float(os.environ.get("TASK_CANCEL_CHECK_INTERVAL", 1.0))
+
+CANCEL_KEY_PREFIX = "task_cancel:"
+# 게이트웨이가 제출한 작업 ID 표시 (Celery는 모르는 작업 ID도 PENDING으로 보고하므로 취소 요청 검증에 사용)
+SUBMITTED_KEY_PREFIX = "task_submitted:"
+
+
+class TaskCancelled(BaseException):
+    """취소 요청을 받은 태스크를 중단시키는 예외
+
+    asyncio.CancelledError처럼 BaseException을 상속하므로, 오류를 기록하고 기본값으로 계속 진행하는
+    except Exception 블록(GPU 요청 재시도, 단계별 폴백 등)에 잡히지 않고 태스크 밖으로 전달됩니다.
+    """
+
+    def __init__(self, task_id: str):
+        super().__init__(f"작업이 취소되었습니다: {task_id}")
+        self.task_id = task_id
+
+
+class TaskCancellation:
+    """Redis 플래그 기반 협조적 작업 취소
+
+    Redis에 연결할 수 없으면 취소 요청이 없는 것으로 보고 태스크를 계속 실행합니다 (fail-open).
+    """
+
+    def __init__(self, redis_url: str = TASK_CANCEL_REDIS_URL, ttl: int = TASK_CANCEL_TTL,
+                 check_interval: float = TASK_CANCEL_CHECK_INTERVAL):
+        self.redis_url = redis_url
+        self.ttl = ttl
+        self.check_interval = check_interval
+        self._redis = None
+
+    def _get_redis(self):
+        if self._redis is None:
+            import redis
+            self._redis = redis.Redis.from_url(self.redis_url, socket_timeout=2, socket_connect_timeout=2)
+        return self._redis
+
+    def register(self, task_id: str):
+        """게이트웨이가 제출한 작업 ID 기록 (TTL 동안 취소 요청을 받을 수 있음)"""
+        try:
+            self._get_redis().set(f"{SUBMITTED_KEY_PREFIX}{task_id}", 1, ex=self.ttl)
+        except Exception as e:
+            logger.warning(f"제출 작업 ID 기록 실패 ({task_id}): {e}")
+
+    def is_known(self, task_id: str) -> bool:
+        """제출 기록이나 취소 플래그가 있는 작업 ID인지 여부 (Redis에 연결할 수 없으면 True)"""
+        try:
+            return self._get_redis().exists(f"{SUBMITTED_KEY_PREFIX}{task_id}", f"{CANCEL_KEY_PREFIX}{task_id}") > 0
+        except Exception as e:
+            logger.warning(f"제출 작업 ID 조회 실패 ({task_id}): {e}")
+            return True
+
+    def request(self, task_id: str) -> bool:
+        """작업 취소 요청 (플래그 저장에 성공하면 True)"""
+        try:
+            self._get_redis().set(f"{CANCEL_KEY_PREFIX}{task_id}", 1, ex=self.ttl)
+            return True
+        except Exception as e:
+            logger.warning(f"작업 취소 플래그 저장 실패 ({task_id}): {e}")
+            return False
+
+    def is_requested(self, task_id: str) -> bool:
+        """작업 취소 요청 여부"""
+        try:
+            return bool(self._get_redis().exists(f"{CANCEL_KEY_PREFIX}{task_id}"))
+        except Exception as e:
+            logger.warning(f"작업 취소 플래그 조회 실패 ({task_id}): {e}")
+            return False
+
+    def clear(self, task_id: str):
+        """취소 처리를 마친 작업의 플래그 삭제"""
+        try:
+            self._get_redis().delete(f"{CANCEL_KEY_PREFIX}{task_id}")
+        except Exception as e:
+            logger.warning(f"작업 취소 플래그 삭제 실패 ({task_id}): {e}")
+
+    def checker(self, task_id: Optional[str]) -> Callable[..., None]:
+        """호출할 때마다 취소 여부를 확인하고 취소됐으면 TaskCancelled를 발생시키는 함수
+
+        Redis 조회는 check_interval마다 한 번만 하고, 한 번 취소를 확인하면 이후 호출은 모두 바로 예외를 발생시킵니다.
+        (처리한 수, 전체 수) 인자를 무시하므로 세그먼트/배치 루프의 progress_callback으로도 사용할 수 있습니다.
+
+        Args:
+            task_id: 취소 플래그를 확인할 작업 ID (None이면 확인하지 않음)
+        """
+        state = {"checked_at": None, "cancelled": False}
+
+        def check(*args):
+            if task_id is None:
+                return
+            now = time.monotonic()
+            if not state["cancelled"] and (state["checked_at"] is None
+                                           or now - state["checked_at"] >= self.check_interval):
+                state["checked_at"] = now
+                state["cancelled"] = self.is_requested(task_id)
+            if state["cancelled"]:
+                raise TaskCancelled(task_id)
+        return check
+
+
+# 게이트웨이와 워커에서 공유하는 작업 취소 인스턴스
+task_cancellation = TaskCancellation()
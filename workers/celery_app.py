@@ -0,0 +1,15 @@
+"""Celery 앱 인스턴스
+
+워커(workers.tasks)와 API 게이트웨이(workers.signatures)가 함께 사용합니다.
+무거운 DSP/ML 모듈을 import하지 않으므로 게이트웨이에서 가볍게 가져올 수 있습니다.
+"""
+from celery import Celery
+
+from workers.serialization import register_msgpack_numpy
+
+# celeryconfig가 참조하는 직렬화기를 앱 설정보다 먼저 등록
+register_msgpack_numpy()
+
+# Initialize Celery app
+celery_app = Celery('maple_audio_analyzer')
+celery_app.config_from_object('celeryconfig')
@@ -1,24 +1,34 @@
 import os
 import io
+import functools
 import numpy as np
+import scipy.signal
+
+# SciPy 호환성 패치: 최신 버전에서는 scipy.signal.hann이 windows 모듈로 이동함
+# (librosa, crepe보다 먼저 적용해야 하므로 import 순서를 유지)
+if not hasattr(scipy.signal, 'hann') and hasattr(scipy.signal, 'windows') and hasattr(scipy.signal.windows, 'hann'):
+    scipy.signal.hann = scipy.signal.windows.hann
+
 import librosa
 import tempfile
 import pretty_midi
 from sklearn.metrics import f1_score
-from keras.models import load_model  # 독립 Keras 패키지 사용
 from fastdtw import fastdtw
 from scipy.spatial.distance import euclidean
 import crepe
-import scipy.signal
 import time
 from celery.utils.log import get_task_logger
 
-logger = get_task_logger(__name__)
+from workers.gpu_router import gpu_router
+from workers.models import TECHNIQUES, get_technique_model
+from workers.gpu_hedge import is_hedging_enabled, hedge_deadline, run_hedged
+from workers.inference_sidecar import is_sidecar_available, run_in_sidecar
+from workers.stages import StageGraph
 
-# SciPy 호환성 패치: 최신 버전에서는 scipy.signal.hann이 windows 모듈로 이동함
-if not hasattr(scipy.signal, 'hann') and hasattr(scipy.signal, 'windows') and hasattr(scipy.signal.windows, 'hann'):
-    scipy.signal.hann = scipy.signal.windows.hann
+logger = get_task_logger(__name__)
 
+# 로컬 기법 예측 시 한 번에 스펙트로그램을 만들고 predict를 호출할 세그먼트 수 (메모리 사용량 상한)
+LOCAL_TECHNIQUE_BATCH_SIZE = int(os.environ.get("LOCAL_TECHNIQUE_BATCH_SIZE", 32))
 
 def load_audio_from_bytes(audio_bytes):
     """Load audio data from bytes."""
@@ -106,27 +116,31 @@ def align_audio_with_dtw(user_y, orig_y, sr=22050):
     return time_mapping
 
 
-def align_audio_with_chromas(user_chroma, orig_chroma, sr=22050):
+def align_audio_with_chromas(user_chroma, orig_chroma, sr=22050, downsample=1):
     """크로마그램을 직접 이용한 DTW 오디오 정렬.
     
     Args:
         user_chroma: 사용자 오디오의 크로마그램
         orig_chroma: 원본 오디오의 크로마그램
-        user_duration: 사용자 오디오 길이(초)
-        orig_duration: 원본 오디오 길이(초)
         sr: 샘플링 레이트
+        downsample: 1보다 크면 크로마 프레임을 이 간격으로 건너뛰어 더 거칠고 빠르게 정렬 (시간 예산 부족 시)
         
     Returns:
         time_mapping: DTW 경로에 기반한 시간 매핑 [(user_time, orig_time), ...]
     """
+    hop_length = 2048
+    if downsample > 1:
+        user_chroma = user_chroma[:, ::downsample]
+        orig_chroma = orig_chroma[:, ::downsample]
+        hop_length *= downsample
     distance, path = fastdtw(user_chroma.T, orig_chroma.T, dist=euclidean)
     
-    user_duration = user_chroma.shape[1] * 2048 / sr
-    orig_duration = orig_chroma.shape[1] * 2048 / sr
+    user_duration = user_chroma.shape[1] * hop_length / sr
+    orig_duration = orig_chroma.shape[1] * hop_length / sr
     
     # Create time arrays for chroma features
-    user_times = librosa.frames_to_time(np.arange(user_chroma.shape[1]), sr=sr, hop_length=2048)
-    orig_times = librosa.frames_to_time(np.arange(orig_chroma.shape[1]), sr=sr, hop_length=2048)
+    user_times = librosa.frames_to_time(np.arange(user_chroma.shape[1]), sr=sr, hop_length=hop_length)
+    orig_times = librosa.frames_to_time(np.arange(orig_chroma.shape[1]), sr=sr, hop_length=hop_length)
     
     # Create time mapping based on DTW path
     time_mapping = []
@@ -278,30 +292,132 @@ def enhanced_segment_audio_with_midi_notes(y, time_mapping, notes, sr=22050, sea
     return segments, timestamps, onset_deviations
 
 
-def extract_pitch_with_pyin(segments, sr=22050):
-    """YIN 알고리즘을 사용한 대체 음정 추출 방법 (CREPE의 백업으로 사용)."""
-    # GPU 서버 사용 시도
+def _select_gpu_client(op, segments):
+    """GPU 서버를 사용할 수 있고 라우터가 GPU를 선택하면 GPU 클라이언트를, 아니면 None을 반환"""
     try:
         from workers.gpu_client import gpu_client, is_gpu_service_available
-        import logging
-        logger = logging.getLogger(__name__)
-        
-        if is_gpu_service_available():
-            # GPU 서버에 요청 보내기
-            logger.info("GPU 서버 연결 가능: 원격 pYIN 음정 추출 시도")
-            gpu_result = gpu_client.extract_pitch_with_pyin(segments, sr)
-            if gpu_result is not None:
-                logger.info(f"GPU 서버에서 pYIN 음정 추출 완료: {len(gpu_result)} 개 세그먼트")
-                return gpu_result
-            # GPU 요청 실패 시 로컬에서 계속 실행
-            logger.warning("GPU 서버 요청 실패: 로컬 CPU 폴백 실행")
     except ImportError:
         # gpu_client 모듈을 찾을 수 없는 경우
-        pass
-    
-    # 로컬 CPU 기반 실행 (원래 구현)
+        return None
+
+    if not segments or not is_gpu_service_available():
+        return None
+
+    if gpu_router.choose_backend(op, segments, batch_size=gpu_client.batch_size) != "gpu":
+        return None
+    return gpu_client
+
+
+def estimate_inference_seconds(op, segments):
+    """라우터의 처리율 추정치로 계산한 추론 예상 소요 시간 (초)
+
+    GPU 서버를 사용할 수 있으면 GPU/CPU 중 빠른 쪽, 아니면 CPU 기준입니다.
+    예산 확인은 단계마다 호출되므로 /livez를 요청하지 않고 캐시된 엔드포인트 헬스/서킷 상태만 봅니다.
+    """
+    try:
+        from workers.gpu_client import gpu_client
+    except ImportError:
+        gpu_client = None
+    if gpu_client is None or not segments or not gpu_client.pool.has_available():
+        return gpu_router.estimate(op, segments)["cpu"]
+    return min(gpu_router.estimate(op, segments, batch_size=gpu_client.batch_size).values())
+
+
+def _with_sidecar(op, segments, sr, local_call, model_path=None, model_capacity='full', progress_callback=None):
+    """호스트의 추론 사이드카를 먼저 사용하고, 사용할 수 없으면 프로세스 내에서 계산하는 로컬 함수 반환
+
+    사이드카 요청 중에도 cancel_event와 progress_callback이 동작하며, 취소되면 연결을 닫아 사이드카가 요청을 버립니다.
+    """
+    def call(cancel_event):
+        if is_sidecar_available() and not (cancel_event is not None and cancel_event.is_set()):
+            result = run_in_sidecar(op, segments, sr, model_path, model_capacity=model_capacity,
+                                    cancel_event=cancel_event, progress_callback=progress_callback)
+            if result is not None:
+                return result
+        return local_call(cancel_event)
+    return call
+
+
+def _run_inference(op, segments, sr, gpu_call, local_call, model_path=None, model_capacity='full',
+                   progress_callback=None):
+    """GPU 서버 또는 로컬 CPU에서 추론 실행.
+
+    라우터가 세그먼트 수, 총 샘플 수, 지연 이력을 기준으로 백엔드를 고릅니다.
+    GPU 요청이 실패하면 로컬 CPU로 폴백하며, 헤징 모드에서는 GPU 응답이 늦어질 때
+    로컬 계산을 함께 시작하여 먼저 끝난 결과를 사용합니다.
+    로컬 계산은 추론 사이드카가 실행 중이면 사이드카에서, 아니면 이 프로세스에서 수행합니다.
+    model_capacity가 'full'이 아니면(시간 예산 부족) GPU 서버는 full 모델만 제공하므로 로컬에서만 실행합니다.
+
+    Args:
+        op: 라우터 연산 이름 ("techniques", "crepe", "pyin", "analyze")
+        segments: 오디오 세그먼트 리스트
+        sr: 샘플링 레이트
+        gpu_call: (GPU 클라이언트, 취소 이벤트)를 받아 요청을 수행하는 함수
+        local_call: 취소 이벤트를 받아 로컬에서 계산하는 함수
+        model_path: 기법 분류 모델 경로 (사이드카 요청에 사용)
+        model_capacity: CREPE 모델 크기 (사이드카 요청에도 전달)
+        progress_callback: 사이드카 요청 중 진행률 콜백 함수 (current, total)
+
+    Returns:
+        추론 결과 리스트
+    """
+    local_call = _with_sidecar(op, segments, sr, local_call, model_path, model_capacity, progress_callback)
+    degraded = model_capacity != 'full'
+    gpu_client = None if degraded else _select_gpu_client(op, segments)
+    if gpu_client is not None:
+        logger.info(f"GPU 서버 연결 가능: 원격 {op} 추론 시도, 세그먼트 수: {len(segments)}")
+        start_time = time.time()
+        if is_hedging_enabled(op):
+            deadline = hedge_deadline(op, segments, batch_size=gpu_client.batch_size)
+            result, backend, backend_time = run_hedged(
+                op, deadline,
+                lambda cancel_event: gpu_call(gpu_client, cancel_event),
+                local_call
+            )
+        else:
+            result, backend = gpu_call(gpu_client, None), "gpu"
+            backend_time = time.time() - start_time
+        elapsed_time = time.time() - start_time
+
+        if result is not None:
+            # 헤징에서 이긴 백엔드의 소요 시간으로 처리율 갱신 (CPU 승리 시 로컬 계산 시간만 기록)
+            gpu_router.record(op, backend, segments, backend_time, batch_size=gpu_client.batch_size)
+            logger.info(f"{backend.upper()}에서 {op} 추론 완료: {len(segments)} 개 세그먼트, 소요 시간: {elapsed_time:.2f}초")
+            return result
+
+        # GPU 요청 실패 시 라우터에 벌점으로 기록하고 로컬에서 계속 실행
+        gpu_router.record_failure(op, segments, elapsed_time, batch_size=gpu_client.batch_size)
+        logger.warning(f"GPU 서버 요청 실패: 로컬 CPU 폴백 실행, 경과 시간: {elapsed_time:.2f}초")
+
+    # 로컬 CPU 기반 실행
+    start_time = time.time()
+    result = local_call(None)
+    # 작은 모델의 소요 시간은 full 모델 처리율 추정치에 넣지 않음
+    if not degraded:
+        gpu_router.record(op, "cpu", segments, time.time() - start_time)
+    return result
+
+
+def extract_pitch_with_pyin(segments, sr=22050, progress_callback=None):
+    """YIN 알고리즘을 사용한 대체 음정 추출 방법 (CREPE의 백업으로 사용)."""
+    return _run_inference(
+        "pyin", segments, sr,
+        lambda client, cancel_event: client.extract_pitch_with_pyin(
+            segments, sr, cancel_event=cancel_event, progress_callback=progress_callback
+        ),
+        lambda cancel_event: _extract_pitch_with_pyin_local(segments, sr, cancel_event, progress_callback),
+        progress_callback=progress_callback
+    )
+
+
+def _extract_pitch_with_pyin_local(segments, sr=22050, cancel_event=None, progress_callback=None):
+    """로컬 CPU에서 pYIN 음정 추출. cancel_event가 설정되면 중단하고 None 반환."""
     pitches = []
-    for segment in segments:
+    for i, segment in enumerate(segments):
+        if cancel_event is not None and cancel_event.is_set():
+            return None
+        if progress_callback is not None:
+            progress_callback(i, len(segments))
         if len(segment) < sr * 0.01:
             pitches.append(0)
             continue
@@ -335,35 +451,40 @@ def extract_pitch_with_adaptive(segments, sr=22050):
     return combined_pitches
 
 
-def extract_pitch_with_crepe(segments, sr=22050):
-    """Extract pitch information using CREPE model."""
-    # GPU 서버 사용 시도
-    try:
-        from workers.gpu_client import gpu_client, is_gpu_service_available
-        import logging
-        logger = logging.getLogger(__name__)
-        
-        if is_gpu_service_available():
-            # GPU 서버에 요청 보내기
-            logger.info(f"GPU 서버 연결 가능: 원격 CREPE 음정 추출 시도, 세그먼트 수: {len(segments)}")
-            logger.info("GPU 서버 연결 가능: 원격 CREPE 음정 추출 시도")
-            gpu_result = gpu_client.extract_pitch_with_crepe(segments, sr)
-            if gpu_result is not None:
-                logger.info(f"GPU 서버에서 CREPE 음정 추출 완료: {len(gpu_result)} 개 세그먼트")
-                return gpu_result
-            # GPU 요청 실패 시 로컬에서 계속 실행
-            logger.warning("GPU 서버 요청 실패: 로컬 CPU 폴백 실행")
-    except ImportError:
-        # gpu_client 모듈을 찾을 수 없는 경우
-        pass
-    
-    # 로컬 CPU 기반 실행 (원래 구현)
+def extract_pitch_with_crepe(segments, sr=22050, progress_callback=None, model_capacity='full'):
+    """Extract pitch information using CREPE model.
+
+    GPU 서버는 항상 full 모델을 사용하므로, 다른 model_capacity는 로컬(사이드카 포함)에서만 실행합니다.
+    """
+    return _run_inference(
+        "crepe", segments, sr,
+        lambda client, cancel_event: client.extract_pitch_with_crepe(
+            segments, sr, cancel_event=cancel_event, progress_callback=progress_callback
+        ),
+        lambda cancel_event: _extract_pitch_with_crepe_local(segments, sr, cancel_event, progress_callback,
+                                                             model_capacity),
+        model_capacity=model_capacity,
+        progress_callback=progress_callback
+    )
+
+
+def _extract_pitch_with_crepe_local(segments, sr=22050, cancel_event=None, progress_callback=None,
+                                    model_capacity='full'):
+    """로컬 CPU에서 CREPE 음정 추출. cancel_event가 설정되면 중단하고 None 반환.
+
+    model_capacity를 줄이면(tiny, small 등) 정확도는 낮아지지만 훨씬 빠릅니다.
+    """
     pitches = []
-    for segment in segments:
+    for i, segment in enumerate(segments):
+        if cancel_event is not None and cancel_event.is_set():
+            return None
+        if progress_callback is not None:
+            progress_callback(i, len(segments))
         if len(segment) < sr * 0.01:
             pitches.append(0)
             continue
-        time, frequency, confidence, activation = crepe.predict(segment, sr, viterbi=True)
+        time, frequency, confidence, activation = crepe.predict(segment, sr, model_capacity=model_capacity,
+                                                                viterbi=True)
         avg_freq = np.mean(frequency[confidence > 0.5]) if np.any(confidence > 0.5) else 0
         pitches.append(avg_freq if not np.isnan(avg_freq) else 0)
     return pitches
@@ -434,9 +555,18 @@ def segment_audio_with_midi_notes(y, time_mapping, notes, sr=22050):
     return segments, timestamps
 
 
+@functools.lru_cache(maxsize=8)
+def mel_basis(sr=22050, n_fft=512, n_mels=128):
+    """멜 필터뱅크 (읽기 전용, 프로세스당 한 번 계산. 프리로드 시 포크 전에 만들어 자식과 공유)"""
+    basis = librosa.filters.mel(sr=sr, n_fft=n_fft, n_mels=n_mels)
+    basis.setflags(write=False)
+    return basis
+
+
 def wav_to_spectrogram(y, sr=22050, n_fft=512, hop_length=20, n_mels=128, target_time_frames=960):
     """Convert audio to mel spectrogram."""
-    S = librosa.feature.melspectrogram(y=y, sr=sr, n_fft=n_fft, hop_length=hop_length, n_mels=n_mels)
+    # librosa.feature.melspectrogram과 같은 계산이지만 필터뱅크를 매번 다시 만들지 않음
+    S = mel_basis(sr, n_fft, n_mels) @ (np.abs(librosa.stft(y=y, n_fft=n_fft, hop_length=hop_length)) ** 2)
     S_db = librosa.power_to_db(S, ref=np.max)
     
     if S_db.shape[1] < target_time_frames:
@@ -447,68 +577,123 @@ def wav_to_spectrogram(y, sr=22050, n_fft=512, hop_length=20, n_mels=128, target
     return S_db
 
 
-def predict_techniques(segments, model_path, sr=22050):
+def predict_techniques(segments, model_path, sr=22050, progress_callback=None):
     """Predict guitar techniques used in audio segments."""
-    # GPU 서버 사용 시도
-    try:
-        from workers.gpu_client import gpu_client, is_gpu_service_available
-        import logging
-        logger = logging.getLogger(__name__)
-        
-        if is_gpu_service_available():
-            # GPU 서버에 요청 보내기
-            segment_count = len(segments)
-            logger.info(f"GPU 서버 연결 가능: 원격 기법 예측 시도. 총 세그먼트 수: {segment_count}")
-            
-            # 세그먼트가 큰 경우 경고 표시
-            if segment_count > 100:
-                logger.warning(f"세그먼트 수가 많습니다 ({segment_count}개). 배치 처리가 필요할 수 있습니다.")
-            
-            # 세그먼트 크기 정보 로깅
-            if segments:
-                avg_segment_size = sum(len(s) for s in segments) / len(segments)
-                min_segment_size = min(len(s) for s in segments)
-                max_segment_size = max(len(s) for s in segments)
-                logger.info(f"세그먼트 크기 통계: 평균={avg_segment_size:.1f}, 최소={min_segment_size}, 최대={max_segment_size} 샘플")
-            
-            # GPU 서비스에 요청
-            start_time = time.time()
-            gpu_result = gpu_client.predict_techniques(segments, sr)
-            elapsed_time = time.time() - start_time
-            
-            if gpu_result is not None:
-                logger.info(f"GPU 서버에서 기법 예측 완료: {len(gpu_result)} 개 세그먼트, 소요 시간: {elapsed_time:.2f}초")
-                return gpu_result
-            # GPU 요청 실패 시 로컬에서 계속 실행
-            logger.warning(f"GPU 서버 요청 실패: 로컬 CPU 폴백 실행, 경과 시간: {elapsed_time:.2f}초")
-    except ImportError:
-        # gpu_client 모듈을 찾을 수 없는 경우
-        pass
-    
-    # 로컬 CPU 기반 실행 (원래 구현)
-    techniques = ["bend", "hammer", "normal", "pull", "slide", "vibrato"]
-    model = load_model(model_path)
+    # 세그먼트 크기 정보 로깅
+    if segments:
+        avg_segment_size = sum(len(s) for s in segments) / len(segments)
+        min_segment_size = min(len(s) for s in segments)
+        max_segment_size = max(len(s) for s in segments)
+        logger.info(f"세그먼트 크기 통계: 평균={avg_segment_size:.1f}, 최소={min_segment_size}, 최대={max_segment_size} 샘플")
+    
+    return _run_inference(
+        "techniques", segments, sr,
+        lambda client, cancel_event: client.predict_techniques(
+            segments, sr, cancel_event=cancel_event, progress_callback=progress_callback
+        ),
+        lambda cancel_event: _predict_techniques_local(segments, model_path, sr, cancel_event, progress_callback),
+        model_path=model_path,
+        progress_callback=progress_callback
+    )
+
+
+def _predict_techniques_local(segments, model_path, sr=22050, cancel_event=None, progress_callback=None):
+    """로컬 CPU에서 기타 연주 기법 예측. cancel_event가 설정되면 중단하고 None 반환.
+
+    세그먼트를 LOCAL_TECHNIQUE_BATCH_SIZE개씩 나눠 스펙트로그램 생성과 추론을 반복하므로
+    메모리에는 한 배치의 스펙트로그램만 올라가고, 배치 사이마다 취소 여부와 진행률을 확인합니다.
+    """
+    techniques = TECHNIQUES
+    # 모델은 프로세스당 한 번만 로드 (workers/models.py)
+    model = get_technique_model(model_path)
     
     predictions = []
-    for segment in segments:
-        if len(segment) < sr * 0.01:
-            predictions.append(["unknown"])
-            continue
-        
-        spec = wav_to_spectrogram(segment, sr=sr)
-        spec = (spec - np.min(spec)) / (np.max(spec) - np.min(spec) + 1e-8)
-        spec = spec[..., np.newaxis]
-        spec = np.expand_dims(spec, axis=0)
+    for start in range(0, len(segments), LOCAL_TECHNIQUE_BATCH_SIZE):
+        if cancel_event is not None and cancel_event.is_set():
+            return None
+        if progress_callback is not None:
+            progress_callback(start, len(segments))
+        
+        specs = []
+        for segment in segments[start:start + LOCAL_TECHNIQUE_BATCH_SIZE]:
+            if len(segment) < sr * 0.01:
+                specs.append(None)
+                continue
+            
+            spec = wav_to_spectrogram(segment, sr=sr)
+            spec = (spec - np.min(spec)) / (np.max(spec) - np.min(spec) + 1e-8)
+            specs.append(spec[..., np.newaxis])
         
-        pred = model.predict(spec, verbose=0)
-        pred_binary = (pred > 0.5).astype(int)
-        predicted_techniques = [techniques[i] for i in range(len(pred_binary[0])) if pred_binary[0][i] == 1]
+        valid = [spec for spec in specs if spec is not None]
+        preds = iter(model.predict(np.stack(valid), batch_size=LOCAL_TECHNIQUE_BATCH_SIZE, verbose=0) if valid else [])
         
-        predictions.append(predicted_techniques if predicted_techniques else ["normal"])
+        for spec in specs:
+            if spec is None:
+                predictions.append(["unknown"])
+                continue
+            pred_binary = (next(preds) > 0.5).astype(int)
+            predicted_techniques = [techniques[i] for i in range(len(pred_binary)) if pred_binary[i] == 1]
+            
+            predictions.append(predicted_techniques if predicted_techniques else ["normal"])
     
+    if progress_callback is not None:
+        progress_callback(len(segments), len(segments))
     return predictions
 
 
+def analyze_segments(segments, model_path, sr=22050, progress_callback=None):
+    """CREPE 음정 추출과 기법 예측을 함께 수행.
+    
+    GPU 서버를 사용하는 경우 세그먼트를 한 번만 업로드하는 통합 API를 호출합니다.
+    기법 분류 모델 파일이 없으면 기존과 같이 음정만 추출하고 기법은 빈 리스트를 반환합니다.
+    
+    Args:
+        segments: 오디오 세그먼트 리스트
+        model_path: 기법 분류 모델 경로
+        sr: 샘플링 레이트
+        progress_callback: (처리된 작업량, 전체 작업량)을 받는 함수 (선택 사항)
+        
+    Returns:
+        (pitches, techniques): 세그먼트별 음정과 기법 리스트
+    """
+    if not os.path.exists(model_path):
+        return extract_pitch_with_crepe(segments, sr, progress_callback), []
+    
+    # 로컬 계산은 음정과 기법 두 작업의 진행 상황을 합쳐서 보고
+    fractions = {"pitches": 0.0, "techniques": 0.0}
+    def stage_progress(name):
+        if progress_callback is None:
+            return None
+        def callback(count, total):
+            fractions[name] = count / max(total, 1)
+            progress_callback(int(100 * sum(fractions.values())), 100 * len(fractions))
+        return callback
+    
+    def local_call(cancel_event):
+        # CREPE와 기법 분류는 서로 독립적이므로 STAGE_CONCURRENCY > 1이면 동시에 실행
+        # 한 단계가 실패하거나 취소되면 stop_event로 다른 단계도 세그먼트/배치 사이에서 중단
+        graph = StageGraph("analyze_segments", stop_event=cancel_event)
+        graph.add("pitches", lambda: _extract_pitch_with_crepe_local(segments, sr, graph.stop_event,
+                                                                     stage_progress("pitches")))
+        graph.add("techniques", lambda: _predict_techniques_local(segments, model_path, sr, graph.stop_event,
+                                                                  stage_progress("techniques")))
+        results = graph.run()
+        if results["pitches"] is None or results["techniques"] is None:
+            return None
+        return results
+    
+    result = _run_inference(
+        "analyze", segments, sr,
+        lambda client, cancel_event: client.analyze_segments(
+            segments, sr, cancel_event=cancel_event, progress_callback=progress_callback
+        ),
+        local_call,
+        model_path=model_path,
+        progress_callback=progress_callback
+    )
+    return result["pitches"], result["techniques"]
+
+
 def analyze_simple(audio_bytes):
     """Perform simple analysis on audio."""
     y, sr = load_audio_from_bytes(audio_bytes)
@@ -1,220 +1,353 @@
 import os
 import requests
 import json
-from typing import List, Optional, Dict, Any
+from typing import Any, Callable, Dict, List, Optional
 import logging
 import numpy as np
 import time
 
+from workers.gpu_pool import GPUEndpointPool, gpu_endpoint_pool
+from workers.gpu_limiter import gpu_limiter
+from workers.gpu_payload import GPU_PAYLOAD_MODE, build_payload
+
 # 로깅 설정
 logger = logging.getLogger(__name__)
 
 # 환경 변수에서 GPU 추론 서비스 URL 가져오기
 # SSH 포트 포워딩된 로컬 주소 (예: ssh -L 8888:localhost:3000 user@gpu-server-ip)
+# 여러 엔드포인트는 GPU_INFERENCE_SERVICE_URLS에 쉼표로 구분하여 설정합니다 (workers/gpu_pool.py)
 GPU_INFERENCE_SERVICE_URL = os.environ.get("GPU_INFERENCE_SERVICE_URL", "http://localhost:8888")
 GPU_REQUEST_TIMEOUT = int(os.environ.get("GPU_REQUEST_TIMEOUT", 60))  # 초 단위
 # 배치 사이즈 환경 변수 추가
 GPU_BATCH_SIZE = int(os.environ.get("GPU_BATCH_SIZE", 100))  # 배치당 최대 세그먼트 수
+# 요청 실패 시 다른 엔드포인트로 재시도할 최대 횟수 (기본값: 엔드포인트 수)
+GPU_FAILOVER_MAX_ATTEMPTS = int(os.environ.get("GPU_FAILOVER_MAX_ATTEMPTS", 0))
+# 결과를 세그먼트 청크 단위 NDJSON으로 스트리밍 받음 (연결이 끊겨도 받은 결과는 유지하고 나머지만 재요청)
+GPU_STREAMING_ENABLED = os.environ.get("GPU_STREAMING_ENABLED", "false").lower() == "true"
+GPU_STREAM_CHUNK_SIZE = int(os.environ.get("GPU_STREAM_CHUNK_SIZE", 10))  # 스트림 한 줄에 담길 세그먼트 수
+
+def _empty_result(op: str) -> Any:
+    return {"pitches": [], "techniques": []} if op == "analyze" else []
+
+
+def _extend_result(op: str, result: Any, chunk: Any):
+    if op == "analyze":
+        result["pitches"].extend(chunk["pitches"])
+        result["techniques"].extend(chunk["techniques"])
+    else:
+        result.extend(chunk)
+
+
+def _result_length(op: str, result: Any) -> int:
+    return len(result["pitches"]) if op == "analyze" else len(result)
+
 
 def is_gpu_service_available() -> bool:
-    """GPU 추론 서비스 가용성 확인 (간단한 헬스 체크)"""
-    if not GPU_INFERENCE_SERVICE_URL:
-        return False
-    try:
-        # BentoML은 기본적으로 /healthz 또는 /livez 엔드포인트를 제공
-        response = requests.get(f"{GPU_INFERENCE_SERVICE_URL}/livez", timeout=5)
-        return response.status_code == 200
-    except requests.exceptions.RequestException as e:
-        logger.warning(f"GPU 추론 서비스 ({GPU_INFERENCE_SERVICE_URL}) 연결 불가: {e}")
+    """GPU 추론 서비스 가용성 확인 (간단한 헬스 체크, 엔드포인트 중 하나라도 정상이면 True)"""
+    if not gpu_endpoint_pool.endpoints:
         return False
+    return gpu_endpoint_pool.check_health()
 
 class GPUInferenceClient:
-    def __init__(self, base_url: str = GPU_INFERENCE_SERVICE_URL, timeout: int = GPU_REQUEST_TIMEOUT, batch_size: int = GPU_BATCH_SIZE):
-        self.base_url = base_url
+    def __init__(self, base_url: Optional[str] = None, timeout: int = GPU_REQUEST_TIMEOUT, batch_size: int = GPU_BATCH_SIZE,
+                 pool: Optional[GPUEndpointPool] = None, payload_mode: str = GPU_PAYLOAD_MODE,
+                 streaming: bool = GPU_STREAMING_ENABLED):
+        # base_url을 지정하면 해당 URL 하나로 구성된 전용 풀을, 아니면 공유 풀을 사용
+        if pool is None:
+            pool = GPUEndpointPool([base_url]) if base_url else gpu_endpoint_pool
+        self.pool = pool
+        self.base_url = ",".join(pool.urls)
         self.timeout = timeout
         self.batch_size = batch_size
-        self.service_available = is_gpu_service_available()  # 초기 가용성 확인
-        logger.info(f"GPU 추론 서비스 초기화: URL={base_url}, 가용성={self.service_available}, 배치 크기={batch_size}")
+        # 요청 본문 형식 (json / audio / mel, workers/gpu_payload.py 참고)
+        self.payload_mode = payload_mode
+        self.streaming = streaming
+        # 가용성은 첫 요청 때 확인 (생성 시 /livez를 호출하면 서비스가 내려가 있을 때 import가 멈춤)
+        self.service_available: Optional[bool] = None
+        logger.info(f"GPU 추론 서비스 설정: URL={self.base_url}, 배치 크기={batch_size}, 입력 형식={payload_mode}")
 
     def check_availability(self) -> bool:
         """서비스 가용성 재확인"""
-        self.service_available = is_gpu_service_available()
+        self.service_available = self.pool.check_health()
         return self.service_available
 
-    def _make_request(self, endpoint: str, data: Dict[str, Any]) -> Optional[Any]:
-        """GPU 서비스에 API 요청을 보내는 공통 메서드"""
+    def reset(self):
+        """가용성 상태를 초기화하여 다음 요청 때 다시 확인 (포크된 워커 프로세스 시작 시 호출)"""
+        self.service_available = None
+
+    def _make_request(self, endpoint: str, data: Dict[str, Any],
+                      on_record: Optional[Callable[[Dict[str, Any]], bool]] = None) -> Optional[Any]:
+        """GPU 서비스에 API 요청을 보내는 공통 메서드
+
+        진행 중 요청이 가장 적은 엔드포인트로 요청을 보내고, 연결 실패/타임아웃/5xx 오류가 발생하면
+        다른 엔드포인트로 재시도합니다. on_record가 주어지면 응답을 NDJSON 스트림으로 읽어 줄마다
+        전달하며, 이미 받은 결과가 중복되지 않도록 다른 엔드포인트로 재시도하지 않습니다.
+        """
         if not self.service_available:
             # 매 요청마다 서비스 가용성을 다시 확인
             if not self.check_availability():
                 logger.warning(f"GPU 서비스 ({self.base_url}) 사용 불가. 요청을 보내지 않습니다: {endpoint}")
                 return None
         
-        url = f"{self.base_url}/{endpoint}"
-        headers = {"Content-Type": "application/json"}
+        # 세그먼트 데이터가 매우 클 수 있으므로 로깅 시 제한
+        segments_count = len(data.get("segments", []))
+        sample_rate = data.get("sample_rate", "N/A")
+        
+        # 클러스터 전체 동시 처리 한도 확인 (한도 초과 시 None을 반환하여 CPU로 처리)
+        lease = gpu_limiter.acquire(segments_count)
+        if lease is None:
+            return None
         try:
-            # 세그먼트 데이터가 매우 클 수 있으므로 로깅 시 제한
-            segments_count = len(data.get("segments", []))
-            sample_rate = data.get("sample_rate", "N/A")
-            logger.info(f"GPU 서비스 요청: {url}, 세그먼트 수: {segments_count}, 샘플링 레이트: {sample_rate}")
+            return self._send_with_failover(endpoint, data, segments_count, sample_rate, on_record)
+        finally:
+            gpu_limiter.release(lease)
+
+    def _send_with_failover(self, endpoint: str, data: Dict[str, Any], segments_count: int, sample_rate: Any,
+                            on_record: Optional[Callable[[Dict[str, Any]], bool]] = None) -> Optional[Any]:
+        """엔드포인트 풀에서 요청을 보내고 실패 시 다른 엔드포인트로 재시도"""
+        headers = {"Content-Type": "application/json"}
+        # 재시도 시 다시 직렬화하지 않도록 한 번만 직렬화
+        payload = json.dumps(data)
+        
+        # 스트리밍 요청은 호출 측에서 받지 못한 세그먼트만 골라 다시 요청
+        max_attempts = 1 if on_record is not None else (GPU_FAILOVER_MAX_ATTEMPTS or len(self.pool.endpoints))
+        tried = []
+        while len(tried) < max_attempts:
+            gpu_endpoint = self.pool.acquire(exclude=tried)
+            if gpu_endpoint is None:
+                break
+            tried.append(gpu_endpoint)
             
-            start_time = time.time()
-            response = requests.post(url, data=json.dumps(data), headers=headers, timeout=self.timeout)
-            response.raise_for_status()
+            url = f"{gpu_endpoint.url}/{endpoint}"
+            success = False
+            try:
+                logger.info(f"GPU 서비스 요청: {url}, 세그먼트 수: {segments_count}, 샘플링 레이트: {sample_rate}")
+                
+                start_time = time.time()
+                response = requests.post(url, data=payload, headers=headers, timeout=self.timeout,
+                                         stream=on_record is not None)
+                response.raise_for_status()
+                if on_record is not None:
+                    result = self._consume_stream(response, on_record)
+                    success = True
+                    logger.info(f"GPU 서비스 스트림 종료 ({endpoint}): 소요 시간: {time.time() - start_time:.2f}초")
+                    return result
+                result = response.json()
+                success = True
+                
+                elapsed_time = time.time() - start_time
+                logger.info(f"GPU 서비스 응답 ({endpoint}): {response.status_code}, 데이터 크기: {len(response.content)} 바이트, 소요 시간: {elapsed_time:.2f}초")
+                return result
+            except requests.exceptions.HTTPError as e:
+                logger.error(f"GPU 서비스 HTTP 오류 ({url}): {e.response.status_code} - {e.response.text}")
+                if e.response.status_code < 500:
+                    # 요청 자체의 문제이므로 다른 엔드포인트로 재시도하지 않음
+                    success = True
+                    return None
+            except requests.exceptions.Timeout:
+                logger.error(f"GPU 서비스 타임아웃 ({url})")
+            except requests.exceptions.ConnectionError:
+                logger.error(f"GPU 서비스 연결 실패 ({url})")
+                gpu_endpoint.healthy = False  # 연결 실패 시 가용성 상태 업데이트
+            except Exception as e:
+                logger.error(f"GPU 서비스 요청 중 예기치 않은 오류 ({url}): {e}")
+            finally:
+                self.pool.release(gpu_endpoint, success)
             
-            elapsed_time = time.time() - start_time
-            logger.info(f"GPU 서비스 응답 ({endpoint}): {response.status_code}, 데이터 크기: {len(response.content)} 바이트, 소요 시간: {elapsed_time:.2f}초")
-            return response.json()
-        except requests.exceptions.HTTPError as e:
-            logger.error(f"GPU 서비스 HTTP 오류 ({url}): {e.response.status_code} - {e.response.text}")
-        except requests.exceptions.Timeout:
-            logger.error(f"GPU 서비스 타임아웃 ({url})")
-        except requests.exceptions.ConnectionError:
-            logger.error(f"GPU 서비스 연결 실패 ({url})")
-            self.service_available = False  # 연결 실패 시 가용성 상태 업데이트
-        except Exception as e:
-            logger.error(f"GPU 서비스 요청 중 예기치 않은 오류 ({url}): {e}")
+            logger.warning(f"GPU 서비스 요청 실패 ({url}): 시도 {len(tried)}/{max_attempts}")
+        
+        # 모든 엔드포인트가 실패하면 다음 요청 전에 가용성을 다시 확인
+        self.service_available = False
         return None
 
-    def predict_techniques(self, segments: List[np.ndarray], sample_rate: int = 22050) -> Optional[List[List[str]]]:
-        """GPU 서버에서 기타 연주 기법 예측
+    @staticmethod
+    def _consume_stream(response, on_record: Callable[[Dict[str, Any]], bool]) -> bool:
+        """NDJSON 응답을 줄 단위로 읽어 on_record에 전달. 완료 표시 없이 끝나면 예외 발생"""
+        try:
+            for line in response.iter_lines():
+                if not line:
+                    continue
+                record = json.loads(line)
+                if record.get("done"):
+                    return True
+                if on_record(record) is False:
+                    # 호출 측에서 중단 요청 (취소)
+                    return True
+        finally:
+            response.close()
+        raise requests.exceptions.ChunkedEncodingError("GPU 서비스 스트림이 완료 표시 없이 종료되었습니다")
+
+    def _request_in_batches(self, op: str, segments: List[np.ndarray], sample_rate: int, label: str,
+                            cancel_event=None, progress_callback: Optional[Callable[[int, int], None]] = None
+                            ) -> Optional[List[Any]]:
+        """세그먼트를 배치 크기 단위로 나누어 요청하고 결과를 순서대로 반환
         
         Args:
+            op: 연산 이름 ("techniques", "crepe", "pyin", "analyze"). 입력 형식에 따라 API가 결정됨
             segments: 오디오 세그먼트 리스트 (NumPy 배열)
             sample_rate: 오디오 샘플링 레이트
+            label: 로그에 표시할 작업 이름
+            cancel_event: 설정되면 남은 배치를 보내지 않고 중단 (threading.Event, 선택 사항)
+            progress_callback: 배치가 끝날 때마다 (처리된 세그먼트 수, 전체 세그먼트 수)를 받는 함수 (선택 사항)
             
         Returns:
-            기법 예측 결과 리스트 또는 None (요청 실패 시)
+            배치별 응답 리스트 또는 None (요청 실패/취소 시)
         """
-        if not segments:
-            return []
-
         # 세그먼트 개수 로깅
         total_segments = len(segments)
-        logger.info(f"총 처리할 세그먼트 수: {total_segments}")
-
-        # 배치 처리를 위한 세그먼트 분할
+        logger.info(f"{label} 처리할 총 세그먼트 수: {total_segments}")
         if total_segments > self.batch_size:
-            logger.info(f"세그먼트 수({total_segments})가 배치 크기({self.batch_size})보다 큽니다. 배치 처리를 시작합니다.")
+            logger.info(f"{label}: 세그먼트 수({total_segments})가 배치 크기({self.batch_size})보다 큽니다. 배치 처리를 시작합니다.")
+        
+        batch_results = []
+        for i in range(0, total_segments, self.batch_size):
+            if cancel_event is not None and cancel_event.is_set():
+                logger.info(f"{label} 배치 처리 취소: {i}/{total_segments} 세그먼트 처리 후 중단")
+                return None
+            batch = segments[i:i+self.batch_size]
+            if total_segments > self.batch_size:
+                logger.info(f"{label} 배치 처리: {i+1}~{i+len(batch)}/{total_segments} 세그먼트")
             
-            # 배치로 나누어 처리
-            all_results = []
-            for i in range(0, total_segments, self.batch_size):
-                batch = segments[i:i+self.batch_size]
-                logger.info(f"배치 처리: {i+1}~{i+len(batch)}/{total_segments} 세그먼트")
-                
-                # NumPy 배열을 Python 리스트로 변환
-                batch_list = [segment.tolist() for segment in batch]
-                data = {"segments": batch_list, "sample_rate": sample_rate}
-                
-                # 배치 요청 및 결과 수집
-                batch_result = self._make_request("predict_techniques", data)
-                if batch_result is None:
-                    logger.error(f"배치 처리 실패: {i+1}~{i+len(batch)}/{total_segments}")
+            # 입력 형식에 맞게 직렬화 (float 리스트 / float16 오디오 / 멜 스펙트로그램)
+            endpoint, data = build_payload(op, batch, sample_rate, self.payload_mode)
+            
+            # 배치 요청 및 결과 수집
+            batch_result = self._make_request(endpoint, data)
+            if batch_result is None:
+                logger.error(f"{label} 배치 처리 실패: {i+1}~{i+len(batch)}/{total_segments}")
+                return None
+            batch_results.append(batch_result)
+            if progress_callback is not None:
+                progress_callback(i + len(batch), total_segments)
+        
+        if total_segments > self.batch_size:
+            logger.info(f"{label} 모든 배치 처리 완료. 배치 수: {len(batch_results)}")
+        return batch_results
+
+    def _request_streaming(self, op: str, segments: List[np.ndarray], sample_rate: int, label: str,
+                           cancel_event=None, progress_callback: Optional[Callable[[int, int], None]] = None) -> Optional[Any]:
+        """결과를 NDJSON 스트림으로 받으며 진행 상황을 보고. 연결이 끊기면 받은 결과는 유지하고 나머지만 재요청
+        
+        진전 없이 실패한 요청이 엔드포인트 수(또는 GPU_FAILOVER_MAX_ATTEMPTS)만큼 이어지면 None을 반환합니다.
+        """
+        total_segments = len(segments)
+        result = _empty_result(op)
+        max_attempts = GPU_FAILOVER_MAX_ATTEMPTS or len(self.pool.endpoints)
+        failures = 0
+        
+        while _result_length(op, result) < total_segments:
+            if cancel_event is not None and cancel_event.is_set():
+                logger.info(f"{label} 스트림 취소: {_result_length(op, result)}/{total_segments} 세그먼트 처리 후 중단")
+                return None
+            done = _result_length(op, result)
+            batch = segments[done:done + self.batch_size]
+            _, data = build_payload(op, batch, sample_rate, self.payload_mode)
+            # 입력 형식별 본문을 그대로 사용하고 스트리밍 API로 보냄
+            data.update({"op": op, "chunk_size": GPU_STREAM_CHUNK_SIZE})
+            
+            def on_record(record):
+                if cancel_event is not None and cancel_event.is_set():
+                    return False
+                if done + record["start"] != _result_length(op, result):
+                    # 순서가 맞지 않는 청크는 무시 (다음 요청에서 다시 받음)
+                    logger.warning(f"{label} 스트림 청크 순서 불일치: start={record['start']}")
+                    return False
+                _extend_result(op, result, record["results"])
+                if progress_callback is not None:
+                    progress_callback(_result_length(op, result), total_segments)
+                return True
+            
+            completed = self._make_request("stream_segments", data, on_record=on_record)
+            received = _result_length(op, result)
+            if received > done:
+                failures = 0
+            else:
+                failures += 1
+                if failures >= max_attempts:
+                    logger.error(f"{label} 스트림 실패: {received}/{total_segments} 세그먼트 처리 후 중단")
                     return None
-                
-                all_results.extend(batch_result)
+            if completed is None and received < total_segments:
+                logger.warning(f"{label} 스트림 중단: 받은 결과 {received}/{total_segments}개 유지, 나머지 재요청")
+        
+        return result
+
+    def _request(self, op: str, segments: List[np.ndarray], sample_rate: int, label: str,
+                 cancel_event=None, progress_callback: Optional[Callable[[int, int], None]] = None) -> Optional[Any]:
+        """배치(또는 스트리밍)로 요청하고 세그먼트별 결과를 이어 붙여 반환"""
+        if not segments:
+            return _empty_result(op)
+        if self.streaming:
+            return self._request_streaming(op, segments, sample_rate, label, cancel_event, progress_callback)
+        
+        result = _empty_result(op)
+        batch_results = self._request_in_batches(op, segments, sample_rate, label, cancel_event, progress_callback)
+        if batch_results is None:
+            return None
+        for batch_result in batch_results:
+            _extend_result(op, result, batch_result)
+        return result
+
+    def predict_techniques(self, segments: List[np.ndarray], sample_rate: int = 22050, cancel_event=None,
+                           progress_callback: Optional[Callable[[int, int], None]] = None) -> Optional[List[List[str]]]:
+        """GPU 서버에서 기타 연주 기법 예측
+        
+        Args:
+            segments: 오디오 세그먼트 리스트 (NumPy 배열)
+            sample_rate: 오디오 샘플링 레이트
+            cancel_event: 설정되면 남은 배치를 보내지 않고 중단 (threading.Event, 선택 사항)
+            progress_callback: (처리된 세그먼트 수, 전체 세그먼트 수)를 받는 함수 (선택 사항)
             
-            logger.info(f"모든 배치 처리 완료. 총 결과 수: {len(all_results)}")
-            return all_results
-        else:
-            # 하나의 배치로 처리 (기존 방식)
-            segments_list = [segment.tolist() for segment in segments]
-            data = {"segments": segments_list, "sample_rate": sample_rate}
-            return self._make_request("predict_techniques", data)
-
-    def extract_pitch_with_crepe(self, segments: List[np.ndarray], sample_rate: int = 22050) -> Optional[List[float]]:
+        Returns:
+            기법 예측 결과 리스트 또는 None (요청 실패 시)
+        """
+        return self._request("techniques", segments, sample_rate, "기법 예측", cancel_event, progress_callback)
+
+    def extract_pitch_with_crepe(self, segments: List[np.ndarray], sample_rate: int = 22050, cancel_event=None,
+                                 progress_callback: Optional[Callable[[int, int], None]] = None) -> Optional[List[float]]:
         """GPU 서버에서 CREPE 모델을 사용한 음정 추출
         
         Args:
             segments: 오디오 세그먼트 리스트 (NumPy 배열)
             sample_rate: 오디오 샘플링 레이트
+            cancel_event: 설정되면 남은 배치를 보내지 않고 중단 (threading.Event, 선택 사항)
+            progress_callback: (처리된 세그먼트 수, 전체 세그먼트 수)를 받는 함수 (선택 사항)
             
         Returns:
             음정 주파수 리스트 또는 None (요청 실패 시)
         """
-        if not segments:
-            return []
+        return self._request("crepe", segments, sample_rate, "CREPE", cancel_event, progress_callback)
 
-        # 세그먼트 개수 로깅
-        total_segments = len(segments)
-        logger.info(f"CREPE 처리할 총 세그먼트 수: {total_segments}")
-
-        # 배치 처리를 위한 세그먼트 분할
-        if total_segments > self.batch_size:
-            logger.info(f"CREPE: 세그먼트 수({total_segments})가 배치 크기({self.batch_size})보다 큽니다. 배치 처리를 시작합니다.")
-            
-            # 배치로 나누어 처리
-            all_results = []
-            for i in range(0, total_segments, self.batch_size):
-                batch = segments[i:i+self.batch_size]
-                logger.info(f"CREPE 배치 처리: {i+1}~{i+len(batch)}/{total_segments} 세그먼트")
-                
-                # NumPy 배열을 Python 리스트로 변환
-                batch_list = [segment.tolist() for segment in batch]
-                data = {"segments": batch_list, "sample_rate": sample_rate}
-                
-                # 배치 요청 및 결과 수집
-                batch_result = self._make_request("extract_pitch_with_crepe", data)
-                if batch_result is None:
-                    logger.error(f"CREPE 배치 처리 실패: {i+1}~{i+len(batch)}/{total_segments}")
-                    return None
-                
-                all_results.extend(batch_result)
-            
-            logger.info(f"CREPE 모든 배치 처리 완료. 총 결과 수: {len(all_results)}")
-            return all_results
-        else:
-            # 하나의 배치로 처리 (기존 방식)
-            segments_list = [segment.tolist() for segment in segments]
-            data = {"segments": segments_list, "sample_rate": sample_rate}
-            return self._make_request("extract_pitch_with_crepe", data)
-
-    def extract_pitch_with_pyin(self, segments: List[np.ndarray], sample_rate: int = 22050) -> Optional[List[float]]:
+    def extract_pitch_with_pyin(self, segments: List[np.ndarray], sample_rate: int = 22050, cancel_event=None,
+                                progress_callback: Optional[Callable[[int, int], None]] = None) -> Optional[List[float]]:
         """GPU 서버에서 pYIN 알고리즘을 사용한 음정 추출
         
         Args:
             segments: 오디오 세그먼트 리스트 (NumPy 배열)
             sample_rate: 오디오 샘플링 레이트
+            cancel_event: 설정되면 남은 배치를 보내지 않고 중단 (threading.Event, 선택 사항)
+            progress_callback: (처리된 세그먼트 수, 전체 세그먼트 수)를 받는 함수 (선택 사항)
             
         Returns:
             음정 주파수 리스트 또는 None (요청 실패 시)
         """
-        if not segments:
-            return []
+        return self._request("pyin", segments, sample_rate, "pYIN", cancel_event, progress_callback)
 
-        # 세그먼트 개수 로깅
-        total_segments = len(segments)
-        logger.info(f"pYIN 처리할 총 세그먼트 수: {total_segments}")
-
-        # 배치 처리를 위한 세그먼트 분할
-        if total_segments > self.batch_size:
-            logger.info(f"pYIN: 세그먼트 수({total_segments})가 배치 크기({self.batch_size})보다 큽니다. 배치 처리를 시작합니다.")
-            
-            # 배치로 나누어 처리
-            all_results = []
-            for i in range(0, total_segments, self.batch_size):
-                batch = segments[i:i+self.batch_size]
-                logger.info(f"pYIN 배치 처리: {i+1}~{i+len(batch)}/{total_segments} 세그먼트")
-                
-                # NumPy 배열을 Python 리스트로 변환
-                batch_list = [segment.tolist() for segment in batch]
-                data = {"segments": batch_list, "sample_rate": sample_rate}
-                
-                # 배치 요청 및 결과 수집
-                batch_result = self._make_request("extract_pitch_with_pyin", data)
-                if batch_result is None:
-                    logger.error(f"pYIN 배치 처리 실패: {i+1}~{i+len(batch)}/{total_segments}")
-                    return None
-                
-                all_results.extend(batch_result)
+    def analyze_segments(self, segments: List[np.ndarray], sample_rate: int = 22050, cancel_event=None,
+                         progress_callback: Optional[Callable[[int, int], None]] = None) -> Optional[Dict[str, List[Any]]]:
+        """GPU 서버에서 CREPE 음정 추출과 기법 예측을 한 번의 왕복으로 수행
+        
+        세그먼트를 한 번만 직렬화/업로드하므로 두 API를 따로 호출하는 것보다 전송량이 절반입니다.
+        
+        Args:
+            segments: 오디오 세그먼트 리스트 (NumPy 배열)
+            sample_rate: 오디오 샘플링 레이트
+            cancel_event: 설정되면 남은 배치를 보내지 않고 중단 (threading.Event, 선택 사항)
+            progress_callback: (처리된 세그먼트 수, 전체 세그먼트 수)를 받는 함수 (선택 사항)
             
-            logger.info(f"pYIN 모든 배치 처리 완료. 총 결과 수: {len(all_results)}")
-            return all_results
-        else:
-            # 하나의 배치로 처리 (기존 방식)
-            segments_list = [segment.tolist() for segment in segments]
-            data = {"segments": segments_list, "sample_rate": sample_rate}
-            return self._make_request("extract_pitch_with_pyin", data)
-
-# 싱글톤으로 클라이언트 인스턴스 생성 (모듈 로드 시 초기화)
+        Returns:
+            {"pitches": 음정 주파수 리스트, "techniques": 기법 예측 결과 리스트} 또는 None (요청 실패 시)
+        """
+        return self._request("analyze", segments, sample_rate, "통합 분석", cancel_event, progress_callback)
+
+# 싱글톤 클라이언트 인스턴스 (네트워크 I/O 없이 생성, 가용성은 첫 요청 때 확인)
 gpu_client = GPUInferenceClient() 
\ No newline at end of file
@@ -0,0 +1,150 @@
+import os
+import time
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from typing import Any, Callable, Dict, Optional, Sequence, Tuple
+
+from workers.gpu_router import gpu_router
+
+# 로깅 설정
+logger = logging.getLogger(__name__)
+
+# GPU 요청 헤징 설정
+# GPU 응답이 p95 기반 마감 시간 안에 오지 않으면 로컬 CPU 계산을 동시에 시작하고 먼저 끝난 결과를 사용합니다
+GPU_HEDGE_ENABLED = os.environ.get("GPU_HEDGE_ENABLED", "false").lower() == "true"
+GPU_HEDGE_OPERATIONS = [op.strip() for op in os.environ.get("GPU_HEDGE_OPERATIONS", "techniques,crepe,analyze").split(",") if op.strip()]
+GPU_HEDGE_PERCENTILE = float(os.environ.get("GPU_HEDGE_PERCENTILE", 95))
+# 관측 이력이 부족할 때 사용할 마감 시간과 마감 시간의 상/하한 (초)
+GPU_HEDGE_DEFAULT_DELAY = float(os.environ.get("GPU_HEDGE_DEFAULT_DELAY", 10))
+GPU_HEDGE_MIN_DELAY = float(os.environ.get("GPU_HEDGE_MIN_DELAY", 1))
+GPU_HEDGE_MAX_DELAY = float(os.environ.get("GPU_HEDGE_MAX_DELAY", 30))
+# 전체 호출 중 헤징을 허용할 최대 비율 (로컬 CPU 추가 부하 예산)
+GPU_HEDGE_BUDGET_RATIO = float(os.environ.get("GPU_HEDGE_BUDGET_RATIO", 0.2))
+
+# 헤징 결과 카운터 (워커 프로세스별)
+hedge_stats = {
+    "calls": 0,          # 헤징 모드로 실행된 GPU 호출 수
+    "hedged": 0,         # 마감 시간 초과로 로컬 계산을 함께 시작한 횟수
+    "gpu_wins": 0,       # 헤징 후 GPU가 먼저 끝난 횟수
+    "cpu_wins": 0,       # 헤징 후 로컬 CPU가 먼저 끝난 횟수
+    "budget_exhausted": 0,  # 예산 부족으로 헤징하지 않고 GPU를 기다린 횟수
+    "gpu_failures": 0,   # GPU 요청이 실패(None)한 횟수
+}
+_stats_lock = threading.Lock()
+
+# GPU 요청과 로컬 계산을 실행하는 스레드 풀
+# 응답 없이 멈춘 GPU 요청이 스레드를 모두 차지해도 로컬 헤지는 시작할 수 있도록 풀을 분리
+_gpu_executor = ThreadPoolExecutor(max_workers=int(os.environ.get("GPU_HEDGE_MAX_WORKERS", 4)),
+                                   thread_name_prefix="gpu-hedge")
+_local_executor = ThreadPoolExecutor(max_workers=int(os.environ.get("GPU_HEDGE_LOCAL_MAX_WORKERS", 2)),
+                                     thread_name_prefix="gpu-hedge-local")
+
+
+def _count(key: str):
+    with _stats_lock:
+        hedge_stats[key] += 1
+
+
+def is_hedging_enabled(op: str) -> bool:
+    """해당 연산에 헤징 모드를 사용할지 여부"""
+    return GPU_HEDGE_ENABLED and op in GPU_HEDGE_OPERATIONS
+
+
+def hedge_deadline(op: str, segments: Sequence, batch_size: int = 100) -> float:
+    """관측된 GPU 지연의 백분위로부터 헤징 마감 시간(초) 계산"""
+    deadline = gpu_router.gpu_latency_percentile(op, segments, batch_size, percentile=GPU_HEDGE_PERCENTILE)
+    if deadline is None:
+        deadline = GPU_HEDGE_DEFAULT_DELAY
+    return min(GPU_HEDGE_MAX_DELAY, max(GPU_HEDGE_MIN_DELAY, deadline))
+
+
+def _budget_allows_hedge() -> bool:
+    with _stats_lock:
+        return hedge_stats["hedged"] < max(1.0, hedge_stats["calls"] * GPU_HEDGE_BUDGET_RATIO)
+
+
+def run_hedged(op: str, deadline: float,
+               gpu_call: Callable[[threading.Event], Optional[Any]],
+               local_call: Callable[[threading.Event], Optional[Any]]) -> Tuple[Optional[Any], str, float]:
+    """GPU 요청을 보내고 마감 시간이 지나면 로컬 계산을 함께 시작하여 먼저 끝난 결과를 반환
+
+    두 함수는 취소 이벤트를 인자로 받으며, 이벤트가 설정되면 배치/세그먼트 사이에서 작업을 중단하고
+    None을 반환해야 합니다. 이미 전송된 HTTP 요청 자체는 중단할 수 없으므로 GPU 측 취소는
+    남은 배치를 보내지 않는 방식으로 이루어집니다. 대기 중 예외(TaskCancelled 포함)가 발생하면
+    두 작업 모두에 취소 이벤트를 설정한 뒤 예외를 전달합니다.
+
+    Args:
+        op: 연산 이름
+        deadline: 로컬 계산을 시작하기 전 GPU 응답을 기다릴 시간 (초)
+        gpu_call: GPU 요청 함수
+        local_call: 로컬 CPU 계산 함수
+
+    Returns:
+        (결과, 백엔드, 소요 시간) - 백엔드는 "gpu" 또는 "cpu"이고, 소요 시간은 해당 백엔드가 작업을 시작한
+        뒤 끝날 때까지의 시간(초)입니다 (라우터 처리율 갱신용). GPU가 헤징 전에 실패하면 (None, "gpu", 소요 시간)
+    """
+    _count("calls")
+    gpu_cancel = threading.Event()
+    local_cancel = threading.Event()
+    start_time = time.time()
+
+    try:
+        gpu_future = _gpu_executor.submit(gpu_call, gpu_cancel)
+        done, _ = wait([gpu_future], timeout=deadline)
+        if done:
+            result = gpu_future.result()
+            if result is None:
+                _count("gpu_failures")
+            return result, "gpu", time.time() - start_time
+
+        if not _budget_allows_hedge():
+            _count("budget_exhausted")
+            logger.info(f"GPU 헤징 예산 소진 ({op}): GPU 응답을 계속 기다립니다")
+            result = gpu_future.result()
+            if result is None:
+                _count("gpu_failures")
+            return result, "gpu", time.time() - start_time
+
+        _count("hedged")
+        logger.info(f"GPU 응답 지연 ({op}): {deadline:.2f}초 경과, 로컬 CPU 계산을 함께 시작합니다")
+        local_start_time = time.time()
+        local_future = _local_executor.submit(local_call, local_cancel)
+        pending = {gpu_future, local_future}
+
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            if gpu_future in done:
+                result = gpu_future.result()
+                if result is not None:
+                    local_cancel.set()
+                    _count("gpu_wins")
+                    elapsed = time.time() - start_time
+                    logger.info(f"GPU 헤징 결과 ({op}): GPU 승리, 소요 시간: {elapsed:.2f}초")
+                    return result, "gpu", elapsed
+                # GPU 요청이 실패하면 로컬 결과를 기다림
+                _count("gpu_failures")
+            if local_future in done:
+                gpu_cancel.set()
+                result = local_future.result()
+                _count("cpu_wins")
+                elapsed = time.time() - local_start_time
+                logger.info(f"GPU 헤징 결과 ({op}): CPU 승리, 로컬 소요 시간: {elapsed:.2f}초, "
+                            f"전체 소요 시간: {time.time() - start_time:.2f}초")
+                return result, "cpu", elapsed
+    except BaseException:
+        # GPU/로컬 작업의 예외나 취소(TaskCancelled)로 빠져나가면 남은 작업도 중단
+        gpu_cancel.set()
+        local_cancel.set()
+        raise
+
+    return None, "gpu", time.time() - start_time
+
+
+def get_hedge_stats() -> Dict[str, Any]:
+    """헤징 카운터와 설정 (상태 확인 API 노출용)"""
+    with _stats_lock:
+        stats = dict(hedge_stats)
+    stats["enabled"] = GPU_HEDGE_ENABLED
+    stats["operations"] = GPU_HEDGE_OPERATIONS
+    return stats
@@ -0,0 +1,146 @@
+import os
+import time
+import uuid
+import logging
+from typing import Any, Dict, Optional
+
+# 로깅 설정
+logger = logging.getLogger(__name__)
+
+# GPU 서버 동시 처리 제한 설정
+# 모든 Celery 워커 프로세스가 Redis를 통해 클러스터 전체의 처리 중 세그먼트 수를 공유합니다
+GPU_LIMITER_ENABLED = os.environ.get("GPU_LIMITER_ENABLED", "false").lower() == "true"
+GPU_LIMITER_REDIS_URL = os.environ.get(
+    "GPU_LIMITER_REDIS_URL", os.environ.get("CELERY_BROKER_URL", "redis://redis:6379/0")
+)
+# 클러스터 전체에서 동시에 GPU 서버로 보낼 수 있는 최대 세그먼트 수
+GPU_LIMITER_MAX_INFLIGHT_SEGMENTS = int(os.environ.get("GPU_LIMITER_MAX_INFLIGHT_SEGMENTS", 200))
+# 자리가 나기를 기다릴 최대 시간 (초). 초과하면 요청을 CPU로 돌립니다
+GPU_LIMITER_MAX_WAIT = float(os.environ.get("GPU_LIMITER_MAX_WAIT", 5))
+# 워커가 비정상 종료되어 반환되지 않은 슬롯이 자동으로 만료되는 시간 (초)
+GPU_LIMITER_LEASE_TTL = float(os.environ.get("GPU_LIMITER_LEASE_TTL", int(os.environ.get("GPU_REQUEST_TIMEOUT", 60)) + 30))
+
+LIMITER_KEY = "gpu_limiter:leases"
+METRICS_KEY = "gpu_limiter:metrics"
+# 대기 시간 히스토그램 버킷 (초)
+WAIT_BUCKETS = (0.01, 0.05, 0.1, 0.5, 1, 2, 5, 10)
+
+# 만료된 슬롯을 정리하고, 용량이 남으면 "lease_id:weight" 멤버를 추가하는 원자적 스크립트
+# 처리 중인 요청이 없으면 용량보다 큰 요청도 단독으로 허용합니다
+_ACQUIRE_SCRIPT = """
+local now = tonumber(ARGV[1])
+local weight = tonumber(ARGV[3])
+local capacity = tonumber(ARGV[4])
+redis.call('ZREMRANGEBYSCORE', KEYS[1], '-inf', now)
+local inflight = 0
+for _, member in ipairs(redis.call('ZRANGE', KEYS[1], 0, -1)) do
+    inflight = inflight + tonumber(string.match(member, ':(%d+)$'))
+end
+if inflight == 0 or inflight + weight <= capacity then
+    redis.call('ZADD', KEYS[1], tonumber(ARGV[2]), ARGV[5])
+    return 1
+end
+return 0
+"""
+
+
+class GPUAdmissionLimiter:
+    """Redis 기반 클러스터 전체 GPU 동시 처리 제한 (가중치 세마포어)
+
+    acquire()는 세그먼트 수만큼의 슬롯을 확보할 때까지 최대 max_wait 초 동안 대기하고,
+    확보하지 못하면 None을 반환하여 호출 측이 CPU로 처리하도록 합니다.
+    Redis에 연결할 수 없으면 제한 없이 통과시킵니다 (fail-open).
+    """
+
+    def __init__(self, redis_url: str = GPU_LIMITER_REDIS_URL, capacity: int = GPU_LIMITER_MAX_INFLIGHT_SEGMENTS,
+                 max_wait: float = GPU_LIMITER_MAX_WAIT, lease_ttl: float = GPU_LIMITER_LEASE_TTL,
+                 enabled: bool = GPU_LIMITER_ENABLED):
+        self.redis_url = redis_url
+        self.capacity = capacity
+        self.max_wait = max_wait
+        self.lease_ttl = lease_ttl
+        self.enabled = enabled
+        self._redis = None
+        self._acquire_script = None
+
+    def _get_redis(self):
+        if self._redis is None:
+            import redis
+            self._redis = redis.Redis.from_url(self.redis_url, socket_timeout=2, socket_connect_timeout=2)
+            self._acquire_script = self._redis.register_script(_ACQUIRE_SCRIPT)
+        return self._redis
+
+    def _record_wait(self, client, wait_time: float, admitted: bool):
+        pipe = client.pipeline()
+        pipe.hincrby(METRICS_KEY, "admitted" if admitted else "diverted", 1)
+        pipe.hincrbyfloat(METRICS_KEY, "wait_seconds_sum", wait_time)
+        pipe.hincrby(METRICS_KEY, "wait_count", 1)
+        for bucket in WAIT_BUCKETS:
+            if wait_time <= bucket:
+                pipe.hincrby(METRICS_KEY, f"wait_le_{bucket}", 1)
+        pipe.execute()
+
+    def acquire(self, weight: int) -> Optional[str]:
+        """weight 개의 세그먼트 슬롯 확보. 성공 시 lease ID, 시간 초과 시 None 반환"""
+        if not self.enabled:
+            return ""
+
+        weight = max(1, int(weight))
+        lease = f"{uuid.uuid4().hex}:{weight}"
+        start_time = time.time()
+        delay = 0.02
+        try:
+            client = self._get_redis()
+            while True:
+                now = time.time()
+                if self._acquire_script(keys=[LIMITER_KEY], args=[now, now + self.lease_ttl, weight, self.capacity, lease]):
+                    wait_time = time.time() - start_time
+                    self._record_wait(client, wait_time, admitted=True)
+                    if wait_time > 0.1:
+                        logger.info(f"GPU 동시 처리 슬롯 확보: 세그먼트 {weight}개, 대기 시간: {wait_time:.2f}초")
+                    return lease
+                if now - start_time >= self.max_wait:
+                    self._record_wait(client, now - start_time, admitted=False)
+                    logger.warning(
+                        f"GPU 동시 처리 한도({self.capacity} 세그먼트) 초과: {self.max_wait}초 대기 후 CPU로 전환합니다"
+                    )
+                    return None
+                time.sleep(delay)
+                delay = min(delay * 2, 0.5)
+        except Exception as e:
+            # Redis 장애가 GPU 사용 자체를 막지 않도록 제한 없이 통과
+            logger.warning(f"GPU 동시 처리 제한기 사용 불가 (제한 없이 진행): {e}")
+            return ""
+
+    def release(self, lease: Optional[str]):
+        """확보한 슬롯 반환"""
+        if not lease:
+            return
+        try:
+            self._get_redis().zrem(LIMITER_KEY, lease)
+        except Exception as e:
+            logger.warning(f"GPU 동시 처리 슬롯 반환 실패 (만료 시 자동 정리): {e}")
+
+    def metrics(self) -> Dict[str, Any]:
+        """클러스터 전체 대기 시간 지표와 현재 처리 중 세그먼트 수"""
+        result: Dict[str, Any] = {"enabled": self.enabled, "capacity": self.capacity, "max_wait": self.max_wait}
+        if not self.enabled:
+            return result
+        try:
+            client = self._get_redis()
+            members = client.zrangebyscore(LIMITER_KEY, time.time(), "+inf")
+            result["inflight_segments"] = sum(int(m.rsplit(b":", 1)[1]) for m in members)
+            raw = client.hgetall(METRICS_KEY)
+            counters = {k.decode(): float(v) for k, v in raw.items()}
+            result["admitted"] = int(counters.get("admitted", 0))
+            result["diverted"] = int(counters.get("diverted", 0))
+            wait_count = counters.get("wait_count", 0)
+            result["avg_wait_seconds"] = counters.get("wait_seconds_sum", 0) / wait_count if wait_count else 0.0
+            result["wait_histogram"] = {f"le_{b}": int(counters.get(f"wait_le_{b}", 0)) for b in WAIT_BUCKETS}
+        except Exception as e:
+            result["error"] = str(e)
+        return result
+
+
+# 워커 프로세스에서 공유하는 제한기 인스턴스
+gpu_limiter = GPUAdmissionLimiter()
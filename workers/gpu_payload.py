@@ -0,0 +1,117 @@
+import os
+import base64
+import logging
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+# 로깅 설정
+logger = logging.getLogger(__name__)
+
+# GPU 서버로 보내는 입력 형식
+# - json: 원본 샘플링 레이트의 float 리스트 (기존 API, 가장 큼)
+# - audio: float16 base64 오디오. CREPE 입력은 워커에서 16kHz로 다운샘플링하여 전송
+# - mel: audio와 같되 기법 모델 입력은 워커에서 계산한 float16 멜 스펙트로그램으로 전송
+PAYLOAD_MODES = ("json", "audio", "mel")
+GPU_PAYLOAD_MODE = os.environ.get("GPU_PAYLOAD_MODE", "json").lower()
+if GPU_PAYLOAD_MODE not in PAYLOAD_MODES:
+    logger.warning(f"알 수 없는 GPU_PAYLOAD_MODE: {GPU_PAYLOAD_MODE}, json 모드를 사용합니다")
+    GPU_PAYLOAD_MODE = "json"
+
+# CREPE 모델의 입력 샘플링 레이트
+# 서버(gpu_server/service.py)와 로컬 crepe.predict 모두 resampy로 이 레이트에 맞추므로, 워커에서도 resampy로
+# 미리 줄여 보내면 서버 측 리샘플링을 건너뛸 뿐 같은 입력이 됨
+CREPE_SAMPLE_RATE = 16000
+
+
+def encode_array(array: np.ndarray, dtype: str = "float16") -> Dict[str, Any]:
+    """NumPy 배열을 {"data": base64, "dtype", "shape"} 형식으로 인코딩"""
+    array = np.ascontiguousarray(array, dtype=dtype)
+    return {
+        "data": base64.b64encode(array.tobytes()).decode("ascii"),
+        "dtype": dtype,
+        "shape": list(array.shape),
+    }
+
+
+def decode_array(encoded: Dict[str, Any]) -> np.ndarray:
+    """encode_array 형식을 float32 NumPy 배열로 디코딩"""
+    array = np.frombuffer(base64.b64decode(encoded["data"]), dtype=encoded.get("dtype", "float16"))
+    return array.reshape(encoded["shape"]).astype(np.float32)
+
+
+def resample_for_crepe(segment: np.ndarray, sample_rate: int) -> np.ndarray:
+    """CREPE 입력용 16kHz 다운샘플링 (서버의 crepe_frames, crepe.core.get_activation과 같은 resampy 사용)"""
+    if sample_rate == CREPE_SAMPLE_RATE:
+        return segment
+    import resampy  # crepe 의존성으로 함께 설치됨
+    return resampy.resample(np.asarray(segment, dtype=np.float32), sample_rate, CREPE_SAMPLE_RATE)
+
+
+def technique_mel(segment: np.ndarray, sample_rate: int) -> Optional[np.ndarray]:
+    """기법 모델 입력용 정규화된 멜 스펙트로그램 (128 x 960). 너무 짧은 세그먼트는 None"""
+    if len(segment) < sample_rate * 0.01:
+        return None
+    from workers.dsp import wav_to_spectrogram
+    spec = wav_to_spectrogram(segment, sr=sample_rate)
+    return (spec - np.min(spec)) / (np.max(spec) - np.min(spec) + 1e-8)
+
+
+def build_payload(op: str, segments: List[np.ndarray], sample_rate: int,
+                  mode: str = GPU_PAYLOAD_MODE) -> Tuple[str, Dict[str, Any]]:
+    """연산과 입력 형식에 맞는 GPU 서버 API 이름과 요청 본문 생성
+
+    Args:
+        op: "techniques", "crepe", "pyin", "analyze"
+        segments: 오디오 세그먼트 리스트 (NumPy 배열)
+        sample_rate: 세그먼트의 샘플링 레이트
+        mode: "json", "audio", "mel"
+
+    Returns:
+        (API 이름, 요청 본문)
+    """
+    if mode == "json" or op == "pyin":
+        endpoints = {
+            "techniques": "predict_techniques",
+            "crepe": "extract_pitch_with_crepe",
+            "pyin": "extract_pitch_with_pyin",
+            "analyze": "analyze_segments",
+        }
+        return endpoints[op], {"segments": [segment.tolist() for segment in segments], "sample_rate": sample_rate}
+
+    if op == "crepe":
+        return "extract_pitch_with_crepe_compact", {
+            "segments": [encode_array(resample_for_crepe(segment, sample_rate)) for segment in segments],
+            "sample_rate": CREPE_SAMPLE_RATE,
+        }
+
+    if op == "techniques":
+        if mode == "mel":
+            mels = [technique_mel(segment, sample_rate) for segment in segments]
+            return "predict_techniques_compact", {
+                "segments": [encode_array(mel) if mel is not None else None for mel in mels],
+                "sample_rate": sample_rate,
+                "input_type": "mel",
+            }
+        return "predict_techniques_compact", {
+            "segments": [encode_array(segment) for segment in segments],
+            "sample_rate": sample_rate,
+            "input_type": "audio",
+        }
+
+    if op == "analyze":
+        if mode == "mel":
+            # 음정은 16kHz 오디오에서, 기법은 워커에서 계산한 멜 스펙트로그램에서 추론
+            mels = [technique_mel(segment, sample_rate) for segment in segments]
+            return "analyze_segments_compact", {
+                "segments": [encode_array(resample_for_crepe(segment, sample_rate)) for segment in segments],
+                "sample_rate": CREPE_SAMPLE_RATE,
+                "mels": [encode_array(mel) if mel is not None else None for mel in mels],
+            }
+        # 원본 레이트 오디오를 한 번만 보내고 서버에서 CREPE용 리샘플링
+        return "analyze_segments_compact", {
+            "segments": [encode_array(segment) for segment in segments],
+            "sample_rate": sample_rate,
+        }
+
+    raise ValueError(f"알 수 없는 연산: {op}")
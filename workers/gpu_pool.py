@@ -0,0 +1,162 @@
+import os
+import time
+import logging
+import threading
+from typing import Any, Dict, Iterable, List, Optional
+
+import requests
+
+from workers.gpu_router import gpu_router
+
+# 로깅 설정
+logger = logging.getLogger(__name__)
+
+# 여러 GPU 추론 엔드포인트 설정 (쉼표로 구분)
+# 설정되지 않으면 기존 단일 GPU_INFERENCE_SERVICE_URL을 사용합니다
+GPU_INFERENCE_SERVICE_URLS = [
+    url.strip().rstrip("/")
+    for url in os.environ.get(
+        "GPU_INFERENCE_SERVICE_URLS",
+        os.environ.get("GPU_INFERENCE_SERVICE_URL", "http://localhost:8888")
+    ).split(",")
+    if url.strip()
+]
+# 연속 실패가 이 횟수에 도달하면 엔드포인트의 서킷을 엽니다
+GPU_CIRCUIT_FAILURE_THRESHOLD = int(os.environ.get("GPU_CIRCUIT_FAILURE_THRESHOLD", 3))
+# 서킷이 열린 뒤 시험 요청(half-open)을 허용하기까지 기다리는 시간 (초)
+GPU_CIRCUIT_RESET_TIMEOUT = float(os.environ.get("GPU_CIRCUIT_RESET_TIMEOUT", 30))
+GPU_HEALTH_CHECK_TIMEOUT = float(os.environ.get("GPU_HEALTH_CHECK_TIMEOUT", 5))
+
+CIRCUIT_CLOSED = "closed"
+CIRCUIT_OPEN = "open"
+CIRCUIT_HALF_OPEN = "half_open"
+
+
+class GPUEndpoint:
+    """GPU 추론 엔드포인트 하나의 상태 (진행 중 요청 수, 헬스, 서킷 상태)"""
+
+    def __init__(self, url: str):
+        self.url = url
+        self.outstanding = 0
+        self.healthy = True
+        self.consecutive_failures = 0
+        self.circuit = CIRCUIT_CLOSED
+        self.opened_at = 0.0
+        self.total_requests = 0
+        self.total_failures = 0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "url": self.url,
+            "outstanding": self.outstanding,
+            "healthy": self.healthy,
+            "circuit": self.circuit,
+            "consecutive_failures": self.consecutive_failures,
+            "total_requests": self.total_requests,
+            "total_failures": self.total_failures,
+        }
+
+
+class GPUEndpointPool:
+    """여러 GPU 추론 엔드포인트에 대한 부하 분산 및 장애 조치
+
+    - 진행 중 요청이 가장 적은 엔드포인트를 선택합니다 (least outstanding requests)
+    - 연속 실패가 임계값에 도달하면 서킷을 열어 일정 시간 요청을 보내지 않습니다
+    - 리셋 시간이 지나면 한 번의 시험 요청(half-open)을 허용하고 성공하면 서킷을 닫습니다
+    """
+
+    def __init__(self, urls: Iterable[str], failure_threshold: int = GPU_CIRCUIT_FAILURE_THRESHOLD,
+                 reset_timeout: float = GPU_CIRCUIT_RESET_TIMEOUT):
+        self.endpoints = [GPUEndpoint(url) for url in urls]
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._lock = threading.Lock()
+
+    @property
+    def urls(self) -> List[str]:
+        return [endpoint.url for endpoint in self.endpoints]
+
+    def _is_selectable(self, endpoint: GPUEndpoint, now: float) -> bool:
+        if not endpoint.healthy:
+            return False
+        if endpoint.circuit == CIRCUIT_CLOSED:
+            return True
+        if endpoint.circuit == CIRCUIT_OPEN and now - endpoint.opened_at >= self.reset_timeout:
+            return True
+        # half-open 상태에서는 진행 중인 시험 요청이 끝날 때까지 추가 요청을 보내지 않음
+        return endpoint.circuit == CIRCUIT_HALF_OPEN and endpoint.outstanding == 0
+
+    def acquire(self, exclude: Iterable[GPUEndpoint] = ()) -> Optional[GPUEndpoint]:
+        """요청을 보낼 엔드포인트 선택 (선택된 엔드포인트의 진행 중 요청 수 증가)"""
+        excluded = set(id(endpoint) for endpoint in exclude)
+        now = time.time()
+        with self._lock:
+            candidates = [
+                endpoint for endpoint in self.endpoints
+                if id(endpoint) not in excluded and self._is_selectable(endpoint, now)
+            ]
+            if not candidates:
+                return None
+            endpoint = min(candidates, key=lambda e: e.outstanding)
+            if endpoint.circuit == CIRCUIT_OPEN:
+                endpoint.circuit = CIRCUIT_HALF_OPEN
+                logger.info(f"GPU 엔드포인트 서킷 half-open: {endpoint.url}")
+            endpoint.outstanding += 1
+            endpoint.total_requests += 1
+            return endpoint
+
+    def has_available(self) -> bool:
+        """마지막 헬스 체크와 서킷 상태 기준으로 요청을 보낼 수 있는 엔드포인트가 있는지 여부 (네트워크 요청 없음)"""
+        now = time.time()
+        with self._lock:
+            return any(self._is_selectable(endpoint, now) for endpoint in self.endpoints)
+
+    def release(self, endpoint: GPUEndpoint, success: bool):
+        """요청 완료 처리 및 서킷 상태 갱신"""
+        with self._lock:
+            endpoint.outstanding = max(0, endpoint.outstanding - 1)
+            if success:
+                if endpoint.circuit != CIRCUIT_CLOSED:
+                    logger.info(f"GPU 엔드포인트 서킷 닫힘: {endpoint.url}")
+                endpoint.consecutive_failures = 0
+                endpoint.circuit = CIRCUIT_CLOSED
+                return
+
+            endpoint.total_failures += 1
+            endpoint.consecutive_failures += 1
+            if endpoint.circuit == CIRCUIT_HALF_OPEN or endpoint.consecutive_failures >= self.failure_threshold:
+                endpoint.circuit = CIRCUIT_OPEN
+                endpoint.opened_at = time.time()
+                logger.warning(
+                    f"GPU 엔드포인트 서킷 열림: {endpoint.url}, 연속 실패: {endpoint.consecutive_failures}, "
+                    f"{self.reset_timeout}초 후 재시도"
+                )
+
+    def check_health(self, timeout: float = GPU_HEALTH_CHECK_TIMEOUT) -> bool:
+        """서킷이 열려있지 않은 엔드포인트의 /livez를 확인하고, 하나라도 정상이면 True 반환"""
+        any_healthy = False
+        now = time.time()
+        for endpoint in self.endpoints:
+            if endpoint.circuit == CIRCUIT_OPEN and now - endpoint.opened_at < self.reset_timeout:
+                continue
+            try:
+                start_time = time.time()
+                response = requests.get(f"{endpoint.url}/livez", timeout=timeout)
+                endpoint.healthy = response.status_code == 200
+                if endpoint.healthy:
+                    # 헬스 체크 왕복 시간을 라우터의 RTT 추정치로 사용
+                    gpu_router.observe_rtt(time.time() - start_time)
+            except requests.exceptions.RequestException as e:
+                logger.warning(f"GPU 추론 서비스 ({endpoint.url}) 연결 불가: {e}")
+                endpoint.healthy = False
+            any_healthy = any_healthy or endpoint.healthy
+        return any_healthy
+
+    def stats(self) -> List[Dict[str, Any]]:
+        """엔드포인트별 상태 (상태 확인 API 노출용)"""
+        with self._lock:
+            return [endpoint.to_dict() for endpoint in self.endpoints]
+
+
+# 워커 프로세스에서 공유하는 엔드포인트 풀
+gpu_endpoint_pool = GPUEndpointPool(GPU_INFERENCE_SERVICE_URLS)
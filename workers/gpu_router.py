@@ -0,0 +1,181 @@
+import os
+import math
+import logging
+import threading
+from collections import deque
+from typing import Dict, Optional, Sequence
+
+# 로깅 설정
+logger = logging.getLogger(__name__)
+
+# 요청 단위 GPU/CPU 라우팅 설정
+# GPU_ROUTING_ENABLED=false 이면 기존 동작과 같이 GPU 서버가 살아있을 때 항상 GPU를 사용합니다
+GPU_ROUTING_ENABLED = os.environ.get("GPU_ROUTING_ENABLED", "true").lower() == "true"
+GPU_ROUTER_EWMA_ALPHA = float(os.environ.get("GPU_ROUTER_EWMA_ALPHA", 0.3))
+# 관측값이 없을 때 사용하는 GPU 왕복 지연 초기값 (초)
+GPU_ROUTER_DEFAULT_RTT = float(os.environ.get("GPU_ROUTER_DEFAULT_RTT", 0.5))
+# 선택되지 않은 백엔드의 추정치가 낡지 않도록 N번마다 한 번씩 다른 백엔드를 시도
+GPU_ROUTER_EXPLORE_EVERY = int(os.environ.get("GPU_ROUTER_EXPLORE_EVERY", 20))
+# 탐색은 비싼 쪽 예상 시간이 싼 쪽의 N배 이내이거나 N초 이하인 작은 작업일 때만 수행
+# (긴 솔로를 CPU로 보내 수 분씩 지연시키지 않도록, 조건이 맞는 다음 결정까지 탐색을 미룸)
+GPU_ROUTER_EXPLORE_MAX_RATIO = float(os.environ.get("GPU_ROUTER_EXPLORE_MAX_RATIO", 3.0))
+GPU_ROUTER_EXPLORE_MAX_SECONDS = float(os.environ.get("GPU_ROUTER_EXPLORE_MAX_SECONDS", 5.0))
+# 실제 GPU 소요 시간 / 예상 시간 비율을 보관할 최근 관측 개수 (지연 백분위 계산용)
+GPU_ROUTER_HISTORY_SIZE = int(os.environ.get("GPU_ROUTER_HISTORY_SIZE", 200))
+
+# 연산별 초기 처리 비용 추정치 (초 / 작업 단위)
+# 작업 단위 = 샘플 수 + 세그먼트 수 * segment_weight
+# - GPU 비용에는 JSON 직렬화와 터널 업로드 비용이 포함됩니다
+# - 기법 분류는 세그먼트 길이와 상관없이 128x960 스펙트로그램 한 장을 추론하므로 세그먼트당 고정 비용이 큽니다
+OPERATION_PROFILES = {
+    "techniques": {"segment_weight": 22050, "cpu": 2.0e-6, "gpu": 4.0e-7},
+    "crepe": {"segment_weight": 0, "cpu": 2.5e-5, "gpu": 5.0e-6},
+    "pyin": {"segment_weight": 0, "cpu": 1.5e-5, "gpu": 5.0e-6},
+    # CREPE + 기법 분류 통합 요청: 샘플당 CREPE 비용 + 세그먼트당 기법 분류 비용
+    "analyze": {"segment_weight": 1600, "cpu": 2.7e-5, "gpu": 5.4e-6},
+}
+
+
+class GPURouter:
+    """세그먼트 수, 총 샘플 수, 관측된 지연 이력으로 GPU/CPU 중 더 빠른 백엔드를 고르는 라우터
+
+    GPU 예상 비용 = 배치 수 * RTT + 작업 단위 * GPU 처리율
+    CPU 예상 비용 = 작업 단위 * CPU 처리율
+
+    RTT와 처리율은 모두 지수 가중 이동 평균(EWMA)으로 갱신됩니다.
+    Celery prefork 환경에서는 워커 프로세스마다 독립적인 이력을 가집니다.
+    """
+
+    def __init__(self, alpha: float = GPU_ROUTER_EWMA_ALPHA, default_rtt: float = GPU_ROUTER_DEFAULT_RTT,
+                 explore_every: int = GPU_ROUTER_EXPLORE_EVERY, enabled: bool = GPU_ROUTING_ENABLED,
+                 explore_max_ratio: float = GPU_ROUTER_EXPLORE_MAX_RATIO,
+                 explore_max_seconds: float = GPU_ROUTER_EXPLORE_MAX_SECONDS):
+        self.alpha = alpha
+        self.enabled = enabled
+        self.explore_every = explore_every
+        self.explore_max_ratio = explore_max_ratio
+        self.explore_max_seconds = explore_max_seconds
+        self._explore_due = False
+        self.gpu_rtt = default_rtt
+        self.rates = {op: {"cpu": p["cpu"], "gpu": p["gpu"]} for op, p in OPERATION_PROFILES.items()}
+        self.observations = {op: {"cpu": 0, "gpu": 0} for op in OPERATION_PROFILES}
+        self.decisions = 0
+        self.gpu_latency_ratios = {op: deque(maxlen=GPU_ROUTER_HISTORY_SIZE) for op in OPERATION_PROFILES}
+        self._lock = threading.Lock()
+
+    def _ewma(self, current: float, sample: float) -> float:
+        return (1 - self.alpha) * current + self.alpha * sample
+
+    @staticmethod
+    def _work_units(op: str, segments: Sequence) -> float:
+        profile = OPERATION_PROFILES.get(op, {"segment_weight": 0})
+        total_samples = sum(len(s) for s in segments)
+        return total_samples + len(segments) * profile["segment_weight"]
+
+    def observe_rtt(self, elapsed: float):
+        """GPU 서버 헬스 체크 등으로 측정한 왕복 지연 반영"""
+        with self._lock:
+            self.gpu_rtt = self._ewma(self.gpu_rtt, elapsed)
+
+    def estimate(self, op: str, segments: Sequence, batch_size: int = 100) -> Dict[str, float]:
+        """백엔드별 예상 소요 시간(초) 계산"""
+        work = self._work_units(op, segments)
+        batches = max(1, math.ceil(len(segments) / max(1, batch_size)))
+        rates = self.rates.get(op, OPERATION_PROFILES["crepe"])
+        return {
+            "gpu": batches * self.gpu_rtt + work * rates["gpu"],
+            "cpu": work * rates["cpu"],
+        }
+
+    def choose_backend(self, op: str, segments: Sequence, batch_size: int = 100) -> str:
+        """'gpu' 또는 'cpu' 반환 (GPU 서버 가용성은 호출 측에서 먼저 확인)"""
+        if not self.enabled or op not in self.rates:
+            return "gpu"
+
+        with self._lock:
+            estimates = self.estimate(op, segments, batch_size)
+            backend = "gpu" if estimates["gpu"] <= estimates["cpu"] else "cpu"
+
+            # 한쪽 백엔드만 계속 선택되면 다른 쪽 추정치가 갱신되지 않으므로 주기적으로 탐색
+            self.decisions += 1
+            if self.explore_every > 0 and self.decisions % self.explore_every == 0:
+                self._explore_due = True
+            explored = False
+            if self._explore_due and self._explore_affordable(estimates):
+                backend = "cpu" if backend == "gpu" else "gpu"
+                explored = True
+                self._explore_due = False
+
+        logger.info(
+            f"GPU 라우팅 결정 ({op}): {backend}{' (탐색)' if explored else ''}, 세그먼트 수: {len(segments)}, "
+            f"예상 GPU: {estimates['gpu']:.2f}초, 예상 CPU: {estimates['cpu']:.2f}초, RTT: {self.gpu_rtt:.3f}초"
+        )
+        return backend
+
+    def _explore_affordable(self, estimates: Dict[str, float]) -> bool:
+        """반대 백엔드를 시도해도 지연이 감당할 만한지 여부 (비싼 쪽이 작거나 싼 쪽과 비슷할 때)"""
+        cheaper, costlier = sorted((estimates["gpu"], estimates["cpu"]))
+        return costlier <= self.explore_max_seconds or costlier <= cheaper * self.explore_max_ratio
+
+    def record(self, op: str, backend: str, segments: Sequence, elapsed: float, batch_size: int = 100,
+               track_latency: bool = True):
+        """실제 소요 시간을 관측하여 처리율 추정치 갱신
+
+        Args:
+            track_latency: GPU 소요 시간을 꼬리 지연(헤징 마감 시간) 이력에도 기록할지 여부
+        """
+        if op not in self.rates or not segments:
+            return
+        work = self._work_units(op, segments)
+        if work <= 0:
+            return
+
+        with self._lock:
+            if backend == "gpu":
+                # 갱신 전 추정치 대비 실제 소요 시간 비율 기록 (꼬리 지연 추정용)
+                expected = self.estimate(op, segments, batch_size)["gpu"]
+                if track_latency and expected > 0:
+                    self.gpu_latency_ratios[op].append(elapsed / expected)
+                # 고정 왕복 지연을 제외한 나머지를 처리율로 간주
+                batches = max(1, math.ceil(len(segments) / max(1, batch_size)))
+                rate = max(0.0, elapsed - batches * self.gpu_rtt) / work
+            else:
+                rate = elapsed / work
+            self.rates[op][backend] = self._ewma(self.rates[op][backend], rate)
+            self.observations[op][backend] += 1
+
+    def record_failure(self, op: str, segments: Sequence, elapsed: float, batch_size: int = 100):
+        """실패한 GPU 요청을 벌점 관측으로 반영
+
+        실패한 요청의 실제 비용은 기다린 시간과 이어지는 CPU 폴백 시간의 합이므로, 그만큼 걸린 GPU 관측으로
+        기록해 GPU 서버가 계속 실패하면 라우터가 CPU를 고르도록 합니다. 꼬리 지연 이력에는 넣지 않습니다.
+        """
+        penalty = elapsed + self.estimate(op, segments, batch_size)["cpu"]
+        self.record(op, "gpu", segments, penalty, batch_size, track_latency=False)
+
+    def gpu_latency_percentile(self, op: str, segments: Sequence, batch_size: int = 100,
+                               percentile: float = 95, min_history: int = 10) -> Optional[float]:
+        """이 입력에 대한 GPU 소요 시간의 백분위 추정치 (초)
+
+        관측 이력이 min_history 개 미만이면 None을 반환합니다.
+        """
+        with self._lock:
+            ratios = sorted(self.gpu_latency_ratios.get(op, ()))
+            if len(ratios) < min_history:
+                return None
+            index = min(len(ratios) - 1, int(math.ceil(percentile / 100 * len(ratios))) - 1)
+            return self.estimate(op, segments, batch_size)["gpu"] * ratios[max(0, index)]
+
+    def stats(self) -> Dict[str, object]:
+        """현재 추정치 (상태 확인 API 노출용)"""
+        with self._lock:
+            return {
+                "enabled": self.enabled,
+                "gpu_rtt": self.gpu_rtt,
+                "rates": {op: dict(r) for op, r in self.rates.items()},
+                "observations": {op: dict(o) for op, o in self.observations.items()},
+            }
+
+
+# 워커 프로세스별 라우터 인스턴스
+gpu_router = GPURouter()
@@ -0,0 +1,355 @@
+"""호스트당 하나의 로컬 추론 사이드카 프로세스
+
+Celery prefork 자식 프로세스마다 TensorFlow와 모델을 따로 로드하지 않도록, 사이드카가 모델을 한 번만
+로드하고 같은 호스트의 모든 워커 프로세스 요청을 Unix 도메인 소켓으로 받아 처리합니다.
+세그먼트 데이터는 공유 메모리로 전달하고 소켓으로는 작은 JSON 헤더만 주고받습니다.
+동시에 들어온 같은 종류의 요청은 짧은 시간 동안 모아 한 번의 추론으로 처리합니다.
+
+실행:
+    python -m workers.inference_sidecar
+"""
+import os
+import json
+import time
+import queue
+import socket
+import logging
+import threading
+import socketserver
+from multiprocessing import shared_memory, resource_tracker
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+# 로깅 설정
+logger = logging.getLogger(__name__)
+
+# 사이드카 설정
+INFERENCE_SIDECAR_ENABLED = os.environ.get("INFERENCE_SIDECAR_ENABLED", "false").lower() == "true"
+INFERENCE_SIDECAR_SOCKET = os.environ.get("INFERENCE_SIDECAR_SOCKET", "/tmp/maple_inference.sock")
+INFERENCE_SIDECAR_TIMEOUT = float(os.environ.get("INFERENCE_SIDECAR_TIMEOUT", 300))  # 초 단위
+# 요청을 모으기 위해 기다리는 최대 시간 (밀리초)과 한 번에 처리할 최대 세그먼트 수
+SIDECAR_BATCH_WINDOW_MS = float(os.environ.get("SIDECAR_BATCH_WINDOW_MS", 10))
+SIDECAR_MAX_BATCH_SEGMENTS = int(os.environ.get("SIDECAR_MAX_BATCH_SEGMENTS", 256))
+# 서버가 진행률을 보내는 간격이자 클라이언트가 취소 여부를 확인하는 간격 (초)
+SIDECAR_POLL_INTERVAL = float(os.environ.get("SIDECAR_POLL_INTERVAL", 0.5))
+
+SIDECAR_OPERATIONS = ("techniques", "crepe", "pyin", "analyze")
+
+
+def _attach_shared_memory(name: str) -> shared_memory.SharedMemory:
+    """다른 프로세스가 만든 공유 메모리에 연결 (이 프로세스 종료 시 해제되지 않도록 추적 해제)"""
+    shm = shared_memory.SharedMemory(name=name)
+    try:
+        resource_tracker.unregister(shm._name, "shared_memory")
+    except Exception:
+        pass
+    return shm
+
+
+def _split_result(op: str, result: Any, counts: List[int]) -> List[Any]:
+    """합쳐서 처리한 결과를 요청별 세그먼트 수대로 나눔"""
+    parts = []
+    offset = 0
+    for count in counts:
+        if op == "analyze":
+            parts.append({
+                "pitches": result["pitches"][offset:offset + count],
+                "techniques": result["techniques"][offset:offset + count],
+            })
+        else:
+            parts.append(result[offset:offset + count])
+        offset += count
+    return parts
+
+
+# ---------------------------------------------------------------------------
+# 서버
+# ---------------------------------------------------------------------------
+
+class _Request:
+    __slots__ = ("segments", "done", "abandoned", "progress", "result", "error")
+
+    def __init__(self, segments: List[np.ndarray]):
+        self.segments = segments
+        self.done = threading.Event()
+        # 클라이언트 연결이 끊기면 설정 (취소된 요청은 계산하지 않음)
+        self.abandoned = threading.Event()
+        self.progress = (0, len(segments))
+        self.result = None
+        self.error = None
+
+
+class _BatchCancelEvent:
+    """배치의 모든 요청이 버려졌을 때만 설정된 것으로 보이는 취소 이벤트 (로컬 추론 함수의 cancel_event로 전달)"""
+
+    def __init__(self, batch: List[_Request]):
+        self.batch = batch
+
+    def is_set(self) -> bool:
+        return all(request.abandoned.is_set() for request in self.batch)
+
+
+class _Coalescer:
+    """같은 (연산, 샘플링 레이트, 모델 경로, CREPE 모델 크기) 요청을 모아 한 번의 로컬 추론으로 처리하는 스레드"""
+
+    def __init__(self, op: str, sr: int, model_path: Optional[str], model_capacity: str = "full"):
+        self.op = op
+        self.sr = sr
+        self.model_path = model_path
+        self.model_capacity = model_capacity
+        self.queue: "queue.Queue[_Request]" = queue.Queue()
+        threading.Thread(target=self._run, name=f"sidecar-{op}-{sr}", daemon=True).start()
+
+    def _compute(self, segments: List[np.ndarray], cancel_event=None, progress_callback=None) -> Any:
+        """로컬 추론 실행. cancel_event가 설정되면 None 반환"""
+        from workers import dsp
+        if self.op == "techniques":
+            return dsp._predict_techniques_local(segments, self.model_path, self.sr, cancel_event, progress_callback)
+        if self.op == "crepe":
+            return dsp._extract_pitch_with_crepe_local(segments, self.sr, cancel_event, progress_callback,
+                                                       self.model_capacity)
+        if self.op == "pyin":
+            return dsp._extract_pitch_with_pyin_local(segments, self.sr, cancel_event, progress_callback)
+
+        # analyze: 음정 추출과 기법 예측을 절반씩 진행률로 보고
+        total = len(segments)
+        pitches = dsp._extract_pitch_with_crepe_local(
+            segments, self.sr, cancel_event,
+            progress_callback and (lambda current, _total: progress_callback(current, 2 * total)),
+            self.model_capacity
+        )
+        if pitches is None:
+            return None
+        techniques = dsp._predict_techniques_local(
+            segments, self.model_path, self.sr, cancel_event,
+            progress_callback and (lambda current, _total: progress_callback(total + current, 2 * total))
+        )
+        if techniques is None:
+            return None
+        return {"pitches": pitches, "techniques": techniques}
+
+    def _run(self):
+        while True:
+            batch = [self.queue.get()]
+            count = len(batch[0].segments)
+            deadline = time.time() + SIDECAR_BATCH_WINDOW_MS / 1000.0
+            while count < SIDECAR_MAX_BATCH_SEGMENTS:
+                try:
+                    request = self.queue.get(timeout=max(0.0, deadline - time.time()))
+                except queue.Empty:
+                    break
+                batch.append(request)
+                count += len(request.segments)
+
+            # 기다리는 동안 연결이 끊긴 요청은 계산하지 않음
+            for request in batch:
+                if request.abandoned.is_set():
+                    request.done.set()
+            batch = [request for request in batch if not request.abandoned.is_set()]
+            if not batch:
+                continue
+            count = sum(len(request.segments) for request in batch)
+
+            def report_progress(current, total):
+                for request in batch:
+                    request.progress = (current, total)
+
+            start_time = time.time()
+            try:
+                segments = [segment for request in batch for segment in request.segments]
+                result = self._compute(segments, _BatchCancelEvent(batch), report_progress)
+                if result is None:
+                    raise RuntimeError("모든 요청이 취소되어 추론을 중단했습니다")
+                parts = _split_result(self.op, result, [len(r.segments) for r in batch])
+                for request, part in zip(batch, parts):
+                    request.result = part
+            except Exception as e:
+                logger.exception(f"사이드카 {self.op} 추론 오류: {e}")
+                for request in batch:
+                    request.error = str(e)
+            finally:
+                for request in batch:
+                    request.done.set()
+            logger.info(f"사이드카 {self.op} 추론: 요청 {len(batch)}개, 세그먼트 {count}개, "
+                        f"소요 시간: {time.time() - start_time:.2f}초")
+
+
+class InferenceSidecarServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    """Unix 도메인 소켓으로 워커 프로세스의 추론 요청을 받는 서버"""
+
+    daemon_threads = True
+
+    def __init__(self, socket_path: str = INFERENCE_SIDECAR_SOCKET):
+        if os.path.exists(socket_path):
+            os.unlink(socket_path)
+        self._coalescers: Dict[tuple, _Coalescer] = {}
+        self._lock = threading.Lock()
+        super().__init__(socket_path, _SidecarHandler)
+        os.chmod(socket_path, 0o666)
+
+    def coalescer(self, op: str, sr: int, model_path: Optional[str], model_capacity: str = "full") -> _Coalescer:
+        key = (op, sr, model_path, model_capacity)
+        with self._lock:
+            if key not in self._coalescers:
+                self._coalescers[key] = _Coalescer(op, sr, model_path, model_capacity)
+            return self._coalescers[key]
+
+
+class _SidecarHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        try:
+            header = json.loads(self.rfile.readline())
+            op = header["op"]
+            if op not in SIDECAR_OPERATIONS:
+                raise ValueError(f"알 수 없는 연산: {op}")
+
+            # 공유 메모리에서 세그먼트를 복사해 온 뒤 바로 연결 해제 (생성/해제는 클라이언트 담당)
+            shm = _attach_shared_memory(header["shm"])
+            try:
+                buffer = np.ndarray((sum(header["lengths"]),), dtype=np.float32, buffer=shm.buf)
+                segments = []
+                offset = 0
+                for length in header["lengths"]:
+                    segments.append(np.array(buffer[offset:offset + length]))
+                    offset += length
+                del buffer
+            finally:
+                shm.close()
+
+            request = _Request(segments)
+            coalescer = self.server.coalescer(op, header["sample_rate"], header.get("model_path"),
+                                              header.get("model_capacity", "full"))
+            coalescer.queue.put(request)
+            # 기다리는 동안 진행률을 보내고, 쓰기에 실패하면 클라이언트가 취소한 것으로 보고 요청을 버림
+            while not request.done.wait(SIDECAR_POLL_INTERVAL):
+                try:
+                    self._send({"progress": list(request.progress)})
+                except OSError:
+                    logger.info(f"사이드카 {op} 요청 취소됨 (클라이언트 연결 종료)")
+                    request.abandoned.set()
+                    return
+            response = {"error": request.error} if request.error else {"result": request.result}
+        except Exception as e:
+            logger.exception(f"사이드카 요청 처리 오류: {e}")
+            response = {"error": str(e)}
+        try:
+            self._send(response)
+        except OSError:
+            logger.info("사이드카 응답 전송 실패 (클라이언트 연결 종료)")
+
+    def _send(self, message: Dict[str, Any]):
+        self.wfile.write((json.dumps(message, default=float) + "\n").encode())
+        self.wfile.flush()
+
+
+def serve(socket_path: str = INFERENCE_SIDECAR_SOCKET, preload_model_path: Optional[str] = None):
+    """사이드카 서버 실행 (모델을 미리 로드한 뒤 요청 대기)"""
+    if preload_model_path and os.path.exists(preload_model_path):
+        from workers.models import get_technique_model
+        get_technique_model(preload_model_path)
+    server = InferenceSidecarServer(socket_path)
+    logger.info(f"추론 사이드카 시작: {socket_path}")
+    try:
+        server.serve_forever()
+    finally:
+        server.server_close()
+        if os.path.exists(socket_path):
+            os.unlink(socket_path)
+
+
+# ---------------------------------------------------------------------------
+# 클라이언트 (워커 프로세스에서 사용)
+# ---------------------------------------------------------------------------
+
+def is_sidecar_available(socket_path: str = INFERENCE_SIDECAR_SOCKET) -> bool:
+    """사이드카 사용 설정 여부와 소켓 존재 여부 확인"""
+    return INFERENCE_SIDECAR_ENABLED and os.path.exists(socket_path)
+
+
+def _read_response(sock: socket.socket, deadline: float, cancel_event=None,
+                   progress_callback=None) -> Optional[Dict[str, Any]]:
+    """진행률 메시지를 전달하면서 최종 응답을 읽음. 취소되면 None 반환
+
+    소켓을 짧은 간격으로 폴링하여 대기 중에도 cancel_event를 확인합니다.
+    """
+    sock.settimeout(SIDECAR_POLL_INTERVAL)
+    data = b""
+    while True:
+        while b"\n" in data:
+            line, data = data.split(b"\n", 1)
+            message = json.loads(line)
+            if "progress" not in message:
+                return message
+            if progress_callback:
+                progress_callback(*message["progress"])
+
+        if cancel_event is not None and cancel_event.is_set():
+            return None
+        if time.time() > deadline:
+            raise socket.timeout("사이드카 응답 시간 초과")
+        try:
+            chunk = sock.recv(65536)
+        except socket.timeout:
+            continue
+        if not chunk:
+            raise ConnectionError("사이드카가 응답 없이 연결을 닫았습니다")
+        data += chunk
+
+
+def run_in_sidecar(op: str, segments: List[np.ndarray], sr: int, model_path: Optional[str] = None,
+                   model_capacity: str = "full", cancel_event=None, progress_callback=None,
+                   socket_path: str = INFERENCE_SIDECAR_SOCKET,
+                   timeout: float = INFERENCE_SIDECAR_TIMEOUT) -> Optional[Any]:
+    """사이드카에 추론 요청. 사용할 수 없거나 실패하거나 취소되면 None 반환 (호출 측에서 프로세스 내 계산으로 폴백)
+
+    Args:
+        op: "techniques", "crepe", "pyin", "analyze"
+        segments: 오디오 세그먼트 리스트
+        sr: 샘플링 레이트
+        model_path: 기법 분류 모델 경로 ("techniques", "analyze"에서 사용)
+        model_capacity: CREPE 모델 크기 ("crepe", "analyze"에서 사용)
+        cancel_event: 설정되면 연결을 닫아 사이드카가 요청을 버리도록 함 (threading.Event)
+        progress_callback: 진행률 콜백 함수 (current, total)
+
+    Returns:
+        프로세스 내 로컬 함수와 같은 형식의 결과 또는 None
+    """
+    if not segments:
+        return None
+    lengths = [len(segment) for segment in segments]
+    shm = shared_memory.SharedMemory(create=True, size=max(1, sum(lengths) * 4))
+    try:
+        buffer = np.ndarray((sum(lengths),), dtype=np.float32, buffer=shm.buf)
+        buffer[:] = np.concatenate([np.asarray(segment, dtype=np.float32) for segment in segments])
+        del buffer
+
+        header = {"op": op, "shm": shm.name, "lengths": lengths, "sample_rate": sr, "model_path": model_path,
+                  "model_capacity": model_capacity}
+        start_time = time.time()
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.settimeout(timeout)
+            sock.connect(socket_path)
+            sock.sendall((json.dumps(header) + "\n").encode())
+            response = _read_response(sock, start_time + timeout, cancel_event, progress_callback)
+
+        if response is None:
+            logger.info(f"사이드카 {op} 추론 취소됨")
+            return None
+        if "error" in response:
+            logger.warning(f"사이드카 {op} 추론 실패: {response['error']}")
+            return None
+        logger.info(f"사이드카에서 {op} 추론 완료: {len(segments)} 개 세그먼트, 소요 시간: {time.time() - start_time:.2f}초")
+        return response["result"]
+    except (OSError, ValueError) as e:
+        logger.warning(f"사이드카 연결 실패 ({socket_path}): {e}")
+        return None
+    finally:
+        shm.close()
+        shm.unlink()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    from workers.models import TECHNIQUE_MODEL_PATH
+    serve(preload_model_path=TECHNIQUE_MODEL_PATH)
@@ -0,0 +1,29 @@
+import os
+import logging
+import threading
+from typing import Any, Dict
+
+# 로깅 설정
+logger = logging.getLogger(__name__)
+
+# 기법 분류 모델 기본 경로
+MODEL_DIR = os.environ.get("MODEL_DIR", "models")
+TECHNIQUE_MODEL_PATH = os.path.join(MODEL_DIR, "guitar_technique_classifier.keras")
+TECHNIQUES = ["bend", "hammer", "normal", "pull", "slide", "vibrato"]
+
+# 프로세스당 한 번만 로드하는 모델 캐시 (경로 -> 모델)
+_technique_models: Dict[str, Any] = {}
+_lock = threading.Lock()
+
+
+def get_technique_model(model_path: str = TECHNIQUE_MODEL_PATH):
+    """기법 분류 모델을 처음 사용할 때 한 번 로드하고 이후에는 캐시된 모델 반환"""
+    model = _technique_models.get(model_path)
+    if model is not None:
+        return model
+    with _lock:
+        if model_path not in _technique_models:
+            from keras.models import load_model  # 독립 Keras 패키지 사용
+            logger.info(f"기법 분류 모델 로드: {model_path}")
+            _technique_models[model_path] = load_model(model_path)
+        return _technique_models[model_path]
@@ -0,0 +1,135 @@
+"""Celery prefork 풀에서 모델 메모리를 자식 프로세스와 공유하기 위한 프리로드
+
+WORKER_PRELOAD_MODELS=true이면 부모 프로세스(worker_init 시그널)가 포크 전에 기법 분류 모델,
+CREPE 모델, 멜 필터뱅크를 로드하고 gc.freeze()로 GC가 해당 객체를 건드리지 않게 합니다.
+자식 프로세스는 copy-on-write로 같은 메모리 페이지를 공유합니다.
+
+TensorFlow 런타임은 포크 안전성이 보장되지 않으므로, 자식 프로세스 시작 시(worker_process_init)
+물려받은 모델로 작은 추론을 실행해 확인하고, 실패하거나 제한 시간 안에 끝나지 않으면 물려받은 모델을
+버리고 자식 프로세스에서 다시 로드합니다.
+"""
+import gc
+import os
+import time
+import logging
+import threading
+from typing import Dict, Optional
+
+import numpy as np
+
+from workers.models import TECHNIQUE_MODEL_PATH, _technique_models, get_technique_model
+
+# 로깅 설정
+logger = logging.getLogger(__name__)
+
+# 포크 전에 부모 프로세스에서 모델을 로드할지 여부
+WORKER_PRELOAD_MODELS = os.environ.get("WORKER_PRELOAD_MODELS", "false").lower() == "true"
+# 자식 프로세스에서 물려받은 모델을 확인하는 추론의 제한 시간 (초)
+WORKER_PRELOAD_VERIFY_TIMEOUT = float(os.environ.get("WORKER_PRELOAD_VERIFY_TIMEOUT", 30))
+# 프리로드할 CREPE 모델 크기 (crepe.predict 기본값과 같아야 공유됨)
+CREPE_MODEL_CAPACITY = os.environ.get("CREPE_MODEL_CAPACITY", "full")
+
+# 부모 프로세스에서 프리로드를 마쳤는지 (포크된 자식 프로세스에도 그대로 전달됨)
+_preloaded = False
+
+
+def preload_models(model_path: str = TECHNIQUE_MODEL_PATH, crepe_capacity: str = CREPE_MODEL_CAPACITY):
+    """포크 전에 읽기 전용 모델 데이터를 로드하고 GC 대상에서 제외
+
+    Args:
+        model_path: 기법 분류 모델 경로
+        crepe_capacity: CREPE 모델 크기
+    """
+    global _preloaded
+    import crepe.core
+    from workers.dsp import mel_basis
+
+    start_time = time.time()
+    mel_basis()  # wav_to_spectrogram 기본 설정의 필터뱅크
+    crepe.core.build_and_load_model(crepe_capacity)
+    if os.path.exists(model_path):
+        get_technique_model(model_path)
+    else:
+        logger.warning(f"기법 분류 모델 파일이 없어 프리로드하지 않음: {model_path}")
+
+    # 이후 자식 프로세스의 GC가 프리로드한 객체의 헤더를 써서 페이지가 복사되지 않도록 영구 세대로 이동
+    gc.collect()
+    gc.freeze()
+    _preloaded = True
+    logger.info(f"모델 프리로드 완료: {time.time() - start_time:.2f}초, 고정된 객체 {gc.get_freeze_count()}개, "
+                f"RSS {memory_usage().get('rss', 0) / 2**20:.0f}MB")
+
+
+def _discard_inherited_models():
+    """물려받은 모델을 버려 자식 프로세스에서 처음 사용할 때 다시 로드되게 함"""
+    import crepe.core
+    _technique_models.clear()
+    for capacity in crepe.core.models:
+        crepe.core.models[capacity] = None
+
+
+def _smoke_test():
+    """물려받은 모델로 0 입력 추론 (TF 런타임이 포크 후에도 동작하는지 확인)"""
+    import crepe.core
+    for model in list(crepe.core.models.values()) + list(_technique_models.values()):
+        if model is None:
+            continue
+        shape = [1] + [dim or 1 for dim in model.input_shape[1:]]
+        model.predict(np.zeros(shape, dtype=np.float32), verbose=0)
+
+
+def verify_after_fork(timeout: float = WORKER_PRELOAD_VERIFY_TIMEOUT) -> bool:
+    """포크된 자식 프로세스에서 물려받은 모델이 사용 가능한지 확인
+
+    Returns:
+        물려받은 모델을 그대로 쓰면 True, 버리고 다시 로드하게 했으면 False
+    """
+    if not _preloaded:
+        return True
+
+    outcome: Dict[str, Optional[BaseException]] = {}
+
+    def run():
+        try:
+            _smoke_test()
+            outcome["error"] = None
+        except BaseException as e:  # TF 내부 오류도 모두 실패로 처리
+            outcome["error"] = e
+
+    start_time = time.time()
+    thread = threading.Thread(target=run, name="preload-verify", daemon=True)
+    thread.start()
+    thread.join(timeout)
+
+    if "error" not in outcome:
+        logger.error(f"프리로드한 모델 확인이 {timeout:.0f}초 안에 끝나지 않음 (포크 후 TF 런타임 정지 가능성). "
+                     f"WORKER_PRELOAD_MODELS=false 또는 추론 사이드카 사용을 권장합니다")
+    elif outcome["error"] is not None:
+        logger.error(f"프리로드한 모델 확인 실패, 자식 프로세스에서 다시 로드합니다: {outcome['error']}")
+    else:
+        logger.info(f"프리로드한 모델 확인 완료 (pid={os.getpid()}, {time.time() - start_time:.2f}초)")
+        return True
+    _discard_inherited_models()
+    return False
+
+
+def memory_usage(pid: Optional[int] = None) -> Dict[str, int]:
+    """프로세스 메모리 사용량 (바이트). /proc/<pid>/smaps_rollup 기준 (Linux 전용)
+
+    Returns:
+        rss, pss(공유 페이지를 공유 프로세스 수로 나눈 값), shared, private
+    """
+    path = f"/proc/{pid or os.getpid()}/smaps_rollup"
+    fields = {"Rss": "rss", "Pss": "pss", "Shared_Clean": "shared", "Shared_Dirty": "shared",
+              "Private_Clean": "private", "Private_Dirty": "private"}
+    usage = {"rss": 0, "pss": 0, "shared": 0, "private": 0}
+    try:
+        with open(path) as f:
+            for line in f:
+                parts = line.split()
+                key = parts[0].rstrip(":") if parts else ""
+                if key in fields:
+                    usage[fields[key]] += int(parts[1]) * 1024
+    except OSError as e:
+        logger.warning(f"메모리 사용량을 읽을 수 없음 ({path}): {e}")
+    return usage
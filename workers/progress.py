@@ -0,0 +1,77 @@
+import os
+import time
+import threading
+from typing import Callable, Optional
+
+from workers.task_events import publish_task_event
+from workers.cancellation import task_cancellation
+
+# 진행 상황 보고 설정
+# 상태 저장은 매번 결과 백엔드(Redis) 쓰기이므로 최소 간격과 최소 증가폭을 넘을 때만 기록합니다
+PROGRESS_MIN_INTERVAL = float(os.environ.get("PROGRESS_MIN_INTERVAL", 0.5))  # 초 단위
+PROGRESS_MIN_DELTA = int(os.environ.get("PROGRESS_MIN_DELTA", 2))  # 퍼센트 단위
+
+
+class ProgressReporter:
+    """Celery 태스크 진행률 보고기 (디바운스)
+
+    진행률은 줄어들지 않으며, 상태(state)가 바뀌거나 force=True이면 바로 기록합니다.
+    그 외에는 마지막 기록 후 min_interval 초가 지나고 min_delta 이상 증가했을 때만 기록하고,
+    기록하지 못한 최신 값은 다음 update() 또는 flush() 때 기록합니다.
+    여러 스레드(StageGraph 단계)에서 함께 호출해도 됩니다.
+
+    update()는 작업 취소 요청도 확인하여 취소됐으면 TaskCancelled를 발생시킵니다.
+    결과를 저장하는 마무리 단계(FINALIZING)에서는 확인하지 않습니다.
+    """
+
+    def __init__(self, task, task_id: Optional[str] = None, min_interval: float = PROGRESS_MIN_INTERVAL,
+                 min_delta: int = PROGRESS_MIN_DELTA):
+        self.task = task
+        # 기록할 태스크 ID (캔버스 서브태스크는 원래 compare_audio 태스크 ID를 넘김)
+        # Celery의 task.request는 스레드별이므로 StageGraph/헤징 스레드에서 호출해도 같은 ID에 기록하도록 여기서 고정
+        self.task_id = task_id or getattr(getattr(task, 'request', None), 'id', None)
+        self.min_interval = min_interval
+        self.min_delta = min_delta
+        self.progress = 0
+        self.state = None
+        self._reported = None
+        self._reported_at = 0.0
+        self._lock = threading.Lock()
+        self._check_cancelled = task_cancellation.checker(self.task_id)
+
+    def _write(self):
+        self.task.update_state(task_id=self.task_id, state=self.state, meta={'progress': self.progress})
+        # SSE 구독자에게 같은 진행률을 푸시 (task_id가 없는 가짜 태스크는 건너뜀)
+        publish_task_event(self.task_id, {'status': self.state, 'progress': self.progress})
+        self._reported = (self.state, self.progress)
+        self._reported_at = time.time()
+
+    def update(self, progress: int, state: str = 'PROCESSING', force: bool = False) -> bool:
+        """진행률 갱신. 실제로 기록했으면 True"""
+        if state != 'FINALIZING':
+            self._check_cancelled()
+        with self._lock:
+            if state == self.state and progress < self.progress:
+                return False
+            self.progress = int(progress)
+            self.state = state
+            if self._reported == (self.state, self.progress):
+                return False
+            if not force and self._reported is not None and self._reported[0] == state:
+                if (self.progress - self._reported[1] < self.min_delta
+                        or time.time() - self._reported_at < self.min_interval):
+                    return False
+            self._write()
+            return True
+
+    def flush(self):
+        """아직 기록하지 못한 최신 진행률 기록"""
+        with self._lock:
+            if self.state is not None and self._reported != (self.state, self.progress):
+                self._write()
+
+    def range(self, start: int, end: int, state: str = 'PROCESSING') -> Callable[[int, int], None]:
+        """(처리한 수, 전체 수)를 start~end 구간의 진행률로 보고하는 콜백 (배치/세그먼트 루프용)"""
+        def callback(done: int, total: int):
+            self.update(start + int((end - start) * done / max(total, 1)), state)
+        return callback
@@ -0,0 +1,127 @@
+import os
+import json
+import hashlib
+import logging
+from typing import Callable, Optional, Tuple
+
+# 로깅 설정
+logger = logging.getLogger(__name__)
+
+# 같은 녹음을 다시 제출했을 때 이전 작업 결과를 재사용하는 캐시 설정
+# 캐시에는 (오디오 해시, 곡, 레퍼런스 버전, 파이프라인 버전, 파라미터) -> 작업 ID만 저장하고,
+# 결과는 기존 작업 상태 조회(/tasks/{task_id})로 그대로 받습니다
+RESULT_CACHE_ENABLED = os.environ.get("RESULT_CACHE_ENABLED", "false").lower() == "true"
+RESULT_CACHE_REDIS_URL = os.environ.get(
+    "RESULT_CACHE_REDIS_URL", os.environ.get("CELERY_RESULT_BACKEND", "redis://redis:6379/1")
+)
+# 캐시 항목 유지 시간 (초). 결과 백엔드에서 작업 결과가 만료되면 작업 ID로 결과를 찾을 수 없으므로
+# CELERY_RESULT_EXPIRES보다 길게 잡지 않습니다
+RESULT_CACHE_TTL = min(int(os.environ.get("RESULT_CACHE_TTL", 6 * 3600)),
+                       int(os.environ.get("CELERY_RESULT_EXPIRES", 86400)))
+# DSP/모델이 바뀌어 같은 입력의 결과가 달라지면 올려서 이전 캐시 항목을 무효화
+PIPELINE_VERSION = os.environ.get("PIPELINE_VERSION", "1")
+
+CACHE_KEY_PREFIX = "result_cache:"
+# 작업 ID -> 캐시 키 (작업 취소 시 캐시 항목을 찾아 지우기 위한 역방향 키)
+TASK_KEY_PREFIX = "result_cache_task:"
+
+# 캐시 항목을 다시 쓰지 않고 새로 실행해야 하는 작업 상태
+_RERUN_STATES = frozenset({"FAILURE", "REVOKED"})
+
+
+class ResultCache:
+    """오디오 내용과 파라미터가 같은 제출을 기존 작업(완료 또는 실행 중)에 연결하는 캐시
+
+    동시에 같은 제출이 두 번 들어오면 둘 다 실행될 수 있지만 결과는 같습니다 (나중 작업 ID가 캐시에 남음).
+    Redis에 연결할 수 없으면 캐시 없이 새로 실행합니다.
+    """
+
+    def __init__(self, redis_url: str = RESULT_CACHE_REDIS_URL, ttl: int = RESULT_CACHE_TTL,
+                 enabled: bool = RESULT_CACHE_ENABLED, pipeline_version: str = PIPELINE_VERSION):
+        self.redis_url = redis_url
+        self.ttl = ttl
+        self.enabled = enabled
+        self.pipeline_version = pipeline_version
+        self._redis = None
+
+    def _get_redis(self):
+        if self._redis is None:
+            import redis
+            self._redis = redis.Redis.from_url(self.redis_url, socket_timeout=2, socket_connect_timeout=2)
+        return self._redis
+
+    def key(self, kind: str, audio_bytes: bytes, reference_version: Optional[str] = None, **params) -> str:
+        """캐시 키 생성
+
+        Args:
+            kind: 작업 종류 (analysis, comparison)
+            audio_bytes: 업로드한 오디오 내용
+            reference_version: 비교에 사용할 레퍼런스 버전 (레퍼런스를 다시 등록하면 바뀜)
+            params: 결과에 영향을 주는 파라미터 (song_id, user_id, generate_feedback 등)
+        """
+        digest = hashlib.sha256(audio_bytes).hexdigest()
+        identity = json.dumps({"kind": kind, "audio": digest, "reference": reference_version,
+                               "pipeline": self.pipeline_version, "params": params}, sort_keys=True, default=str)
+        return f"{CACHE_KEY_PREFIX}{hashlib.sha256(identity.encode()).hexdigest()}"
+
+    def lookup(self, key: Optional[str], get_state: Callable[[str], str]) -> Optional[Tuple[str, str]]:
+        """같은 키의 기존 작업 조회
+
+        Args:
+            key: key()로 만든 캐시 키 (None이면 캐시 사용 안 함)
+            get_state: 작업 ID로 Celery 작업 상태를 조회하는 함수
+
+        Returns:
+            (작업 ID, 작업 상태) 또는 캐시에 없거나 실패/취소된 작업이면 None
+        """
+        if not self.enabled or key is None:
+            return None
+        try:
+            task_id = self._get_redis().get(key)
+            if task_id is None:
+                return None
+            task_id = task_id.decode()
+            state = get_state(task_id)
+            if state in _RERUN_STATES:
+                return None
+            logger.info(f"결과 캐시 적중: 기존 작업 {task_id} ({state})에 연결")
+            return task_id, state
+        except Exception as e:
+            logger.warning(f"결과 캐시 조회 실패 (캐시 없이 실행): {e}")
+            return None
+
+    def store(self, key: Optional[str], task_id: str):
+        """새로 제출한 작업 ID를 캐시에 저장 (TTL 후 자동 삭제)"""
+        if not self.enabled or key is None:
+            return
+        try:
+            pipe = self._get_redis().pipeline()
+            pipe.set(key, task_id, ex=self.ttl)
+            pipe.set(f"{TASK_KEY_PREFIX}{task_id}", key, ex=self.ttl)
+            pipe.execute()
+        except Exception as e:
+            logger.warning(f"결과 캐시 저장 실패: {e}")
+
+    def evict(self, task_id: str) -> bool:
+        """작업 ID를 가리키는 캐시 항목 삭제 (작업 취소 등으로 결과를 재사용하면 안 될 때)
+
+        Returns:
+            캐시 항목을 삭제했으면 True
+        """
+        if not self.enabled:
+            return False
+        try:
+            client = self._get_redis()
+            key = client.get(f"{TASK_KEY_PREFIX}{task_id}")
+            client.delete(f"{TASK_KEY_PREFIX}{task_id}")
+            # 같은 키로 더 나중에 제출된 작업이 있으면 그 항목은 유지
+            if key is None or client.get(key) != task_id.encode():
+                return False
+            return client.delete(key) > 0
+        except Exception as e:
+            logger.warning(f"결과 캐시 항목 삭제 실패: {e}")
+            return False
+
+
+# API 게이트웨이에서 공유하는 결과 캐시
+result_cache = ResultCache()
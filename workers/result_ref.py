@@ -0,0 +1,43 @@
+"""Celery 결과 백엔드에 저장할 태스크 반환값
+
+분석/비교/레퍼런스 결과는 어차피 MongoDB에 저장되므로, TASK_RESULT_MODE=reference이면 태스크는 전체 결과 대신
+작은 요약과 MongoDB 문서 참조만 반환합니다. Redis 결과 백엔드 메모리와 상태 조회 시 역직렬화 비용이 줄어들고,
+게이트웨이는 전체 결과가 필요할 때만 MongoDB에서 읽습니다.
+"""
+import os
+from typing import Any, Dict, Optional
+
+# 태스크 반환값 방식
+# - full: 전체 결과 반환 (기존 방식)
+# - reference: 요약 + MongoDB 문서 참조만 반환
+TASK_RESULT_MODE = os.environ.get("TASK_RESULT_MODE", "full").lower()
+
+# 참조 모드에서도 반환값에 남길 작은 필드
+RESULT_SUMMARY_KEYS = ("tempo", "number_of_notes", "duration", "scores", "song_id", "has_midi", "feedback_error",
+                       "degraded", "degradations")
+
+
+def task_result(result: Dict[str, Any], result_type: str, document_id: Optional[str],
+                mode: Optional[str] = None, **ref_fields) -> Dict[str, Any]:
+    """MongoDB에 저장한 결과로 태스크 반환값 생성
+
+    Args:
+        result: 전체 결과
+        result_type: 결과 종류 (analysis, comparison, reference)
+        document_id: 저장된 MongoDB 문서 ID
+        mode: 반환값 방식 (기본값: TASK_RESULT_MODE)
+        ref_fields: 참조에 함께 담을 조회 키 (예: song_id)
+
+    Returns:
+        full 모드이면 result 그대로, reference 모드이면 요약과 result_ref를 담은 딕셔너리
+    """
+    if (mode or TASK_RESULT_MODE) != "reference" or not document_id:
+        return result
+    summary = {key: result[key] for key in RESULT_SUMMARY_KEYS if key in result}
+    summary["result_ref"] = {"type": result_type, "document_id": document_id, **ref_fields}
+    return summary
+
+
+def is_result_ref(value: Any) -> bool:
+    """task_result가 만든 참조 반환값인지 확인"""
+    return isinstance(value, dict) and isinstance(value.get("result_ref"), dict)
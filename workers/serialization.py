@@ -0,0 +1,102 @@
+"""NumPy 배열을 지원하는 msgpack 기반 Celery 직렬화기 (msgpack-numpy)
+
+JSON은 오디오 bytes를 효율적으로 표현하지 못하고 배열을 긴 10진수 리스트로 바꾸므로, 오디오와 배열을 주고받는
+큐에서는 이 직렬화기를 사용할 수 있습니다 (celeryconfig.QUEUE_SERIALIZERS).
+
+- bytes는 msgpack bin 타입으로 그대로 전송
+- ndarray는 확장 타입으로 (dtype, shape) 헤더와 원시 버퍼를 전송 (pickle 사용 안 함)
+- NumPy 스칼라는 Python 기본 타입으로 변환
+
+역직렬화 시 허용된 확장 타입만 받고, object dtype 배열과 헤더와 크기가 맞지 않는 버퍼는 거부합니다.
+역직렬화한 배열은 메시지 버퍼를 복사하지 않고 가리키므로 읽기 전용입니다.
+
+numpy와 msgpack은 실제로 직렬화할 때만 import하므로 게이트웨이 시작 시간에는 영향이 없습니다.
+"""
+import logging
+from typing import Any
+
+# 로깅 설정
+logger = logging.getLogger(__name__)
+
+SERIALIZER_NAME = "msgpack-numpy"
+CONTENT_TYPE = "application/x-msgpack-numpy"
+
+# msgpack 확장 타입 코드
+EXT_NDARRAY = 1
+
+
+def _pack_ndarray(array) -> bytes:
+    import msgpack
+    import numpy as np
+
+    if array.dtype.hasobject:
+        raise TypeError(f"object dtype 배열은 직렬화할 수 없습니다: {array.dtype}")
+    array = np.ascontiguousarray(array)
+    header = msgpack.packb([array.dtype.str, list(array.shape)])
+    return header + array.tobytes()
+
+
+def _unpack_ndarray(data: bytes):
+    import msgpack
+    import numpy as np
+
+    unpacker = msgpack.Unpacker(raw=False, max_buffer_size=len(data))
+    unpacker.feed(data)
+    descr, shape = unpacker.unpack()
+    offset = unpacker.tell()
+    dtype = np.dtype(descr)
+    if dtype.hasobject:
+        raise ValueError(f"object dtype 배열은 역직렬화할 수 없습니다: {descr}")
+    if not isinstance(shape, list) or not all(isinstance(dim, int) and dim >= 0 for dim in shape):
+        raise ValueError(f"잘못된 배열 shape: {shape}")
+    count = 1
+    for dim in shape:
+        count *= dim
+    if len(data) - offset != count * dtype.itemsize:
+        raise ValueError(f"배열 버퍼 크기가 헤더와 맞지 않음: {len(data) - offset} != {count * dtype.itemsize}")
+    return np.frombuffer(data, dtype=dtype, count=count, offset=offset).reshape(shape)
+
+
+def _default(obj: Any) -> Any:
+    """msgpack이 기본으로 지원하지 않는 타입 변환"""
+    import msgpack
+    import numpy as np
+
+    if isinstance(obj, np.ndarray):
+        return msgpack.ExtType(EXT_NDARRAY, _pack_ndarray(obj))
+    if isinstance(obj, np.generic):
+        return obj.item()
+    raise TypeError(f"{SERIALIZER_NAME}로 직렬화할 수 없는 타입: {type(obj)!r}")
+
+
+def _ext_hook(code: int, data: bytes) -> Any:
+    if code == EXT_NDARRAY:
+        return _unpack_ndarray(data)
+    raise ValueError(f"알 수 없는 msgpack 확장 타입: {code}")
+
+
+def dumps(obj: Any) -> bytes:
+    """객체를 msgpack-numpy 바이트로 직렬화"""
+    import msgpack
+    return msgpack.packb(obj, default=_default, use_bin_type=True)
+
+
+def loads(data: bytes) -> Any:
+    """msgpack-numpy 바이트를 객체로 역직렬화"""
+    import msgpack
+    return msgpack.unpackb(data, ext_hook=_ext_hook, raw=False)
+
+
+def register_msgpack_numpy() -> bool:
+    """kombu 직렬화기 레지스트리에 msgpack-numpy 등록 (Celery 앱 설정을 읽기 전에 호출)
+
+    Returns:
+        등록했으면 True, kombu가 없으면 False
+    """
+    try:
+        from kombu.serialization import register
+    except ImportError:
+        logger.warning(f"kombu가 없어 {SERIALIZER_NAME} 직렬화기를 등록하지 않음")
+        return False
+    register(SERIALIZER_NAME, dumps, loads, content_type=CONTENT_TYPE, content_encoding="binary")
+    return True
@@ -0,0 +1,41 @@
+"""API 게이트웨이용 가벼운 태스크 시그니처
+
+게이트웨이는 태스크를 실행하지 않고 큐에 넣기만 하므로, workers.tasks(그리고 workers.dsp가 가져오는
+TensorFlow, librosa, crepe 등)를 import하지 않고 태스크 이름으로 전송합니다.
+태스크 구현과 무거운 의존성은 워커 프로세스에서만 로드됩니다.
+"""
+from typing import Any, Dict, Optional
+
+from workers.celery_app import celery_app
+
+
+class TaskSignature:
+    """이름으로 태스크를 전송하는 가벼운 프록시 (Celery 태스크의 delay/apply_async/AsyncResult와 같은 사용법)"""
+
+    def __init__(self, name: str):
+        self.name = name
+
+    def apply_async(self, args: Optional[tuple] = None, kwargs: Optional[Dict[str, Any]] = None, **options):
+        """태스크 이름으로 전송 (큐 라우팅은 celeryconfig.task_routes를 따름)"""
+        return celery_app.send_task(self.name, args=args, kwargs=kwargs, **options)
+
+    def delay(self, *args, **kwargs):
+        return self.apply_async(args=args, kwargs=kwargs)
+
+    def AsyncResult(self, task_id: str):
+        return celery_app.AsyncResult(task_id)
+
+    def __repr__(self):
+        return f"<TaskSignature {self.name}>"
+
+
+def revoke_task(task_id: str):
+    """큐에서 기다리는 작업 취소: 워커가 메시지를 받으면 실행하지 않고 버리며, 상태는 바로 REVOKED로 기록"""
+    celery_app.control.revoke(task_id)
+    celery_app.backend.mark_as_revoked(task_id, reason="cancelled by client")
+
+
+# workers.tasks의 태스크 이름과 일치해야 합니다
+analyze_audio = TaskSignature('workers.tasks.analyze_audio')
+compare_audio = TaskSignature('workers.tasks.compare_audio')
+analyze_reference_audio = TaskSignature('workers.tasks.analyze_reference_audio')
@@ -0,0 +1,92 @@
+import os
+import time
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from typing import Any, Callable, Dict, Optional, Sequence, Tuple
+
+# 로깅 설정
+logger = logging.getLogger(__name__)
+
+# 한 태스크 안에서 서로 독립적인 DSP 단계를 동시에 실행할 스레드 수 (1이면 순서대로 실행)
+# NumPy/TensorFlow 연산과 GPU 서버 응답 대기는 GIL을 풀기 때문에 스레드로도 겹쳐 실행됩니다
+STAGE_CONCURRENCY = int(os.environ.get("STAGE_CONCURRENCY", 1))
+
+
+class StageGraph:
+    """의존 관계가 있는 단계들을 실행하는 작은 DAG 실행기
+
+    각 단계 함수는 의존 단계의 결과를 선언한 순서대로 인자로 받습니다.
+    max_workers가 1이면 추가한 순서대로 현재 스레드에서 실행하고, 2 이상이면 의존 단계가 끝난
+    단계부터 스레드 풀에서 동시에 실행합니다. 어느 단계든 예외(TaskCancelled 포함)가 나면 stop_event를
+    설정하고 시작하지 않은 단계를 취소한 뒤, 실행 중인 단계를 기다리지 않고 예외를 다시 발생시킵니다.
+    오래 걸리는 단계는 stop_event를 확인해 스스로 중단해야 워커 스레드를 바로 반환합니다.
+
+    예:
+        graph = StageGraph()
+        graph.add("tempo", lambda: extract_tempo(y, sr))
+        graph.add("onsets", lambda: extract_onsets(y, sr))
+        graph.add("rhythm", score_rhythm, deps=("tempo", "onsets"))
+        results = graph.run()
+    """
+
+    def __init__(self, name: str = "stages", stop_event: Optional[threading.Event] = None):
+        self.name = name
+        # 단계가 실패하면 설정되는 이벤트 (헤징 취소 이벤트 등 기존 이벤트를 함께 쓸 수 있음)
+        self.stop_event = stop_event if stop_event is not None else threading.Event()
+        self._stages: Dict[str, Tuple[Callable[..., Any], Tuple[str, ...]]] = {}
+        self.timings: Dict[str, float] = {}
+
+    def add(self, name: str, fn: Callable[..., Any], deps: Sequence[str] = ()) -> "StageGraph":
+        """단계 추가 (의존 단계는 먼저 추가되어 있어야 함)"""
+        if name in self._stages:
+            raise ValueError(f"이미 추가된 단계: {name}")
+        missing = [dep for dep in deps if dep not in self._stages]
+        if missing:
+            raise ValueError(f"단계 {name}의 의존 단계가 없음: {missing}")
+        self._stages[name] = (fn, tuple(deps))
+        return self
+
+    def _run_stage(self, name: str, results: Dict[str, Any]) -> Any:
+        fn, deps = self._stages[name]
+        start_time = time.time()
+        try:
+            return fn(*[results[dep] for dep in deps])
+        finally:
+            self.timings[name] = time.time() - start_time
+
+    def run(self, max_workers: Optional[int] = None) -> Dict[str, Any]:
+        """모든 단계를 실행하고 단계 이름 -> 결과 딕셔너리 반환 (단계별 소요 시간은 timings에 기록)"""
+        max_workers = STAGE_CONCURRENCY if max_workers is None else max_workers
+        results: Dict[str, Any] = {}
+        start_time = time.time()
+
+        if max_workers <= 1:
+            for name in self._stages:
+                results[name] = self._run_stage(name, results)
+        else:
+            executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=self.name)
+            try:
+                pending = dict(self._stages)
+                running = {}
+                while pending or running:
+                    for name, (_, deps) in list(pending.items()):
+                        if all(dep in results for dep in deps):
+                            running[executor.submit(self._run_stage, name, results)] = name
+                            del pending[name]
+                    done, _ = wait(running, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        name = running.pop(future)
+                        results[name] = future.result()
+            except BaseException:
+                # 실행 중인 단계에 중단을 알리고, 끝날 때까지 기다리지 않고 예외 전달 (취소된 태스크가 슬롯을 바로 반환)
+                self.stop_event.set()
+                executor.shutdown(wait=False, cancel_futures=True)
+                raise
+            executor.shutdown()
+
+        total = time.time() - start_time
+        summary = ", ".join(f"{name}={elapsed:.2f}s" for name, elapsed in self.timings.items())
+        logger.info(f"{self.name} 단계 실행 완료 (동시 실행 {max(1, max_workers)}): 전체 {total:.2f}초, {summary}")
+        self.timings["total"] = total
+        return results
@@ -0,0 +1,107 @@
+"""태스크 진행 이벤트 Redis pub/sub 채널
+
+워커는 진행률을 기록할 때와 태스크가 끝날 때 태스크별 채널(task-events:<task_id>)에 이벤트를 발행하고,
+게이트웨이는 채널을 구독하여 클라이언트에 SSE로 전달합니다. 이벤트는 GET /v1/tasks/{task_id} 응답과 같은
+형태(task_id, status, progress, result, error)의 JSON입니다.
+
+pub/sub은 구독 전에 발행된 메시지를 보관하지 않으므로, 구독자는 먼저 구독한 다음 현재 상태를 한 번 조회해
+첫 이벤트로 보냅니다.
+"""
+import os
+import json
+import time
+import logging
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Optional
+
+# 로깅 설정
+logger = logging.getLogger(__name__)
+
+# 진행 이벤트 발행 여부와 Redis 주소 (기본값: Celery 결과 백엔드와 같은 Redis)
+TASK_EVENTS_ENABLED = os.environ.get("TASK_EVENTS_ENABLED", "true").lower() == "true"
+TASK_EVENTS_REDIS_URL = os.environ.get(
+    "TASK_EVENTS_REDIS_URL", os.environ.get("CELERY_RESULT_BACKEND", "redis://redis:6379/1")
+)
+# 이벤트가 없을 때 연결 유지용 주석을 보내는 간격 (초)
+TASK_EVENTS_KEEPALIVE = float(os.environ.get("TASK_EVENTS_KEEPALIVE", 15))
+# 이벤트 스트림 하나를 유지하는 최대 시간 (초, 기본값: Celery task_time_limit보다 조금 길게)
+TASK_EVENTS_STREAM_TIMEOUT = float(os.environ.get("TASK_EVENTS_STREAM_TIMEOUT", 660))
+
+# 더 이상 이벤트가 오지 않는 상태
+FINAL_STATES = frozenset({"SUCCESS", "FAILURE", "REVOKED"})
+
+_redis = None
+_async_redis = None
+
+
+def task_channel(task_id: str) -> str:
+    """태스크 이벤트 채널 이름"""
+    return f"task-events:{task_id}"
+
+
+def _get_redis():
+    global _redis
+    if _redis is None:
+        import redis
+        _redis = redis.Redis.from_url(TASK_EVENTS_REDIS_URL, socket_timeout=5, socket_connect_timeout=2)
+    return _redis
+
+
+def publish_task_event(task_id: Optional[str], event: Dict[str, Any]) -> bool:
+    """태스크 이벤트 발행 (실패해도 태스크는 계속 진행하도록 경고만 남김)
+
+    Args:
+        task_id: 태스크 ID (없으면 발행하지 않음)
+        event: status, progress 등을 담은 이벤트
+
+    Returns:
+        발행했으면 True
+    """
+    if not TASK_EVENTS_ENABLED or not task_id:
+        return False
+    try:
+        payload = json.dumps({"task_id": task_id, **event}, default=str)
+        _get_redis().publish(task_channel(task_id), payload)
+        return True
+    except Exception as e:
+        logger.warning(f"태스크 이벤트 발행 실패 ({task_id}): {e}")
+        return False
+
+
+def _get_async_redis():
+    global _async_redis
+    if _async_redis is None:
+        import redis.asyncio as aioredis
+        _async_redis = aioredis.Redis.from_url(TASK_EVENTS_REDIS_URL, socket_connect_timeout=2)
+    return _async_redis
+
+
+async def stream_task_events(task_id: str, snapshot: Callable[[], Awaitable[Dict[str, Any]]],
+                             keepalive: float = TASK_EVENTS_KEEPALIVE,
+                             timeout: float = TASK_EVENTS_STREAM_TIMEOUT) -> AsyncIterator[Optional[Dict[str, Any]]]:
+    """태스크 채널을 구독하고 이벤트를 차례로 반환하는 비동기 제너레이터
+
+    Args:
+        task_id: 태스크 ID
+        snapshot: 구독 직후 현재 상태를 조회하는 코루틴 함수 (첫 이벤트로 반환, 동기 I/O는 스레드풀에서 실행할 것)
+        keepalive: 이 시간 동안 이벤트가 없으면 None 반환 (연결 유지용)
+        timeout: 스트림 최대 유지 시간
+
+    Returns:
+        이벤트 딕셔너리 또는 None(연결 유지)을 반환하며, 최종 상태 이벤트를 반환한 뒤 끝남
+    """
+    pubsub = _get_async_redis().pubsub()
+    await pubsub.subscribe(task_channel(task_id))
+    try:
+        event = await snapshot()
+        yield event
+        deadline = time.monotonic() + timeout
+        while event.get("status") not in FINAL_STATES and time.monotonic() < deadline:
+            message = await pubsub.get_message(ignore_subscribe_messages=True, timeout=keepalive)
+            if message is None:
+                yield None
+                continue
+            event = json.loads(message["data"])
+            yield event
+    finally:
+        await pubsub.unsubscribe()
+        await pubsub.reset()
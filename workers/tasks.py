@@ -1,8 +1,11 @@
 import os
+import time
+import functools
 import tempfile
 import numpy as np
 import scipy.signal  # SciPy 패치를 위해 추가
-from celery import Celery
+from celery import chord, group, signals, states
+from celery.exceptions import Ignore
 from celery.utils.log import get_task_logger
 import json
 from datetime import datetime
@@ -18,21 +21,161 @@ from workers.dsp import analyze_simple, compare_audio_with_reference
 from workers.dsp import (
     load_audio_from_bytes, load_midi_from_bytes, 
     extract_tempo, extract_onsets, extract_pitch_with_crepe, extract_pitch_with_pyin,
-    predict_techniques, align_audio_with_dtw, align_audio_with_chromas, segment_audio_with_midi_notes,
-    extract_chroma
+    predict_techniques, analyze_segments, align_audio_with_dtw, align_audio_with_chromas, segment_audio_with_midi_notes,
+    extract_chroma, estimate_inference_seconds
 )
 # 피드백 생성기 추가
 from workers.feedback import GrokFeedbackGenerator
 # MongoDB 저장 기능 추가
+from app.db import close_client as close_db_client
 from app.db import save_analysis_result, save_comparison_result, save_feedback, save_reference_features, get_reference_features
 
-# Initialize Celery app
-celery_app = Celery('maple_audio_analyzer')
-celery_app.config_from_object('celeryconfig')
+# Celery 앱은 게이트웨이와 공유하는 가벼운 모듈에서 가져옴
+from workers.celery_app import celery_app
+from workers.gpu_client import gpu_client
+from workers.blob_store import blob_store
+from workers.stages import StageGraph
+from workers.progress import ProgressReporter
+from workers.task_events import publish_task_event
+from workers.result_ref import task_result
+from workers.preload import WORKER_PRELOAD_MODELS, preload_models, verify_after_fork
+from workers.admission import queue_admission
+from workers.cancellation import TaskCancelled, task_cancellation
+from workers.budget import (
+    TaskBudget, mark_degraded,
+    TASK_BUDGET_DTW_SECONDS_PER_FRAME, DEGRADED_DTW_DOWNSAMPLE, DEGRADED_CREPE_CAPACITY
+)
+from celeryconfig import PRIORITY_INTERACTIVE
 logger = get_task_logger(__name__)
 
+# compare_audio 실행 방식
+# - serial: 한 태스크에서 모든 단계를 순서대로 처리
+# - canvas: 음정/기법/템포 단계를 병렬 서브태스크(chord)로 나누어 여러 워커에서 처리
+COMPARE_PIPELINE_MODE = os.environ.get("COMPARE_PIPELINE_MODE", "serial").lower()
+
+# 피드백 생성을 요청한 작업의 피드백 생성/결과 저장을 feedback 큐 워커로 넘길지 여부
+# LLM API 응답을 기다리는 동안 interactive 워커 슬롯이 다음 분석/비교를 처리할 수 있습니다
+FEEDBACK_QUEUE_OFFLOAD = os.environ.get("FEEDBACK_QUEUE_OFFLOAD", "true").lower() == "true"
+
+
+def _offload_feedback(generate_feedback):
+    return bool(generate_feedback) and FEEDBACK_QUEUE_OFFLOAD
+
+
+def _persist_options(generate_feedback):
+    """저장 단계 서브태스크 전송 옵션 (피드백을 feedback 큐로 넘기지 않으면 interactive 큐에서 바로 저장)"""
+    if _offload_feedback(generate_feedback):
+        return {}  # celeryconfig.task_routes의 feedback 큐
+    return {'queue': 'interactive', 'priority': PRIORITY_INTERACTIVE}
+
+
+@signals.worker_init.connect
+def init_worker(**kwargs):
+    """워커 부모 프로세스 시작 시 (자식 프로세스 포크 전) 모델 프리로드"""
+    if WORKER_PRELOAD_MODELS:
+        preload_models()
+
+
+@signals.worker_process_init.connect
+def init_worker_process(**kwargs):
+    """prefork 자식 프로세스 시작 시 부모에게서 물려받은 연결 상태를 버림 (MongoDB/GPU는 처음 사용할 때 연결)"""
+    close_db_client()
+    gpu_client.reset()
+    # 프리로드한 모델이 포크 후에도 사용 가능한지 확인 (실패하면 이 프로세스에서 다시 로드)
+    verify_after_fork()
+
+
+@signals.worker_process_shutdown.connect
+def shutdown_worker_process(**kwargs):
+    """워커 프로세스 종료 시 MongoDB 연결 정리"""
+    close_db_client()
+
+
+# 태스크 ID -> 시작 시각 (처리 시간 기록용, 프로세스별)
+_task_started = {}
+
+# 게이트웨이가 큐에 넣는 최상위 태스크 (예상 대기 시간은 클라이언트 제출 단위로 계산)
+_ADMITTED_TASK_NAMES = frozenset({
+    'workers.tasks.analyze_audio',
+    'workers.tasks.compare_audio',
+    'workers.tasks.analyze_reference_audio',
+})
+
+
+def _is_admitted(name, request):
+    """게이트웨이가 제출한 최상위 태스크인지 여부 (캔버스/replace로 이어지는 단계는 parent_id가 있음)"""
+    return name in _ADMITTED_TASK_NAMES and not getattr(request, 'parent_id', None)
+
+
+def _routing_key(request):
+    return (getattr(request, 'delivery_info', None) or {}).get('routing_key')
+
+
+@signals.task_prerun.connect
+def record_task_start(task_id=None, task=None, **kwargs):
+    _task_started[task_id] = time.monotonic()
+    if task is not None and _is_admitted(task.name, task.request):
+        queue_admission.task_dequeued(_routing_key(task.request))
+
+
+@signals.task_revoked.connect
+def record_task_revoked(request=None, terminated=False, **kwargs):
+    """실행 전에 취소된 최상위 작업을 대기 작업 수에서 제외"""
+    if request is not None and not terminated and _is_admitted(request.name, request):
+        queue_admission.task_dequeued(_routing_key(request))
+
+
+@signals.task_postrun.connect
+def record_task_duration(task_id=None, task=None, state=None, **kwargs):
+    """작업별 처리 시간 기록 (게이트웨이의 예상 대기 시간 계산에 사용)
+
+    캔버스 서브태스크와 replace()로 이어지는 단계는 최상위 태스크의 작업 시간에 더하고,
+    원래 태스크 ID로 실행된 최종 태스크가 끝나면 합계를 큐의 평균 처리 시간에 반영합니다.
+    replace()된 태스크와 취소된 태스크는 IGNORED로 끝나므로 작업을 마무리하지 않습니다.
+    """
+    started = _task_started.pop(task_id, None)
+    if started is None or task is None:
+        return
+    job_id = getattr(task.request, 'root_id', None) or task_id
+    queue_admission.add_job_time(job_id, _routing_key(task.request), time.monotonic() - started)
+    if task_id == job_id and state != states.IGNORED:
+        queue_admission.finish_job(job_id)
+
+
+@signals.task_success.connect
+def publish_task_success(sender=None, result=None, **kwargs):
+    """태스크 성공 시 최종 결과를 이벤트 채널로 푸시 (캔버스 마지막 단계는 원래 compare_audio 태스크 ID로 실행됨)"""
+    publish_task_event(sender.request.id, {'status': 'SUCCESS', 'progress': 100, 'result': result})
+
+
+@signals.task_failure.connect
+def publish_task_failure(task_id=None, exception=None, **kwargs):
+    """태스크 실패 시 오류를 이벤트 채널로 푸시"""
+    publish_task_event(task_id, {'status': 'FAILURE', 'progress': 0, 'error': str(exception)})
+
+
+def _mark_cancelled(task, task_id):
+    """취소된 작업을 REVOKED로 기록하고 결과 저장 없이 종료 (Ignore로 Celery가 상태를 덮어쓰지 않게 함)"""
+    logger.info(f"작업 취소됨 {task_id}: 남은 단계를 건너뛰고 워커 슬롯을 반환합니다")
+    task.update_state(task_id=task_id, state='REVOKED', meta={'progress': 0})
+    publish_task_event(task_id, {'status': 'REVOKED', 'progress': 0})
+    task_cancellation.clear(task_id)
+    raise Ignore()
+
+
+def _cancellable(func):
+    """진행률 보고 중 취소 요청을 확인해 중단된(TaskCancelled) 태스크를 REVOKED로 마무리하는 데코레이터"""
+    @functools.wraps(func)
+    def wrapper(self, *args, **kwargs):
+        try:
+            return func(self, *args, **kwargs)
+        except TaskCancelled as e:
+            _mark_cancelled(self, e.task_id)
+    return wrapper
+
 
 @celery_app.task(bind=True, name='workers.tasks.analyze_audio')
+@_cancellable
 def analyze_audio(self, audio_bytes, request_dict=None):
     """
     Celery task to analyze audio content.
@@ -45,11 +188,13 @@ def analyze_audio(self, audio_bytes, request_dict=None):
     - Dictionary with analysis results
     """
     logger.info(f"Starting audio analysis task {self.request.id}")
-    self.update_state(state='STARTED', meta={'progress': 0})
+    # 진행률은 실제로 시간이 걸리는 단계 기준으로 보고하고, Redis 쓰기는 디바운스
+    progress = ProgressReporter(self)
+    progress.update(0, 'STARTED')
+    # 남은 시간이 부족하면 기법 예측을 건너뛰고 결과를 degraded로 표시
+    budget = TaskBudget()
     
     try:
-        # Process the request dictionary if provided (5%)
-        self.update_state(state='PROCESSING', meta={'progress': 5})
         if request_dict is None:
             request_dict = {}
         
@@ -58,32 +203,20 @@ def analyze_audio(self, audio_bytes, request_dict=None):
         song_id = request_dict.get('song_id')
         generate_feedback = request_dict.get('generate_feedback', False)
         
-        # 오디오 로드 (10%)
-        self.update_state(state='PROCESSING', meta={'progress': 10})
+        # 오디오 로드 (5% -> 10%)
+        progress.update(5)
         y, sr = load_audio_from_bytes(audio_bytes)
+        progress.update(10)
         
-        # 오디오 초기 처리 (15%)
-        self.update_state(state='PROCESSING', meta={'progress': 15})
-        
-        # 템포 추출 (20%)
-        self.update_state(state='PROCESSING', meta={'progress': 20})
+        # 템포 추출 (-> 25%)
         tempo = extract_tempo(y, sr)
+        progress.update(25)
         
-        # 템포 분석 후처리 (25%)
-        self.update_state(state='PROCESSING', meta={'progress': 25})
-        
-        # 노트 시작점 전처리 (30%)
-        self.update_state(state='PROCESSING', meta={'progress': 30})
-        
-        # 노트 시작점 추출 (40%)
-        self.update_state(state='PROCESSING', meta={'progress': 40})
+        # 노트 시작점 추출 (-> 35%)
         onsets = extract_onsets(y, sr)
+        progress.update(35)
         
-        # 노트 시작점 후처리 (45%)
-        self.update_state(state='PROCESSING', meta={'progress': 45})
-        
-        # 세그먼트 생성 (50%)
-        self.update_state(state='PROCESSING', meta={'progress': 50})
+        # 세그먼트 생성 (40%)
         segments = []
         for i in range(len(onsets) - 1):
             start = int(onsets[i] * sr)
@@ -93,34 +226,20 @@ def analyze_audio(self, audio_bytes, request_dict=None):
         if onsets:
             start = int(onsets[-1] * sr)
             segments.append(y[start:])
+        progress.update(40)
         
-        # 세그먼트 후처리 (55%)
-        self.update_state(state='PROCESSING', meta={'progress': 55})
-        
-        # 기법 예측 준비 (60%)
-        self.update_state(state='PROCESSING', meta={'progress': 60})
+        # 기법 예측 (40% -> 90%, 세그먼트/배치 단위로 보고)
         model_path = os.path.join(os.environ.get('MODEL_DIR', 'models'), 'guitar_technique_classifier.keras')
         techniques = []
-        
-        # 기법 예측 진행 (65%)
-        self.update_state(state='PROCESSING', meta={'progress': 65})
-        
-        # 기법 예측 (70%)
-        self.update_state(state='PROCESSING', meta={'progress': 70})
         if os.path.exists(model_path):
-            techniques = predict_techniques(segments, model_path, sr)
-        
-        # 기법 예측 후처리 (75%)
-        self.update_state(state='PROCESSING', meta={'progress': 75})
-        
-        # 결과 준비 (80%)
-        self.update_state(state='PROCESSING', meta={'progress': 80})
-        
-        # 결과 생성 (85%)
-        self.update_state(state='PROCESSING', meta={'progress': 85})
+            estimated = estimate_inference_seconds("techniques", segments)
+            if budget.allows(estimated):
+                techniques = predict_techniques(segments, model_path, sr, progress.range(40, 90))
+            else:
+                budget.degrade("techniques", "skipped", estimated)
         
         # 결과 생성 및 마무리 (90%)
-        self.update_state(state='FINALIZING', meta={'progress': 90})
+        progress.update(90, 'FINALIZING')
         result = {
             "tempo": tempo,
             "onsets": onsets,
@@ -130,89 +249,98 @@ def analyze_audio(self, audio_bytes, request_dict=None):
             "created_at": datetime.utcnow().isoformat()
         }
         
-        # 메타데이터 추가 (92%)
-        self.update_state(state='FINALIZING', meta={'progress': 92})
+        # 메타데이터 추가
         result['metadata'] = {
             'user_id': user_id,
             'song_id': song_id,
             'analysis_type': analysis_type,
             'task_id': self.request.id
         }
+        mark_degraded(result, budget.degradations)
 
-        # 피드백 생성 옵션이 활성화된 경우
-        if generate_feedback:
-            self.update_state(state='FINALIZING', meta={'progress': 95})
-            logger.info(f"Generating feedback for analysis task {self.request.id}")
-            
-            try:
-                # GROK API를 사용하여 피드백 생성
-                feedback_generator = GrokFeedbackGenerator()
-                feedback_result = feedback_generator.generate_feedback(result, is_comparison=False)
-                
-                # 피드백이 성공적으로 생성된 경우 결과에 추가
-                if 'feedback' in feedback_result:
-                    result['feedback'] = feedback_result['feedback']
-                    result['feedback_metadata'] = feedback_result.get('metadata', {})
-                    
-                    # 피드백을 MongoDB에 저장
-                    feedback_result['created_at'] = datetime.utcnow().isoformat()
-                    save_feedback(self.request.id, feedback_result)
-                # 오류가 발생한 경우 오류 메시지 추가
-                elif 'error' in feedback_result:
-                    result['feedback_error'] = feedback_result['error']
-            except Exception as e:
-                logger.exception(f"Error generating feedback: {str(e)}")
-                result['feedback_error'] = f"피드백 생성 중 오류 발생: {str(e)}"
-        
-        # MongoDB에 결과 저장 (97%)
-        self.update_state(state='FINALIZING', meta={'progress': 97})
-        logger.info(f"Saving analysis results to MongoDB for task {self.request.id}")
-        save_analysis_result(self.request.id, result)
-        
-        # 완료 (99%)
-        self.update_state(state='FINALIZING', meta={'progress': 99})
-        logger.info(f"Audio analysis task {self.request.id} completed successfully")
-        # 100% 완료는 Celery에서 자동으로 처리됩니다
-        return result
+        if not _offload_feedback(generate_feedback):
+            return _finalize_analysis(progress, self.request.id, result, generate_feedback)
         
     except Exception as e:
         logger.exception(f"Error in audio analysis task: {str(e)}")
         raise
+    
+    # 피드백 생성과 저장은 feedback 큐에서 같은 태스크 ID로 이어서 처리
+    progress.flush()
+    return self.replace(analysis_persist_stage.s(result, self.request.id, generate_feedback))
 
 
-@celery_app.task(bind=True, name='workers.tasks.compare_audio')
-def compare_audio(self, user_audio_bytes, user_id=None, song_id=None, generate_feedback=False):
-    """
-    Celery task to compare user audio with reference audio and/or MIDI.
+def _finalize_analysis(progress, task_id, result, generate_feedback):
+    """분석 결과에 피드백을 추가하고 MongoDB에 저장 (95-99%)"""
+    # 피드백 생성 옵션이 활성화된 경우
+    if generate_feedback:
+        progress.update(95, 'FINALIZING', force=True)
+        logger.info(f"Generating feedback for analysis task {task_id}")
+        
+        try:
+            # GROK API를 사용하여 피드백 생성
+            feedback_generator = GrokFeedbackGenerator()
+            feedback_result = feedback_generator.generate_feedback(result, is_comparison=False)
+            
+            # 피드백이 성공적으로 생성된 경우 결과에 추가
+            if 'feedback' in feedback_result:
+                result['feedback'] = feedback_result['feedback']
+                result['feedback_metadata'] = feedback_result.get('metadata', {})
+                
+                # 피드백을 MongoDB에 저장
+                feedback_result['created_at'] = datetime.utcnow().isoformat()
+                save_feedback(task_id, feedback_result)
+            # 오류가 발생한 경우 오류 메시지 추가
+            elif 'error' in feedback_result:
+                result['feedback_error'] = feedback_result['error']
+        except Exception as e:
+            logger.exception(f"Error generating feedback: {str(e)}")
+            result['feedback_error'] = f"피드백 생성 중 오류 발생: {str(e)}"
     
-    Parameters:
-    - user_audio_bytes: Binary content of the user's audio recording
-    - reference_audio_bytes: Binary content of the reference audio (optional)
-    - midi_bytes: Binary content of the MIDI file (optional)
-    - user_id: ID of the user who uploaded the audio (optional)
-    - song_id: ID of the song being analyzed (optional)
-    - generate_feedback: Whether to generate textual feedback using GROK API
+    # MongoDB에 결과 저장 (97%)
+    progress.update(97, 'FINALIZING')
+    logger.info(f"Saving analysis results to MongoDB for task {task_id}")
+    doc_id = save_analysis_result(task_id, result)
     
+    # 완료 (99%)
+    progress.update(99, 'FINALIZING', force=True)
+    logger.info(f"Audio analysis task {task_id} completed successfully")
+    # 100% 완료는 Celery에서 자동으로 처리됩니다
+    # TASK_RESULT_MODE=reference이면 결과 백엔드에는 요약과 MongoDB 참조만 저장
+    return task_result(result, "analysis", doc_id)
+
+
+@celery_app.task(bind=True, name='workers.tasks.analysis_persist_stage')
+@_cancellable
+def analysis_persist_stage(self, result, task_id, generate_feedback=False):
+    """분석 마지막 단계: 피드백 생성과 MongoDB 저장 (feedback 큐, 원래 analyze_audio 태스크 ID로 실행됨)"""
+    # 큐에서 기다리는 동안 취소되었으면 피드백을 생성하지 않음
+    task_cancellation.checker(task_id)()
+    return _finalize_analysis(ProgressReporter(self, task_id=task_id), task_id, result, generate_feedback)
+
+
+def _technique_model_path():
+    return os.path.join(os.environ.get('MODEL_DIR', 'models'), 'guitar_technique_classifier.keras')
+
+
+def _prepare_comparison(progress, budget, user_audio_bytes, ref_features, song_id):
+    """비교 1-3단계: 오디오 로드, 크로마 정렬, 세그먼트 생성 (5-40%)
+
+    시간 예산이 부족하면 크로마 프레임을 건너뛰어 더 거칠게 정렬합니다.
+
     Returns:
-    - Dictionary with comparison results
+        user_y, sr, user_segments, user_timestamps, has_midi, midi_onsets를 담은 딕셔너리
     """
-    logger.info(f"Starting audio comparison task {self.request.id}")
-    ref_features = get_reference_features(song_id)
-    # logger.info(f"Reference features for song_id {song_id}: {ref_features}")
-    self.update_state(state='STARTED', meta={'progress': 5})
-    
-    # 참조 오디오와 비교
-    
     # 1. 오디오 로드 (10%)
-    self.update_state(state='PROCESSING', meta={'progress': 10})
+    progress.update(10)
     user_y, sr = load_audio_from_bytes(user_audio_bytes)
     # ref_y, _ = load_audio_from_bytes(reference_audio_bytes)
-    
+
     # 2. DTW를 사용한 오디오 정렬 (20%)
-    self.update_state(state='PROCESSING', meta={'progress': 20})
+    progress.update(20)
     # time_mapping = align_audio_with_dtw(user_y, ref_y, sr)
     user_chroma = extract_chroma(user_y, sr)
-    
+
     # ref_features에서 chroma 데이터 추출
     if 'features' in ref_features and 'chroma' in ref_features['features']:
         ref_chroma_data = ref_features['features']['chroma']
@@ -221,15 +349,20 @@ def compare_audio(self, user_audio_bytes, user_id=None, song_id=None, generate_f
     else:
         logger.error(f"Reference features for song_id {song_id} does not contain chroma data")
         raise ValueError(f"Reference features missing chroma data for song_id: {song_id}")
-        
-    time_mapping = align_audio_with_chromas(user_chroma, ref_chroma, sr)
-    
+
+    downsample = 1
+    estimated = (user_chroma.shape[1] + ref_chroma.shape[1]) * TASK_BUDGET_DTW_SECONDS_PER_FRAME
+    if not budget.allows(estimated):
+        downsample = DEGRADED_DTW_DOWNSAMPLE
+        budget.degrade("alignment", f"coarse_dtw_x{downsample}", estimated)
+    time_mapping = align_audio_with_chromas(user_chroma, ref_chroma, sr, downsample)
+
     # 3. MIDI 로드 및 세그먼트 생성 (30%)
-    self.update_state(state='PROCESSING', meta={'progress': 30})
+    progress.update(30)
     midi_data = None
     midi_onsets = None
     has_midi = False
-    
+
     if 'features' in ref_features and 'midi_data' in ref_features['features']:
         midi_data = ref_features['features']['midi_data']
         logger.info(f"MIDI 데이터 처리 시작: {midi_data}")
@@ -241,22 +374,21 @@ def compare_audio(self, user_audio_bytes, user_id=None, song_id=None, generate_f
             tempo_times = midi_data.get('tempo_times', [])
 
             logger.info(f"MIDI 데이터 처리 시작: {len(notes)} 개 노트, {len(tempos)} 개 템포, {len(tempo_times)} 개 템포 시간")
-            
-            self.update_state(state='PROCESSING', meta={'progress': 35})
+
+            progress.update(35)
             user_segments, user_timestamps = segment_audio_with_midi_notes(user_y, time_mapping, notes, sr)
-            self.update_state(state='PROCESSING', meta={'progress': 40})
-            
+            progress.update(40)
+
             # MIDI 오디오에서 발음 시작점 추출
             midi_onsets = [note['start'] for note in notes]
     else:
         # MIDI 없이 발음 시작점 기반 세그먼트 생성
-        self.update_state(state='PROCESSING', meta={'progress': 35})
+        progress.update(35)
         user_onsets = extract_onsets(user_y, sr)
         logger.info(f"발음 시작점 추출 완료: {len(user_onsets)} 개")
-        ref_onsets = ref_features['features']['onsets']
-        
+
         # 세그먼트 생성
-        self.update_state(state='PROCESSING', meta={'progress': 40})
+        progress.update(40)
         user_segments = []
         for i in range(len(user_onsets) - 1):
             start = int(user_onsets[i] * sr)
@@ -265,112 +397,111 @@ def compare_audio(self, user_audio_bytes, user_id=None, song_id=None, generate_f
         if user_onsets:
             start = int(user_onsets[-1] * sr)
             user_segments.append(user_y[start:])
-        
+
         user_timestamps = user_onsets
-    
-    # 4. 템포 추출 (45%)
-    self.update_state(state='PROCESSING', meta={'progress': 45})
-    user_tempo = extract_tempo(user_y, sr)
-    # ref_tempo = extract_tempo(ref_y, sr)
+
+    return {
+        "user_y": user_y,
+        "sr": sr,
+        "user_segments": user_segments,
+        "user_timestamps": user_timestamps,
+        "has_midi": has_midi,
+        "midi_onsets": midi_onsets,
+    }
+
+
+def _score_comparison(progress, ref_features, has_midi, midi_onsets, user_tempo, user_onsets, user_pitches,
+                      user_techniques, model_path, techniques_skipped=False):
+    """비교 7-9단계: 레퍼런스 특성과 비교하여 점수 계산 (80-90%)
+
+    시간 예산 부족으로 기법 예측을 건너뛰었으면(techniques_skipped) 종합 점수에서 기법 점수를 제외합니다.
+
+    Returns:
+        메타데이터를 제외한 비교 결과 딕셔너리
+    """
     ref_tempo = ref_features['features']['tempo']
-    
-    # 5. 음정 추출 (50-60%)
-    self.update_state(state='PROCESSING', meta={'progress': 50})
-    logger.info(f"음정 추출 시작: {len(user_segments)} 세그먼트")
-    user_pitches = extract_pitch_with_crepe(user_segments, sr)
-    # user_pitches = extract_pitch_with_pyin(user_segments, sr)
-    self.update_state(state='PROCESSING', meta={'progress': 60})
     # ref_pitches = extract_pitch_with_crepe(ref_segments, sr)
     ref_pitches = ref_features['features']['pitches']
-    
-    # 6. 연주 기법 예측 (60-70%)
-    self.update_state(state='PROCESSING', meta={'progress': 65})
-    model_path = os.path.join(os.environ.get('MODEL_DIR', 'models'), 'guitar_technique_classifier.keras')
-    user_techniques = []
     ref_techniques = []
-    
+
     if os.path.exists(model_path):
-        user_techniques = predict_techniques(user_segments, model_path, sr)
-        self.update_state(state='PROCESSING', meta={'progress': 70})
         # ref_techniques = predict_techniques(ref_segments, model_path, sr)
         ref_techniques = ref_features['features']['techniques']
-    
-    # 7. 발음 시작점 추출 및 타이밍 분석 (75%)
-    self.update_state(state='PROCESSING', meta={'progress': 75})
-    user_onsets = extract_onsets(user_y, sr)
+
+    # 7. 발음 시작점 타이밍 분석
     ref_onsets = ref_features['features']['onsets']
-    
+
     user_onset_differences = []
     ref_onset_differences = []
-    
+
     if has_midi and midi_onsets:
         # MIDI 오디오에 대한 타이밍 차이 계산
         for user_onset in user_onsets:
             closest_midi_idx = np.argmin(np.abs(np.array(midi_onsets) - user_onset))
             user_diff = abs(user_onset - midi_onsets[closest_midi_idx])
             user_onset_differences.append(user_diff)
-            
+
         for ref_onset in ref_onsets:
             closest_midi_idx = np.argmin(np.abs(np.array(midi_onsets) - ref_onset))
             ref_diff = abs(ref_onset - midi_onsets[closest_midi_idx])
             ref_onset_differences.append(ref_diff)
-    
+
     # 8. 점수 계산 (80-85%)
-    self.update_state(state='PROCESSING', meta={'progress': 80})
-    
+    progress.update(80)
+
     # 템포 매치 점수
     tempo_match = 100 - min(100, abs(user_tempo - ref_tempo) * 2)
-    
+
     # 음정 매치 점수 계산
     pitch_diffs = []
     for user_pitch, ref_pitch in zip(user_pitches, ref_pitches):
         if user_pitch > 0 and ref_pitch > 0:
             cents_diff = 1200 * np.log2(user_pitch / ref_pitch) if user_pitch > 0 and ref_pitch > 0 else 1200
             pitch_diffs.append(min(1200, abs(cents_diff)))
-    
+
     pitch_match = 100 - (np.mean(pitch_diffs) / 1200 * 100 if pitch_diffs else 0)
-    
+
     # 리듬 매치 점수 계산
     absolute_rhythm_match = 0
     relative_rhythm_match = 0
     rhythm_match = 0  # 기본값 설정
-    
-    self.update_state(state='PROCESSING', meta={'progress': 85})
-    
+
+    progress.update(85)
+
     # MIDI 기반 또는 기본 리듬 점수 계산
     if has_midi and midi_onsets and len(user_onset_differences) > 0 and len(ref_onset_differences) > 0:
         logger.info(f"MIDI 기반 리듬 점수 계산: user_onset_diffs={len(user_onset_differences)}, ref_onset_diffs={len(ref_onset_differences)}")
         # MIDI 기반 절대적 리듬 점수
         absolute_rhythm_match = 100 - min(100, np.mean(user_onset_differences) * 100)
-        
+
         # 상대적 리듬 점수
         relative_diffs = []
-        for user_diff, ref_diff in zip(user_onset_differences[:min(len(user_onset_differences), len(ref_onset_differences))], 
+        for user_diff, ref_diff in zip(user_onset_differences[:min(len(user_onset_differences), len(ref_onset_differences))],
                                     ref_onset_differences[:min(len(user_onset_differences), len(ref_onset_differences))]):
             relative_diff = max(0, user_diff - ref_diff)
             relative_diffs.append(relative_diff)
-        
+
         relative_rhythm_match = 100 - min(100, np.mean(relative_diffs) * 100 if relative_diffs else 0)
-        
+
         # 가중 평균 (60% 상대적, 40% 절대적)
         rhythm_match = 0.4 * absolute_rhythm_match + 0.6 * relative_rhythm_match
-        
+
         # 표현력 유사도 계산
         ref_avg_deviation = np.mean(ref_onset_differences)
         user_avg_deviation = np.mean(user_onset_differences)
         expression_similarity = 100 - min(100, abs(ref_avg_deviation - user_avg_deviation) * 200)
-        
+
         logger.info(f"MIDI 기반 리듬 점수: absolute={absolute_rhythm_match}, relative={relative_rhythm_match}, overall={rhythm_match}")
     else:
         logger.info("기본 리듬 점수 계산 사용")
         # MIDI 없이 전통적인 리듬 점수 계산
         rhythm_diffs = []
         min_len = min(len(user_onsets), len(ref_onsets))
-        
+
         if min_len > 0:
             for i in range(min_len):
                 rhythm_diffs.append(abs(user_onsets[i] - ref_onsets[i]))
-            
+
             rhythm_match = 100 - min(100, np.mean(rhythm_diffs) * 100 if rhythm_diffs else 0)
             absolute_rhythm_match = rhythm_match
             relative_rhythm_match = rhythm_match
@@ -380,22 +511,25 @@ def compare_audio(self, user_audio_bytes, user_id=None, song_id=None, generate_f
             rhythm_match = 0
             absolute_rhythm_match = 0
             relative_rhythm_match = 0
-        
+
         expression_similarity = None
-    
+
     # 연주 기법 매치 점수 계산
     technique_matches = []
     for user_tech, ref_tech in zip(user_techniques, ref_techniques):
         match = 100 if set(user_tech) == set(ref_tech) else 0
         technique_matches.append(match)
-    
+
     technique_match = np.mean(technique_matches) if technique_matches else 0
-    
+
     # 종합 점수 계산
-    overall_score = 0.4 * pitch_match + 0.3 * rhythm_match + 0.2 * technique_match + 0.1 * tempo_match
-    
+    if techniques_skipped:
+        overall_score = (0.4 * pitch_match + 0.3 * rhythm_match + 0.1 * tempo_match) / 0.8
+    else:
+        overall_score = 0.4 * pitch_match + 0.3 * rhythm_match + 0.2 * technique_match + 0.1 * tempo_match
+
     # 9. 결과 정리 (90%)
-    self.update_state(state='FINALIZING', meta={'progress': 90})
+    progress.update(90, 'FINALIZING')
     result = {
         "user_features": {
             "tempo": user_tempo,
@@ -418,15 +552,15 @@ def compare_audio(self, user_audio_bytes, user_id=None, song_id=None, generate_f
         },
         "created_at": datetime.utcnow().isoformat()
     }
-    
+
     # MIDI 관련 상세 리듬 분석 추가
     if has_midi and midi_onsets:
         result["scores"]["rhythm_absolute_match"] = absolute_rhythm_match
         result["scores"]["rhythm_relative_match"] = relative_rhythm_match
-        
+
         if expression_similarity is not None:
             result["scores"]["expression_similarity"] = expression_similarity
-            
+
         # 노트별 비교 데이터 생성
         note_comparisons = []
         for i in range(min(len(user_onset_differences), len(ref_onset_differences))):
@@ -434,62 +568,319 @@ def compare_audio(self, user_audio_bytes, user_id=None, song_id=None, generate_f
                 "note_index": i,
                 "user_timing_deviation": user_onset_differences[i],
                 "reference_timing_deviation": ref_onset_differences[i],
-                "timing_comparison": "better" if user_onset_differences[i] < ref_onset_differences[i] else 
+                "timing_comparison": "better" if user_onset_differences[i] < ref_onset_differences[i] else
                                     "same" if user_onset_differences[i] == ref_onset_differences[i] else "worse"
             }
             note_comparisons.append(comparison)
-            
+
         result["note_comparisons"] = note_comparisons
 
+    return result
+
+
+def _finalize_comparison(progress, task_id, result, user_id, song_id, has_midi, generate_feedback, stage_timings=None):
+    """비교 결과에 메타데이터와 피드백을 추가하고 MongoDB에 저장 (97-99%)"""
     # 메타데이터 추가
     result['metadata'] = {
         'user_id': user_id,
         'song_id': song_id,
-        'task_id': self.request.id,
+        'task_id': task_id,
         'has_reference': True,  # 항상 True로 설정 (ref_features에서 가져왔으므로)
         'has_midi': has_midi
     }
-    
+    if stage_timings:
+        # 단계별 소요 시간 (초)
+        result['metadata']['stage_timings'] = {name: round(elapsed, 3) for name, elapsed in stage_timings.items()}
+
     # 피드백 생성 옵션이 활성화된 경우
     if generate_feedback:
-        self.update_state(state='FINALIZING', meta={'progress': 97})
-        logger.info(f"Generating feedback for comparison task {self.request.id}")
-        
+        progress.update(97, 'FINALIZING')
+        logger.info(f"Generating feedback for comparison task {task_id}")
+
         try:
             # GROK API를 사용하여 피드백 생성
             feedback_generator = GrokFeedbackGenerator()
             feedback_result = feedback_generator.generate_feedback(
-                result, 
+                result,
                 is_comparison=True  # 항상 True로 설정 (레퍼런스 비교이므로)
             )
-            
+
             # 피드백이 성공적으로 생성된 경우 결과에 추가
             if 'feedback' in feedback_result:
                 result['feedback'] = feedback_result['feedback']
                 result['feedback_metadata'] = feedback_result.get('metadata', {})
-                
+
                 # 피드백을 MongoDB에 저장
                 feedback_result['created_at'] = datetime.utcnow().isoformat()
-                save_feedback(self.request.id, feedback_result)
+                save_feedback(task_id, feedback_result)
             # 오류가 발생한 경우 오류 메시지 추가
             elif 'error' in feedback_result:
                 result['feedback_error'] = feedback_result['error']
         except Exception as e:
             logger.exception(f"Error generating feedback: {str(e)}")
             result['feedback_error'] = f"피드백 생성 중 오류 발생: {str(e)}"
-    
+
     # MongoDB에 결과 저장 (98%)
-    self.update_state(state='FINALIZING', meta={'progress': 98})
-    logger.info(f"Saving comparison results to MongoDB for task {self.request.id}")
-    save_comparison_result(self.request.id, result)
-    
+    progress.update(98, 'FINALIZING')
+    logger.info(f"Saving comparison results to MongoDB for task {task_id}")
+    doc_id = save_comparison_result(task_id, result)
+
     # 100% 진행
-    self.update_state(state='FINALIZING', meta={'progress': 99})
-    
-    logger.info(f"Audio comparison task {self.request.id} completed successfully")
-    return result
+    progress.update(99, 'FINALIZING', force=True)
+
+    logger.info(f"Audio comparison task {task_id} completed successfully")
+    return task_result(result, "comparison", doc_id)
+
+
+def _crepe_capacity_within_budget(budget, segments):
+    """CREPE 음정 추출을 예산 안에 끝낼 수 없으면 작은 모델 크기를 반환"""
+    estimated = estimate_inference_seconds("crepe", segments)
+    if budget.allows(estimated):
+        return 'full'
+    budget.degrade("pitch", f"crepe_{DEGRADED_CREPE_CAPACITY}", estimated)
+    return DEGRADED_CREPE_CAPACITY
+
+
+def _infer_within_budget(budget, segments, model_path, sr, progress_callback):
+    """남은 시간 예산에 맞춰 음정/기법 추론
+
+    예산이 부족하면 기법 예측을 건너뛰고 음정만 추출하며, 그래도 부족하면 작은 CREPE 모델을 사용합니다.
+
+    Returns:
+        (pitches, techniques)
+    """
+    if os.path.exists(model_path):
+        estimated = estimate_inference_seconds("analyze", segments)
+        if budget.allows(estimated):
+            return analyze_segments(segments, model_path, sr, progress_callback)
+        budget.degrade("techniques", "skipped", estimated)
+    capacity = _crepe_capacity_within_budget(budget, segments)
+    return extract_pitch_with_crepe(segments, sr, progress_callback, capacity), []
+
+
+@celery_app.task(bind=True, name='workers.tasks.compare_audio')
+@_cancellable
+def compare_audio(self, user_audio_bytes, user_id=None, song_id=None, generate_feedback=False):
+    """
+    Celery task to compare user audio with reference audio and/or MIDI.
+
+    COMPARE_PIPELINE_MODE=canvas이면 세그먼트 생성까지만 이 태스크에서 처리하고,
+    나머지는 병렬 서브태스크 캔버스로 교체합니다 (같은 태스크 ID로 최종 결과 저장).
+
+    Parameters:
+    - user_audio_bytes: Binary content of the user's audio recording
+    - reference_audio_bytes: Binary content of the reference audio (optional)
+    - midi_bytes: Binary content of the MIDI file (optional)
+    - user_id: ID of the user who uploaded the audio (optional)
+    - song_id: ID of the song being analyzed (optional)
+    - generate_feedback: Whether to generate textual feedback using GROK API
+
+    Returns:
+    - Dictionary with comparison results
+    """
+    logger.info(f"Starting audio comparison task {self.request.id}")
+    ref_features = get_reference_features(song_id)
+    # logger.info(f"Reference features for song_id {song_id}: {ref_features}")
+    progress = ProgressReporter(self)
+    progress.update(5, 'STARTED')
+    # 남은 시간에 맞춰 정렬/추론을 저비용 방식으로 바꾸고 결과를 degraded로 표시
+    budget = TaskBudget()
+
+    # 참조 오디오와 비교 (1-3단계)
+    prepared = _prepare_comparison(progress, budget, user_audio_bytes, ref_features, song_id)
+    user_y, sr = prepared["user_y"], prepared["sr"]
+    user_segments = prepared["user_segments"]
+    has_midi, midi_onsets = prepared["has_midi"], prepared["midi_onsets"]
+    model_path = _technique_model_path()
+
+    if COMPARE_PIPELINE_MODE == "canvas":
+        progress.flush()
+        return self.replace(_build_comparison_canvas(
+            self.request.id, prepared, model_path, user_id, song_id, generate_feedback, budget.degradations
+        ))
+
+    # 4-7. 템포 추출, 음정 추출 및 연주 기법 예측, 발음 시작점 추출 (45-75%)
+    # 서로 독립적인 단계이므로 STAGE_CONCURRENCY > 1이면 스레드로 동시에 실행
+    progress.update(45)
+    logger.info(f"음정 추출 및 기법 예측 시작: {len(user_segments)} 세그먼트")
+
+    # 음정/기법은 GPU 서버 사용 시 세그먼트를 한 번만 업로드하는 통합 API로 함께 받음
+    graph = StageGraph("compare_audio")
+    graph.add("tempo", lambda: extract_tempo(user_y, sr))
+    graph.add("inference", lambda: _infer_within_budget(budget, user_segments, model_path, sr,
+                                                        progress.range(45, 75)))
+    graph.add("onsets", lambda: extract_onsets(user_y, sr))
+    stage_results = graph.run()
+    user_tempo = stage_results["tempo"]
+    user_pitches, user_techniques = stage_results["inference"]
+    user_onsets = stage_results["onsets"]
+    progress.update(75)
+
+    # 8-9. 점수 계산 및 결과 정리 (80-90%)
+    result = _score_comparison(progress, ref_features, has_midi, midi_onsets, user_tempo, user_onsets,
+                               user_pitches, user_techniques, model_path, budget.degraded("techniques"))
+    mark_degraded(result, budget.degradations)
+    if _offload_feedback(generate_feedback):
+        # 피드백 생성과 저장은 feedback 큐에서 같은 태스크 ID로 이어서 처리
+        progress.flush()
+        context = {"task_id": self.request.id, "has_midi": has_midi, "stage_timings": graph.timings}
+        return self.replace(compare_persist_stage.s(result, context, user_id, song_id, generate_feedback))
+    return _finalize_comparison(progress, self.request.id, result, user_id, song_id, has_midi, generate_feedback,
+                                stage_timings=graph.timings)
+
+
+# ---------------------------------------------------------------------------
+# 비교 파이프라인 캔버스 (COMPARE_PIPELINE_MODE=canvas)
+#
+#   compare_audio (로드/정렬/세그먼트, 배열은 블롭 저장소에)
+#     → chord(음정 ‖ 기법 ‖ 템포/발음 시작점)
+#     → 점수 계산 → 피드백/저장
+#
+# 서브태스크는 배열 대신 블롭 참조를 주고받고, 진행률은 원래 compare_audio 태스크 ID에 기록합니다.
+# ---------------------------------------------------------------------------
+
+def _build_comparison_canvas(task_id, prepared, model_path, user_id, song_id, generate_feedback,
+                             degradations=None):
+    """준비된 세그먼트로 비교 파이프라인 캔버스 생성 (중간 배열은 블롭 저장소에 저장)
+
+    서브태스크는 각자 Celery 시간 제한을 받으므로 시간 예산도 단계마다 새로 시작하고,
+    저비용 방식으로 실행한 기록은 점수 계산 단계에서 합칩니다.
+    병렬 단계나 점수 계산 단계가 실패하면 저장 단계가 실행되지 않으므로 compare_canvas_failed가 정리합니다.
+    """
+    context = {
+        "task_id": task_id,
+        "song_id": song_id,
+        "sr": prepared["sr"],
+        "model_path": model_path,
+        "has_midi": prepared["has_midi"],
+        "midi_onsets": prepared["midi_onsets"],
+        "audio_ref": blob_store.put_arrays({"y": np.asarray(prepared["user_y"], dtype=np.float32)}),
+        "segments_ref": blob_store.put_segments(prepared["user_segments"]),
+        "degradations": list(degradations or []),
+    }
+    logger.info(f"비교 파이프라인 캔버스 시작 {task_id}: {len(prepared['user_segments'])} 세그먼트")
+    return chord(
+        group(
+            compare_pitch_stage.s(context),
+            compare_technique_stage.s(context),
+            compare_tempo_onset_stage.s(context),
+        ),
+        compare_score_stage.s(context),
+    ).on_error(compare_canvas_failed.s(context)) | compare_persist_stage.s(context, user_id, song_id, generate_feedback).set(**_persist_options(generate_feedback))
+
+
+# 캔버스 단계가 취소를 확인하면 예외 대신 이 값을 반환하고, 마지막 단계(원래 태스크 ID)에서 REVOKED로 기록
+# (서브태스크가 실패하면 chord 오류가 원래 태스크 ID를 FAILURE로 덮어쓰므로)
+CANCELLED_STAGE_RESULT = {"cancelled": True}
+
+
+@celery_app.task(bind=True, name='workers.tasks.compare_pitch_stage')
+def compare_pitch_stage(self, context):
+    """비교 파이프라인: 세그먼트별 CREPE 음정 추출"""
+    check_cancelled = task_cancellation.checker(context["task_id"])
+    try:
+        check_cancelled()
+        segments = blob_store.get_segments(context["segments_ref"])
+        budget = TaskBudget()
+        capacity = _crepe_capacity_within_budget(budget, segments)
+        pitches = extract_pitch_with_crepe(segments, context["sr"], check_cancelled, capacity)
+    except TaskCancelled:
+        return CANCELLED_STAGE_RESULT
+    return {"pitches": [float(pitch) for pitch in pitches], "degradations": budget.degradations}
+
+
+@celery_app.task(bind=True, name='workers.tasks.compare_technique_stage')
+def compare_technique_stage(self, context):
+    """비교 파이프라인: 세그먼트별 연주 기법 예측 (모델 파일이 없으면 빈 리스트)"""
+    if not os.path.exists(context["model_path"]):
+        return {"techniques": []}
+    check_cancelled = task_cancellation.checker(context["task_id"])
+    try:
+        check_cancelled()
+        segments = blob_store.get_segments(context["segments_ref"])
+        budget = TaskBudget()
+        estimated = estimate_inference_seconds("techniques", segments)
+        if not budget.allows(estimated):
+            budget.degrade("techniques", "skipped", estimated)
+            return {"techniques": [], "degradations": budget.degradations}
+        return {"techniques": predict_techniques(segments, context["model_path"], context["sr"], check_cancelled)}
+    except TaskCancelled:
+        return CANCELLED_STAGE_RESULT
+
+
+@celery_app.task(bind=True, name='workers.tasks.compare_tempo_onset_stage')
+def compare_tempo_onset_stage(self, context):
+    """비교 파이프라인: 전체 오디오의 템포와 발음 시작점 추출"""
+    check_cancelled = task_cancellation.checker(context["task_id"])
+    try:
+        check_cancelled()
+        user_y = blob_store.get_arrays(context["audio_ref"])["y"]
+        tempo = extract_tempo(user_y, context["sr"])
+        check_cancelled()
+    except TaskCancelled:
+        return CANCELLED_STAGE_RESULT
+    return {"tempo": tempo, "onsets": extract_onsets(user_y, context["sr"])}
+
+
+@celery_app.task(bind=True, name='workers.tasks.compare_score_stage')
+def compare_score_stage(self, stage_results, context):
+    """비교 파이프라인: 병렬 단계 결과를 모아 점수 계산"""
+    if any(stage_result.get("cancelled") for stage_result in stage_results):
+        return CANCELLED_STAGE_RESULT
+    merged = {}
+    degradations = list(context.get("degradations", []))
+    for stage_result in stage_results:
+        degradations.extend(stage_result.pop("degradations", []))
+        merged.update(stage_result)
+    techniques_skipped = any(entry["stage"] == "techniques" for entry in degradations)
+    ref_features = get_reference_features(context["song_id"])
+    try:
+        result = _score_comparison(
+            ProgressReporter(self, task_id=context["task_id"]), ref_features, context["has_midi"],
+            context["midi_onsets"], merged["tempo"], merged["onsets"], merged["pitches"], merged["techniques"],
+            context["model_path"], techniques_skipped
+        )
+        return mark_degraded(result, degradations)
+    except TaskCancelled:
+        return CANCELLED_STAGE_RESULT
+
+
+@celery_app.task(name='workers.tasks.compare_canvas_failed')
+def compare_canvas_failed(request, exc, traceback, context):
+    """비교 캔버스 오류 콜백: 블롭 정리 후 원래 compare_audio 태스크 ID를 FAILURE로 기록하고 이벤트 발행
+
+    병렬 단계가 실패하면 chord 오류로, 점수 계산 단계가 실패하면 그 단계의 오류로 호출됩니다.
+    실패한 서브태스크 ID의 FAILURE만으로는 원래 ID를 구독하는 클라이언트가 종료를 알 수 없습니다.
+    """
+    task_id = context["task_id"]
+    logger.error(f"비교 파이프라인 캔버스 실패 {task_id} (단계 {request.id}): {exc}")
+    blob_store.delete(context.get("audio_ref"), context.get("segments_ref"))
+    celery_app.backend.mark_as_failure(task_id, exc, traceback)
+    publish_task_event(task_id, {'status': 'FAILURE', 'progress': 0, 'error': str(exc)})
+
+
+@celery_app.task(bind=True, name='workers.tasks.compare_persist_stage')
+@_cancellable
+def compare_persist_stage(self, result, context, user_id=None, song_id=None, generate_feedback=False):
+    """비교 마지막 단계: 피드백 생성, MongoDB 저장, 블롭 정리 (원래 compare_audio 태스크 ID로 실행됨)
+
+    피드백을 요청하면 feedback 큐, 아니면 interactive 큐에서 실행됩니다.
+    앞 단계가 취소되었으면 결과를 저장하지 않고 REVOKED로 기록합니다.
+    """
+    try:
+        if result.get("cancelled"):
+            _mark_cancelled(self, context["task_id"])
+        # 큐에서 기다리는 동안 취소되었으면 피드백 생성과 저장을 건너뜀
+        task_cancellation.checker(context["task_id"])()
+        return _finalize_comparison(ProgressReporter(self, task_id=context["task_id"]), context["task_id"], result,
+                                    user_id, song_id, context["has_midi"], generate_feedback,
+                                    stage_timings=context.get("stage_timings"))
+    finally:
+        blob_store.delete(context.get("audio_ref"), context.get("segments_ref"))
+
 
 @celery_app.task(bind=True, name='workers.tasks.analyze_reference_audio')
+@_cancellable
 def analyze_reference_audio(self, audio_bytes, song_id, midi_bytes=None, description=None):
     """
     레퍼런스 오디오를 분석하여 특성을 추출하고 DB에 저장하는 Celery 태스크
@@ -504,25 +895,25 @@ def analyze_reference_audio(self, audio_bytes, song_id, midi_bytes=None, descrip
     - 추출된 특성 정보와 DB에 저장된 문서 ID
     """
     logger.info(f"레퍼런스 오디오 분석 태스크 시작 {self.request.id}, song_id: {song_id}")
-    self.update_state(state='STARTED', meta={'progress': 0})
+    progress = ProgressReporter(self)
+    progress.update(0, 'STARTED')
     
     try:
         # 1. 오디오 로드 (10%)
-        self.update_state(state='PROCESSING', meta={'progress': 10})
+        progress.update(10)
         y, sr = load_audio_from_bytes(audio_bytes)
         
         # 2. 템포 추출 (20%)
-        self.update_state(state='PROCESSING', meta={'progress': 20})
+        progress.update(20)
         tempo = extract_tempo(y, sr)
         logger.info(f"템포 추출 완료: {tempo}")
         
         # 3. 노트 시작점 추출 (30%)
-        self.update_state(state='PROCESSING', meta={'progress': 30})
+        progress.update(30)
         onsets = extract_onsets(y, sr)
         logger.info(f"노트 시작점 추출 완료: {len(onsets)} 개")
         
         # 4. MIDI 로드 및 세그먼트 생성 (40%)
-        self.update_state(state='PROCESSING', meta={'progress': 40})
         midi_data = None
         segments = []
         
@@ -573,32 +964,32 @@ def analyze_reference_audio(self, audio_bytes, song_id, midi_bytes=None, descrip
         if not segments:
             segments = [y]
         
-        # 5. 음정 추출 (60%)
-        self.update_state(state='PROCESSING', meta={'progress': 60})
+        # 5. 음정 추출 (40% -> 70%, 세그먼트/배치 단위로 보고)
+        progress.update(40)
         pitches = []
         try:
-            pitches = extract_pitch_with_crepe(segments, sr)
+            pitches = extract_pitch_with_crepe(segments, sr, progress.range(40, 70))
             # pitches = extract_pitch_with_pyin(segments, sr)
         except Exception as e:
             logger.error(f"음정 추출 중 오류 발생: {str(e)}")
             # 오류 발생 시 빈 값 할당
             pitches = [0.0] * len(segments)
         
-        # 6. 연주 기법 예측 (80%)
-        self.update_state(state='PROCESSING', meta={'progress': 80})
+        # 6. 연주 기법 예측 (70% -> 90%)
+        progress.update(70)
         model_path = os.path.join(os.environ.get('MODEL_DIR', 'models'), 'guitar_technique_classifier.keras')
         techniques = []
         
         if os.path.exists(model_path):
             try:
-                techniques = predict_techniques(segments, model_path, sr)
+                techniques = predict_techniques(segments, model_path, sr, progress.range(70, 90))
             except Exception as e:
                 logger.error(f"기법 예측 중 오류 발생: {str(e)}")
                 # 오류 발생 시 빈 값 할당
                 techniques = [[] for _ in range(len(segments))]
         
         # 7. 결과 정리 (90%)
-        self.update_state(state='FINALIZING', meta={'progress': 90})
+        progress.update(90, 'FINALIZING')
         
         # 오디오 특성 정보 생성 (NumPy 배열을 Python 기본 타입으로 변환)
         features = {
@@ -633,7 +1024,7 @@ def analyze_reference_audio(self, audio_bytes, song_id, midi_bytes=None, descrip
         features["metadata"] = metadata
         
         # 8. DB에 저장 (95%)
-        self.update_state(state='FINALIZING', meta={'progress': 95})
+        progress.update(95, 'FINALIZING')
         
         # MongoDB 저장 전에 NumPy 배열을 Python 기본 타입으로 완전히 변환
         def convert_numpy_to_python(obj):
@@ -657,7 +1048,7 @@ def analyze_reference_audio(self, audio_bytes, song_id, midi_bytes=None, descrip
         logger.info(f"레퍼런스 오디오 분석 완료 및 저장 (song_id: {song_id}, doc_id: {doc_id})")
         
         # 9. 결과 반환 (100%)
-        self.update_state(state='FINALIZING', meta={'progress': 99})
+        progress.update(99, 'FINALIZING', force=True)
         result = {
             "song_id": song_id,
             "features": features,
@@ -667,7 +1058,7 @@ def analyze_reference_audio(self, audio_bytes, song_id, midi_bytes=None, descrip
         if midi_data:
             result["has_midi"] = True
         
-        return result
+        return task_result(result, "reference", doc_id, song_id=song_id)
     
     except Exception as e:
         logger.exception(f"레퍼런스 오디오 분석 오류: {str(e)}")